@@ -0,0 +1,113 @@
+"""
+ASGI server entry point - same REST API as start_server.py
+Auto-upload requests are read natively async (starlette's multipart parser),
+so a slow client sending a large file costs a coroutine instead of an OS
+thread. The file is staged and queued on the same job queue as the Flask
+view, and the request returns 202 at once; the job workers run extraction
+and the LLM call. Every other route is the Flask app from
+create_simple_app(), mounted through a WSGI adapter.
+
+Requires: starlette, python-multipart, uvicorn, a2wsgi
+
+Usage:
+    python asgi_server.py
+    uvicorn asgi_server:app --host 127.0.0.1 --port 5000
+"""
+
+import asyncio
+import contextlib
+import logging
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+import start_server  # also puts backend/ on sys.path
+from services.blob_store import BlobStore
+from services.upload_jobs import queued_job_data
+from services.uploads import ALLOWED_EXTENSIONS, allowed_file
+
+# Flask app serving every route not overridden below (also runs the startup migrations)
+flask_app = start_server.create_simple_app()
+upload_jobs = flask_app.extensions['upload_jobs']
+
+# Response headers the Flask app adds to every response
+RESPONSE_HEADERS = {
+    'Access-Control-Allow-Origin': '*',
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block'
+}
+
+
+def error_response(message, status_code):
+    return JSONResponse({'status': 'error', 'message': message}, status_code=status_code, headers=RESPONSE_HEADERS)
+
+
+def queue_upload(blob_store, file):
+    """Stage a spooled upload (hashed, sized and sniffed on the way) and queue it as a job (blocking - run in a thread)"""
+    file.file.seek(0)
+    staged = blob_store.ingest(file.file, file.filename, file.content_type)
+    return upload_jobs.enqueue(flask_app.config['UPLOAD_FOLDER'], staged, file.filename)
+
+
+async def auto_upload_content(request: Request):
+    """Async twin of POST /api/content/auto-upload in start_server.py"""
+    if not start_server.CONTENT_ANALYSIS_AVAILABLE:
+        return error_response('Auto-upload requires content analysis module - missing dependencies', 503)
+
+    max_length = flask_app.config['MAX_CONTENT_LENGTH']
+    if int(request.headers.get('content-length') or 0) > max_length:
+        return error_response(f'File too large. Maximum size is {max_length // (1024*1024)}MB', 413)
+
+    form = await request.form()
+    try:
+        file = form.get('file')
+        if file is None or not hasattr(file, 'filename'):
+            return error_response('No file provided for auto-upload', 400)
+        if file.filename == '':
+            return error_response('No file selected', 400)
+        if not allowed_file(file.filename):
+            return error_response(f'File type not allowed. Allowed types: {", ".join(ALLOWED_EXTENSIONS)}', 400)
+
+        # The job owns the staged file from here until it is stored by hash
+        blob_store = BlobStore(flask_app.config['UPLOAD_FOLDER'])
+        try:
+            job = await asyncio.to_thread(queue_upload, blob_store, file)
+        except Exception as e:
+            logging.error(f"Error queueing auto-upload: {e}")
+            return error_response('Failed to queue uploaded file', 500)
+    finally:
+        await form.close()
+
+    logging.info(f"📥 Auto-upload queued: {file.filename} (job {job['id']})")
+    return JSONResponse({
+        'status': 'success',
+        'message': 'File received and queued for processing',
+        'data': queued_job_data(job)
+    }, status_code=202, headers={**RESPONSE_HEADERS, 'Location': f"/api/jobs/{job['id']}"})
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    start_server.resume_upload_jobs(flask_app)
+    yield
+
+
+app = Starlette(
+    routes=[
+        Route('/api/content/auto-upload', auto_upload_content, methods=['POST']),
+        Mount('/', app=WSGIMiddleware(flask_app)),
+    ],
+    lifespan=lifespan
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("Starting Teaching Content Database API (ASGI)...")
+    print("Starting server on http://127.0.0.1:5000")
+    uvicorn.run(app, host='127.0.0.1', port=5000)
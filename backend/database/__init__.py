@@ -2,15 +2,20 @@
 Database package for Teaching Content Database
 """
 
-from .models import Base, Content, Tag, Category, ContentVersion
+from .models import Base, Content, ContentText, Tag, Category, ContentVersion, ContentTombstone, ContentCounter, Blob, UploadJob
 from .database import DatabaseManager, get_database_manager, init_db
 
 __all__ = [
     'Base', 
     'Content', 
+    'ContentText',
     'Tag', 
     'Category', 
     'ContentVersion',
+    'ContentTombstone',
+    'ContentCounter',
+    'Blob',
+    'UploadJob',
     'DatabaseManager',
     'get_database_manager',
     'init_db'
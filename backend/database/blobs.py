@@ -0,0 +1,77 @@
+"""
+Reference counts for the content-addressed upload store
+
+Uploaded files are stored once per SHA-256 (services/blob_store.py).
+`content.file_hash` names the blob a content row uses and `blobs.ref_count`
+counts those rows; triggers on `content` keep the count exact and drop the
+row when the last reference goes away, so the file can be removed. Content
+uploaded before the store existed has no file_hash and owns its file.
+PostgreSQL gets the same trigger as a plpgsql function.
+"""
+
+from .models import Blob
+
+BLOBS_TABLE = 'blobs'
+
+_reference = (f"INSERT INTO {BLOBS_TABLE}(hash, size, ref_count) SELECT new.file_hash, new.file_size, 1 "
+              f"WHERE new.file_hash IS NOT NULL "
+              f"ON CONFLICT(hash) DO UPDATE SET ref_count = {BLOBS_TABLE}.ref_count + 1;")
+_release = (f"UPDATE {BLOBS_TABLE} SET ref_count = ref_count - 1 WHERE hash = old.file_hash;\n"
+            f"    DELETE FROM {BLOBS_TABLE} WHERE hash = old.file_hash AND ref_count <= 0;")
+
+BLOB_TRIGGERS = {
+    'content_blobs_ai': f"""
+CREATE TRIGGER IF NOT EXISTS content_blobs_ai AFTER INSERT ON content
+WHEN new.file_hash IS NOT NULL BEGIN
+    {_reference}
+END
+""",
+    'content_blobs_ad': f"""
+CREATE TRIGGER IF NOT EXISTS content_blobs_ad AFTER DELETE ON content
+WHEN old.file_hash IS NOT NULL BEGIN
+    {_release}
+END
+""",
+    'content_blobs_au': f"""
+CREATE TRIGGER IF NOT EXISTS content_blobs_au AFTER UPDATE OF file_hash ON content
+WHEN old.file_hash IS NOT new.file_hash BEGIN
+    {_release}
+    {_reference}
+END
+""",
+}
+
+# PostgreSQL: one row trigger covering insert, delete and hash changes
+PG_BLOB_TRIGGER = [
+    f"""CREATE OR REPLACE FUNCTION content_blobs_fn() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.file_hash IS NOT DISTINCT FROM NEW.file_hash THEN
+        RETURN NULL;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') AND OLD.file_hash IS NOT NULL THEN
+        UPDATE {BLOBS_TABLE} SET ref_count = ref_count - 1 WHERE hash = OLD.file_hash;
+        DELETE FROM {BLOBS_TABLE} WHERE hash = OLD.file_hash AND ref_count <= 0;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.file_hash IS NOT NULL THEN
+        INSERT INTO {BLOBS_TABLE}(hash, size, ref_count) VALUES (NEW.file_hash, NEW.file_size, 1)
+            ON CONFLICT(hash) DO UPDATE SET ref_count = {BLOBS_TABLE}.ref_count + 1;
+    END IF;
+    RETURN NULL;
+END
+$$""",
+    "DROP TRIGGER IF EXISTS content_blobs ON content",
+    "CREATE TRIGGER content_blobs AFTER INSERT OR DELETE OR UPDATE OF file_hash ON content "
+    "FOR EACH ROW EXECUTE FUNCTION content_blobs_fn()",
+]
+
+# Recompute every reference count from content (run once when the triggers are installed)
+REBUILD_BLOBS = [
+    f"DELETE FROM {BLOBS_TABLE}",
+    f"""INSERT INTO {BLOBS_TABLE}(hash, size, ref_count)
+        SELECT file_hash, MAX(file_size), count(*) FROM content WHERE file_hash IS NOT NULL GROUP BY file_hash""",
+]
+
+
+def blob_ref_count(session, file_hash):
+    """Content rows referencing a blob (0 once the last one is deleted)"""
+    return session.query(Blob.ref_count).filter(Blob.hash == file_hash).scalar() or 0
@@ -0,0 +1,109 @@
+"""
+Materialized counters for Teaching Content Database
+
+Per-subject and total content counts live in `content_counters`, and per-tag
+usage lives in `tags.usage_count`. Both are kept exact by triggers on
+`content` and `content_tags`, so count endpoints read them directly instead
+of scanning the catalog. PostgreSQL gets the same triggers as plpgsql
+functions.
+"""
+
+from sqlalchemy import and_, func
+
+from .models import Category, ContentCounter
+
+COUNTERS_TABLE = 'content_counters'
+
+_increment = f"ON CONFLICT(kind, key) DO UPDATE SET count = {COUNTERS_TABLE}.count + 1"
+
+COUNTER_TRIGGERS = {
+    'content_counters_ai': f"""
+CREATE TRIGGER IF NOT EXISTS content_counters_ai AFTER INSERT ON content BEGIN
+    INSERT INTO {COUNTERS_TABLE}(kind, key, count) VALUES ('total', '', 1) {_increment};
+    INSERT INTO {COUNTERS_TABLE}(kind, key, count)
+        SELECT 'subject', new.subject, 1 WHERE new.subject IS NOT NULL {_increment};
+END
+""",
+    'content_counters_ad': f"""
+CREATE TRIGGER IF NOT EXISTS content_counters_ad AFTER DELETE ON content BEGIN
+    UPDATE {COUNTERS_TABLE} SET count = count - 1
+        WHERE (kind = 'total' AND key = '') OR (kind = 'subject' AND key = old.subject);
+END
+""",
+    'content_counters_au': f"""
+CREATE TRIGGER IF NOT EXISTS content_counters_au AFTER UPDATE OF subject ON content
+WHEN old.subject IS NOT new.subject BEGIN
+    UPDATE {COUNTERS_TABLE} SET count = count - 1 WHERE kind = 'subject' AND key = old.subject;
+    INSERT INTO {COUNTERS_TABLE}(kind, key, count)
+        SELECT 'subject', new.subject, 1 WHERE new.subject IS NOT NULL {_increment};
+END
+""",
+    'content_tags_usage_ai': """
+CREATE TRIGGER IF NOT EXISTS content_tags_usage_ai AFTER INSERT ON content_tags BEGIN
+    UPDATE tags SET usage_count = COALESCE(usage_count, 0) + 1 WHERE id = new.tag_id;
+END
+""",
+    'content_tags_usage_ad': """
+CREATE TRIGGER IF NOT EXISTS content_tags_usage_ad AFTER DELETE ON content_tags BEGIN
+    UPDATE tags SET usage_count = MAX(COALESCE(usage_count, 0) - 1, 0) WHERE id = old.tag_id;
+END
+""",
+}
+
+# PostgreSQL: trigger name -> (table, events, plpgsql function body)
+PG_COUNTER_TRIGGERS = {
+    'content_counters': ('content', 'INSERT OR DELETE OR UPDATE OF subject', f"""
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO {COUNTERS_TABLE}(kind, key, count) VALUES ('total', '', 1) {_increment};
+        IF NEW.subject IS NOT NULL THEN
+            INSERT INTO {COUNTERS_TABLE}(kind, key, count) VALUES ('subject', NEW.subject, 1) {_increment};
+        END IF;
+    ELSIF TG_OP = 'DELETE' THEN
+        UPDATE {COUNTERS_TABLE} SET count = count - 1
+            WHERE (kind = 'total' AND key = '') OR (kind = 'subject' AND key = OLD.subject);
+    ELSIF OLD.subject IS DISTINCT FROM NEW.subject THEN
+        UPDATE {COUNTERS_TABLE} SET count = count - 1 WHERE kind = 'subject' AND key = OLD.subject;
+        IF NEW.subject IS NOT NULL THEN
+            INSERT INTO {COUNTERS_TABLE}(kind, key, count) VALUES ('subject', NEW.subject, 1) {_increment};
+        END IF;
+    END IF;
+"""),
+    'content_tags_usage': ('content_tags', 'INSERT OR DELETE', """
+    IF TG_OP = 'INSERT' THEN
+        UPDATE tags SET usage_count = COALESCE(usage_count, 0) + 1 WHERE id = NEW.tag_id;
+    ELSE
+        UPDATE tags SET usage_count = GREATEST(COALESCE(usage_count, 0) - 1, 0) WHERE id = OLD.tag_id;
+    END IF;
+"""),
+}
+
+
+def pg_counter_trigger_ddl(name):
+    """Statements creating a PG_COUNTER_TRIGGERS entry (function, then row trigger)"""
+    table, events, body = PG_COUNTER_TRIGGERS[name]
+    return [
+        f"CREATE OR REPLACE FUNCTION {name}_fn() RETURNS trigger LANGUAGE plpgsql AS $$\nBEGIN{body}    RETURN NULL;\nEND\n$$",
+        f"DROP TRIGGER IF EXISTS {name} ON {table}",
+        f"CREATE TRIGGER {name} AFTER {events} ON {table} FOR EACH ROW EXECUTE FUNCTION {name}_fn()",
+    ]
+
+# Recompute every counter from scratch (run once when the triggers are installed)
+REBUILD_COUNTERS = [
+    f"DELETE FROM {COUNTERS_TABLE}",
+    f"INSERT INTO {COUNTERS_TABLE}(kind, key, count) SELECT 'total', '', count(*) FROM content",
+    f"""INSERT INTO {COUNTERS_TABLE}(kind, key, count)
+        SELECT 'subject', subject, count(*) FROM content WHERE subject IS NOT NULL GROUP BY subject""",
+    """UPDATE tags SET usage_count = (
+        SELECT count(*) FROM content_tags WHERE content_tags.tag_id = tags.id
+    )""",
+]
+
+
+def subject_counts_query(session):
+    """Categories paired with their content count, read from the subject counters"""
+    return (
+        session.query(Category, func.coalesce(ContentCounter.count, 0))
+               .outerjoin(ContentCounter, and_(ContentCounter.kind == 'subject',
+                                               ContentCounter.key == Category.name))
+               .order_by(Category.id)
+    )
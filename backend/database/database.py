@@ -3,12 +3,33 @@ Database initialization and configuration for Teaching Content Database
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 from pathlib import Path
 
 from .models import Base, Content, Tag, Category, ContentVersion
+from .generation import read_generation
+from .pragmas import resolve_profile, install_pragmas, read_pragmas
+from .texts import install_text_functions
+
+# Connection pool sizing; each can be overridden per deployment via the environment
+POOL_DEFAULTS = {
+    'pool_size': ('TEACHING_DB_POOL_SIZE', 10),         # connections kept open
+    'max_overflow': ('TEACHING_DB_MAX_OVERFLOW', 20),   # extra connections under bursts
+    'pool_timeout': ('TEACHING_DB_POOL_TIMEOUT', 30),   # seconds to wait for a connection
+    'pool_recycle': ('TEACHING_DB_POOL_RECYCLE', 3600), # seconds before a connection is replaced
+}
+
+# Database to use when none is passed (a SQLite or PostgreSQL URL)
+DATABASE_URL_ENV_VAR = 'TEACHING_DB_DATABASE_URL'
+
+def get_pool_options(overrides=None):
+    """Resolve pool settings from defaults, the environment and explicit overrides"""
+    options = {name: int(os.environ.get(env_var, default)) for name, (env_var, default) in POOL_DEFAULTS.items()}
+    options.update(overrides or {})
+    return options
 
 # Import migration functionality
 try:
@@ -21,8 +42,17 @@ except ImportError:
 class DatabaseManager:
     """Manages database connection and operations"""
     
-    def __init__(self, database_url=None):
-        """Initialize database manager with connection URL"""
+    def __init__(self, database_url=None, sqlite_profile=None, pool_options=None):
+        """
+        Initialize database manager with connection URL
+        SQLite and PostgreSQL URLs are supported; the default is the
+        TEACHING_DB_DATABASE_URL environment variable, then teaching_content.db.
+        `sqlite_profile` names a PRAGMA profile (see pragmas.py); by default it
+        comes from the TEACHING_DB_SQLITE_PROFILE environment variable.
+        `pool_options` overrides entries of POOL_DEFAULTS.
+        """
+        if database_url is None:
+            database_url = os.environ.get(DATABASE_URL_ENV_VAR)
         if database_url is None:
             # Use config from parent directory
             project_root = Path(__file__).parent.parent.parent
@@ -30,14 +60,63 @@ class DatabaseManager:
             database_url = f'sqlite:///{database_path}'
         
         self.database_url = database_url
+        self.backend = make_url(database_url).get_backend_name()
+        if self.backend not in ('sqlite', 'postgresql'):
+            raise ValueError(f"Unsupported database backend '{self.backend}' (use sqlite or postgresql)")
+        
+        # In-memory databases use a single-connection pool that takes no sizing
+        self.pool_options = {} if database_url in ('sqlite://', 'sqlite:///:memory:') else get_pool_options(pool_options)
         self.engine = create_engine(
             database_url,
             echo=False,  # Set to True for SQL debugging
-            connect_args={'check_same_thread': False}  # SQLite specific
+            connect_args={'check_same_thread': False} if self.backend == 'sqlite' else {},
+            **self.pool_options
         )
         
-        # Create session factory
+        # Apply the performance profile to every pooled connection (SQLite only)
+        self.sqlite_profile, self.sqlite_pragmas = resolve_profile(sqlite_profile)
+        if self.backend == 'sqlite':
+            install_pragmas(self.engine, self.sqlite_pragmas)
+            install_text_functions(self.engine)
+        
+        # Create session factory (the writer path)
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        
+        # Separate read-only pool so readers never queue behind upload transactions
+        self.read_engine = self._create_read_engine()
+        self.ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.read_engine)
+    
+    def _create_read_engine(self):
+        """
+        Read-only engine over the same database (SQLite: mode=ro URI plus
+        query_only; PostgreSQL: read-only transactions by default)
+        Falls back to the writer engine for in-memory databases
+        """
+        if not self.pool_options:
+            return self.engine
+        
+        if self.backend == 'postgresql':
+            return create_engine(
+                self.database_url,
+                echo=False,
+                connect_args={'options': '-c default_transaction_read_only=on'},
+                **self.pool_options
+            )
+        
+        database_path = Path(self.database_url[len('sqlite:///'):]).resolve()
+        read_engine = create_engine(
+            f'sqlite:///{database_path.as_uri()}?mode=ro&uri=true',
+            echo=False,
+            connect_args={'check_same_thread': False},
+            **self.pool_options
+        )
+        
+        # journal_mode is a property of the file, set by the writer
+        read_pragmas = {name: value for name, value in self.sqlite_pragmas.items() if name != 'journal_mode'}
+        read_pragmas['query_only'] = 'ON'
+        install_pragmas(read_engine, read_pragmas)
+        install_text_functions(read_engine)
+        return read_engine
     
     def create_tables(self):
         """Create all database tables"""
@@ -59,10 +138,86 @@ class DatabaseManager:
             print(f"❌ Error dropping tables: {e}")
             return False
     
+    def run_migrations(self):
+        """Bring an existing database up to the current schema"""
+        if not MIGRATIONS_AVAILABLE:
+            print("⚠️ Migration module not available, skipping schema upgrades")
+            return False
+        
+        print("🔄 Checking for required migrations...")
+        if not DatabaseMigration(self.engine).migrate():
+            print("⚠️ Migration failed, but basic tables created successfully")
+            return False
+        return True
+    
     def get_session(self):
         """Get a new database session"""
         return self.SessionLocal()
     
+    def get_read_session(self):
+        """Get a new session on the read-only pool (for GET routes)"""
+        return self.ReadSessionLocal()
+    
+    def get_change_generation(self):
+        """Current catalog change generation, read without going through the ORM"""
+        with self.read_engine.connect() as connection:
+            return read_generation(connection)
+    
+    def get_pool_status(self):
+        """Current usage of the writer and reader pools, for health checks"""
+        pools = {'writer': self.engine.pool}
+        if self.read_engine is not self.engine:
+            pools['reader'] = self.read_engine.pool
+        
+        status = {}
+        for name, pool in pools.items():
+            status[name] = {'class': type(pool).__name__}
+            if hasattr(pool, 'checkedout'):
+                status[name].update({
+                    'size': pool.size(),
+                    'checked_out': pool.checkedout(),
+                    'overflow': pool.overflow(),
+                    'max_overflow': self.pool_options.get('max_overflow'),
+                    'timeout': self.pool_options.get('pool_timeout')
+                })
+        return status
+    
+    def dispose(self, close=True):
+        """
+        Close every pooled connection (writer and reader)
+        In a forked worker pass close=False: the inherited connections are
+        dropped without closing the parent's file handles, and new ones open
+        on first use.
+        """
+        self.engine.dispose(close=close)
+        if self.read_engine is not self.engine:
+            self.read_engine.dispose(close=close)
+    
+    def get_effective_pragmas(self):
+        """PRAGMA values as seen by a pooled connection (empty on PostgreSQL)"""
+        if self.backend != 'sqlite':
+            return {}
+        with self.engine.connect() as connection:
+            return read_pragmas(connection.connection.dbapi_connection)
+    
+    def report_pragmas(self):
+        """Print the SQLite profile and the PRAGMAs actually in effect"""
+        if self.backend == 'postgresql':
+            with self.engine.connect() as connection:
+                version = connection.execute(text("SHOW server_version")).scalar()
+            print(f"🐘 PostgreSQL {version} at {make_url(self.database_url).render_as_string(hide_password=True)}")
+            return {}
+        
+        pragmas = self.get_effective_pragmas()
+        print(f"⚙️ SQLite profile '{self.sqlite_profile}': " +
+              ', '.join(f'{name}={value}' for name, value in pragmas.items()))
+        
+        # journal_mode can silently stay put (e.g. WAL on a network filesystem)
+        requested = self.sqlite_pragmas.get('journal_mode')
+        if requested and str(pragmas['journal_mode']).upper() != requested.upper():
+            print(f"⚠️ Requested journal_mode={requested} but the database is using {pragmas['journal_mode']}")
+        return pragmas
+    
     def init_database(self, with_sample_data=False):
         """Initialize database with tables and optional sample data"""
         print("🚀 Initializing Teaching Content Database...")
@@ -71,14 +226,8 @@ class DatabaseManager:
         if not self.create_tables():
             return False
         
-        # Run auto-categorization migrations if available (Step 1.2)
-        if MIGRATIONS_AVAILABLE:
-            print("🔄 Checking for required migrations...")
-            migration = DatabaseMigration(self.database_url.replace('sqlite:///', ''))
-            if not migration.add_auto_categorization_columns():
-                print("⚠️ Migration failed, but basic tables created successfully")
-        else:
-            print("⚠️ Migration module not available, skipping auto-categorization setup")
+        # Run schema migrations if available (Step 1.2 onwards)
+        self.run_migrations()
         
         # Add sample data if requested (now defaults to False for production)
         if with_sample_data:
@@ -0,0 +1,108 @@
+"""
+Faceted search counts for Teaching Content Database
+
+Computes per-value counts for every facet in one grouped UNION ALL query.
+Each facet is counted with all active filters except its own, so the
+counts show how many items each alternative value would give.
+"""
+
+from sqlalchemy import select, func, literal, union_all, cast, String
+
+from .models import Content, Tag, content_tags
+
+# Facets backed by a plain column on the content table
+COLUMN_FACETS = {
+    'subject': Content.subject,
+    'grade_level': Content.grade_level,
+    'difficulty_level': Content.difficulty_level,
+    'status': Content.status,
+}
+
+FACET_NAMES = list(COLUMN_FACETS) + ['tags']
+
+
+def parse_facet_filters(args):
+    """
+    Read facet filters from request args
+    Every facet accepts repeated params and/or comma-separated values;
+    tags are tag ids and match content carrying any of them
+    """
+    filters = {}
+    for name in FACET_NAMES:
+        values = []
+        for raw in args.getlist(name):
+            values.extend(value.strip() for value in raw.split(',') if value.strip())
+        if not values:
+            continue
+        if name == 'tags':
+            try:
+                values = [int(value) for value in values]
+            except ValueError:
+                raise ValueError('tags must be a comma-separated list of tag ids')
+        filters[name] = values
+    return filters
+
+
+def _filter_conditions(filters, exclude=None):
+    """WHERE conditions for the active filters, skipping the facet being counted"""
+    conditions = []
+    for name, values in filters.items():
+        if name == exclude:
+            continue
+        if name == 'tags':
+            tagged = select(content_tags.c.content_id).where(content_tags.c.tag_id.in_(values))
+            conditions.append(Content.id.in_(tagged))
+        else:
+            conditions.append(COLUMN_FACETS[name].in_(values))
+    return conditions
+
+
+def build_facet_query(filters):
+    """Single statement yielding (facet, value, label, color, count) rows"""
+    branches = [
+        # Total matching the full filter set
+        select(literal('_total').label('facet'), literal(None, String).label('value'),
+               literal(None, String).label('label'), literal(None, String).label('color'),
+               func.count(Content.id).label('count'))
+        .where(*_filter_conditions(filters))
+    ]
+
+    for name, column in COLUMN_FACETS.items():
+        branches.append(
+            select(literal(name).label('facet'), cast(column, String).label('value'),
+                   cast(column, String).label('label'), literal(None, String).label('color'),
+                   func.count(Content.id).label('count'))
+            .where(*_filter_conditions(filters, exclude=name))
+            .group_by(column)
+        )
+
+    branches.append(
+        select(literal('tags').label('facet'), cast(Tag.id, String).label('value'),
+               Tag.name.label('label'), Tag.color.label('color'),
+               func.count(Content.id).label('count'))
+        .select_from(Content)
+        .join(content_tags, content_tags.c.content_id == Content.id)
+        .join(Tag, Tag.id == content_tags.c.tag_id)
+        .where(*_filter_conditions(filters, exclude='tags'))
+        .group_by(Tag.id, Tag.name, Tag.color)
+    )
+
+    return union_all(*branches)
+
+
+def compute_facets(connection, filters):
+    """Return (total, facets) for the given filter set"""
+    facets = {name: [] for name in FACET_NAMES}
+    total = 0
+
+    for facet, value, label, color, count in connection.execute(build_facet_query(filters)):
+        if facet == '_total':
+            total = count
+        elif facet == 'tags':
+            facets['tags'].append({'id': int(value), 'name': label, 'color': color, 'count': count})
+        else:
+            facets[facet].append({'value': value, 'count': count})
+
+    for values in facets.values():
+        values.sort(key=lambda item: (-item['count'], str(item.get('value', item.get('name')))))
+    return total, facets
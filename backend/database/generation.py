@@ -0,0 +1,107 @@
+"""
+Change generation counter for Teaching Content Database
+
+A single-row table whose value is bumped by triggers on every write to the
+catalog tables. Readers compare generations to know whether anything has
+changed (ETags, response caches) without querying the catalog itself. The
+same counter numbers content writes and deletions for incremental sync.
+"""
+
+from sqlalchemy import text
+
+GENERATION_TABLE = 'change_generation'
+
+# Tables whose writes invalidate cached catalog reads
+WATCHED_TABLES = ['content', 'tags', 'categories', 'content_tags', 'content_texts']
+
+CREATE_GENERATION_TABLE = f"""
+CREATE TABLE IF NOT EXISTS {GENERATION_TABLE} (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    generation INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+SEED_GENERATION = f"INSERT INTO {GENERATION_TABLE} (id, generation) VALUES (1, 0) ON CONFLICT (id) DO NOTHING"
+
+_BUMP = f"UPDATE {GENERATION_TABLE} SET generation = generation + 1 WHERE id = 1;"
+
+GENERATION_TRIGGERS = {
+    f'{table}_generation_{suffix}': f"""
+CREATE TRIGGER IF NOT EXISTS {table}_generation_{suffix} AFTER {event} ON {table} BEGIN
+    {_BUMP}
+END
+"""
+    for table in WATCHED_TABLES
+    for event, suffix in (('INSERT', 'ai'), ('UPDATE', 'au'), ('DELETE', 'ad'))
+}
+
+# PostgreSQL: one statement-level trigger per table sharing a plpgsql function
+PG_GENERATION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION bump_change_generation() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    {_BUMP}
+    RETURN NULL;
+END
+$$
+"""
+
+PG_GENERATION_TRIGGERS = {
+    f'{table}_generation': [
+        f"DROP TRIGGER IF EXISTS {table}_generation ON {table}",
+        f"CREATE TRIGGER {table}_generation AFTER INSERT OR UPDATE OR DELETE ON {table} "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_change_generation()",
+    ]
+    for table in WATCHED_TABLES
+}
+
+# Incremental sync keys content rows and tombstones on a change sequence
+# number: every insert or update bumps the counter and stamps the row with
+# the new value. Bumping takes the database write lock (SQLite) or locks the
+# counter row until commit (PostgreSQL), so numbers are handed out in commit
+# order - once a reader sees number N, no row stamped below N can still
+# appear. Wall-clock timestamps give no such guarantee.
+CHANGE_SEQ_COLUMN = 'change_seq'
+SEQUENCED_TABLES = ['content', 'content_tombstones']
+
+_STAMP = f"UPDATE {{table}} SET {CHANGE_SEQ_COLUMN} = (SELECT generation FROM {GENERATION_TABLE} WHERE id = 1) WHERE id = new.id;"
+
+# The stamping UPDATE changes change_seq, so it does not stamp the row again
+CHANGE_SEQ_TRIGGERS = {
+    f'{table}_change_seq_{suffix}': f"""
+CREATE TRIGGER IF NOT EXISTS {table}_change_seq_{suffix} AFTER {event} ON {table}{condition} BEGIN
+    {_BUMP}
+    {_STAMP.format(table=table)}
+END
+"""
+    for table in SEQUENCED_TABLES
+    for event, suffix, condition in (
+        ('INSERT', 'ai', ''),
+        ('UPDATE', 'au', f' WHEN new.{CHANGE_SEQ_COLUMN} IS old.{CHANGE_SEQ_COLUMN}'),
+    )
+}
+
+PG_CHANGE_SEQ_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION stamp_change_seq() RETURNS trigger LANGUAGE plpgsql AS $$
+BEGIN
+    UPDATE {GENERATION_TABLE} SET generation = generation + 1 WHERE id = 1
+    RETURNING generation INTO NEW.{CHANGE_SEQ_COLUMN};
+    RETURN NEW;
+END
+$$
+"""
+
+PG_CHANGE_SEQ_TRIGGERS = {
+    f'{table}_change_seq': [
+        f"DROP TRIGGER IF EXISTS {table}_change_seq ON {table}",
+        f"CREATE TRIGGER {table}_change_seq BEFORE INSERT OR UPDATE ON {table} "
+        "FOR EACH ROW EXECUTE FUNCTION stamp_change_seq()",
+    ]
+    for table in SEQUENCED_TABLES
+}
+
+READ_GENERATION = f"SELECT generation FROM {GENERATION_TABLE} WHERE id = 1"
+
+
+def read_generation(connection):
+    """Current change generation (0 if the counter row is missing)"""
+    return connection.execute(text(READ_GENERATION)).scalar() or 0
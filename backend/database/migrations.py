@@ -1,219 +1,589 @@
 """
 Database migration utilities for Teaching Content Database
 
-Handles safe schema upgrades and data integrity during database evolution.
+Versioned schema upgrades. Every migration is registered in MIGRATIONS with
+an increasing version number; the versions already applied are recorded in
+the `schema_version` table. Pending migrations run together in one
+transaction, so an upgrade either lands completely or not at all.
+
+Row-by-row data changes on large tables are declared as backfills instead of
+running inside that transaction. A backfill walks its table in id ranges,
+committing after every batch and recording how far it got in
+`schema_backfills`, so other writers are only locked out for one batch at a
+time and an interrupted upgrade resumes where it stopped. A migration that
+needs a backfill finished first (e.g. to drop the column it copies from)
+names it in `after_backfills` and is held back, together with every later
+migration, until it has completed.
+
+The same registry upgrades SQLite and PostgreSQL databases; migrations that
+need backend-specific DDL branch on `is_postgresql(connection)`.
 """
 
-import sqlite3
-from pathlib import Path
-from sqlalchemy import create_engine, text
-from sqlalchemy.exc import SQLAlchemyError
 import logging
+import time
+from datetime import datetime
+from typing import Callable, List, NamedTuple, Sequence, Union
+
+from sqlalchemy import bindparam, create_engine, insert, inspect, text
+
+from .texts import install_text_functions
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SCHEMA_VERSION_TABLE = 'schema_version'
+BACKFILLS_TABLE = 'schema_backfills'
+
+# Rows per backfill transaction
+BACKFILL_BATCH_SIZE = 500
+
+# pg_advisory_xact_lock key serializing migrations across PostgreSQL clients
+PG_MIGRATION_LOCK = 7_001_001
+
+
+class Backfill(NamedTuple):
+    """
+    Batched data change over `table`, walked in ranges of its integer `id`
+    `batch` is an SQL statement with :after and :until bind parameters, or a
+    callable(connection, after, until) for changes that need Python.
+    """
+    name: str
+    table: str
+    batch: Union[str, Callable]
+
+
+class Migration(NamedTuple):
+    version: int
+    name: str
+    upgrade: Callable
+    backfills: Sequence[Backfill] = ()
+    after_backfills: Sequence[str] = ()
+
+
+# Ordered registry of every schema change
+MIGRATIONS: List[Migration] = []
+
+
+def migration(version, name, backfills=(), after_backfills=()):
+    """Register the decorated function(connection) as schema version `version`"""
+    def register(upgrade):
+        if MIGRATIONS and version <= MIGRATIONS[-1].version:
+            raise ValueError(f"Migration {version} ({name}) is out of order")
+        MIGRATIONS.append(Migration(version, name, upgrade, tuple(backfills), tuple(after_backfills)))
+        return upgrade
+    return register
+
+
+# Schema introspection on the migration's own connection
+
+def is_postgresql(connection):
+    return connection.dialect.name == 'postgresql'
+
+
+def column_exists(connection, table_name, column_name):
+    """Check if a column exists in a table"""
+    return column_name in [column['name'] for column in inspect(connection).get_columns(table_name)]
+
+
+_PG_OBJECT_QUERIES = {
+    'table': "SELECT 1 FROM pg_class WHERE relname = :name AND relkind IN ('r', 'p') "
+             "AND relnamespace = current_schema()::regnamespace",
+    'index': "SELECT 1 FROM pg_class WHERE relname = :name AND relkind = 'i' "
+             "AND relnamespace = current_schema()::regnamespace",
+    'trigger': "SELECT 1 FROM pg_trigger t JOIN pg_class c ON c.oid = t.tgrelid "
+               "WHERE t.tgname = :name AND NOT t.tgisinternal "
+               "AND c.relnamespace = current_schema()::regnamespace",
+}
+
+
+def schema_object_exists(connection, object_type, name):
+    """Check if a table, index or trigger exists"""
+    if is_postgresql(connection):
+        return connection.execute(text(_PG_OBJECT_QUERIES[object_type]), {'name': name}).first() is not None
+    return connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = :type AND name = :name"),
+        {'type': object_type, 'name': name}
+    ).first() is not None
+
+
+def add_columns(connection, table_name, columns):
+    """Add the columns that are missing; returns the names added"""
+    added = []
+    for column_name, column_def in columns:
+        if not column_exists(connection, table_name, column_name):
+            connection.exec_driver_sql(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {column_def}")
+            added.append(column_name)
+    return added
+
+
+# Migrations
+
+@migration(1, 'auto_categorization_columns')
+def add_auto_categorization_columns(connection):
+    """Auto-categorization columns and indexes (Step 1.2)"""
+    postgresql = is_postgresql(connection)
+    add_columns(connection, 'content', [
+        ('auto_categorized', 'BOOLEAN DEFAULT FALSE'),
+        ('categorization_confidence', 'NUMERIC' if postgresql else 'REAL'),  # SQLite uses REAL for floating point
+        ('suggested_tags', 'TEXT')
+    ])
+    if postgresql:
+        # Partial indexes: only the auto-categorized rows are ever looked up
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS idx_content_auto_categorized ON content(id) WHERE auto_categorized")
+        connection.exec_driver_sql(
+            "CREATE INDEX IF NOT EXISTS idx_content_confidence ON content(categorization_confidence) "
+            "WHERE auto_categorized")
+        return
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_content_auto_categorized ON content(auto_categorized)")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_content_confidence ON content(categorization_confidence)")
+
+
+@migration(2, 'auto_processing_columns')
+def add_auto_processing_columns(connection):
+    """Auto-processing tracking columns (Task 2.2)"""
+    add_columns(connection, 'content', [
+        ('auto_processed', 'BOOLEAN DEFAULT FALSE'),
+        ('generated_metadata', 'TEXT')  # JSON of what was auto-generated
+    ])
+
+
+@migration(3, 'performance_indexes', backfills=[
+    # Rows written before date_modified was maintained sort as if never modified
+    Backfill('content_date_modified', 'content',
+             "UPDATE content SET date_modified = date_created "
+             "WHERE id > :after AND id <= :until AND date_modified IS NULL"),
+])
+def add_performance_indexes(connection):
+    """Composite indexes used by keyset pagination and incremental sync"""
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_content_created_id ON content(date_created, id)")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS idx_content_modified_id ON content(date_modified, id)")
+
+
+@migration(4, 'search_index')
+def add_search_index(connection):
+    """FTS5 search index and its sync triggers, indexing existing content"""
+    from .models import ContentText
+    from .search import (
+        FTS_TABLE, CREATE_FTS_SOURCE_VIEW, CREATE_FTS_TABLE, FTS_TRIGGERS, REBUILD_FTS_INDEX,
+        PG_SEARCH_DDL, PG_REBUILD_SEARCH
+    )
+
+    # The index covers the extracted text kept in content_texts
+    ContentText.__table__.create(connection, checkfirst=True)
+
+    if is_postgresql(connection):
+        # Trigger-maintained tsvector column plus a GIN index, filled for existing rows
+        for statement in PG_SEARCH_DDL:
+            connection.exec_driver_sql(statement)
+        connection.exec_driver_sql(PG_REBUILD_SEARCH)
+        return
+
+    index_exists = schema_object_exists(connection, 'table', FTS_TABLE)
+    connection.exec_driver_sql(CREATE_FTS_SOURCE_VIEW)
+    connection.exec_driver_sql(CREATE_FTS_TABLE)
+    for trigger_sql in FTS_TRIGGERS.values():
+        connection.exec_driver_sql(trigger_sql)
+
+    if not index_exists:
+        # One pass over the external content; the update/delete triggers
+        # assume every row is already indexed, so this cannot be batched
+        connection.exec_driver_sql(REBUILD_FTS_INDEX)
+
+
+@migration(5, 'change_generation')
+def add_change_generation(connection):
+    """Change generation counter and the triggers that bump it"""
+    from .generation import (
+        CREATE_GENERATION_TABLE, SEED_GENERATION, GENERATION_TRIGGERS,
+        PG_GENERATION_FUNCTION, PG_GENERATION_TRIGGERS
+    )
+
+    connection.exec_driver_sql(CREATE_GENERATION_TABLE)
+    connection.exec_driver_sql(SEED_GENERATION)
+    if is_postgresql(connection):
+        connection.exec_driver_sql(PG_GENERATION_FUNCTION)
+        for statements in PG_GENERATION_TRIGGERS.values():
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+        return
+    for trigger_sql in GENERATION_TRIGGERS.values():
+        connection.exec_driver_sql(trigger_sql)
+
+
+@migration(6, 'content_counters')
+def add_content_counters(connection):
+    """Counter triggers, rebuilding the counts when they are first added"""
+    from .counters import (
+        COUNTERS_TABLE, COUNTER_TRIGGERS, REBUILD_COUNTERS, PG_COUNTER_TRIGGERS, pg_counter_trigger_ddl
+    )
+
+    postgresql = is_postgresql(connection)
+    triggers = PG_COUNTER_TRIGGERS if postgresql else COUNTER_TRIGGERS
+    missing_triggers = [name for name in triggers
+                        if not schema_object_exists(connection, 'trigger', name)]
+    connection.exec_driver_sql(f"""
+        CREATE TABLE IF NOT EXISTS {COUNTERS_TABLE} (
+            kind VARCHAR(20) NOT NULL,
+            key VARCHAR(255) NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, key)
+        )
+    """)
+    if postgresql:
+        for name in PG_COUNTER_TRIGGERS:
+            for statement in pg_counter_trigger_ddl(name):
+                connection.exec_driver_sql(statement)
+    else:
+        for trigger_sql in COUNTER_TRIGGERS.values():
+            connection.exec_driver_sql(trigger_sql)
+
+    if missing_triggers:
+        # Counts may have drifted while the triggers were absent
+        for statement in REBUILD_COUNTERS:
+            connection.exec_driver_sql(statement)
+
+
+def copy_content_texts(connection, after, until):
+    """Copy extracted text from the old content.content column into content_texts"""
+    from .models import ContentText
+
+    # Text the app has written since the upgrade is newer than the column's
+    rows = connection.execute(text(
+        "SELECT c.id, c.content FROM content c "
+        "WHERE c.id > :after AND c.id <= :until AND c.content IS NOT NULL AND c.content <> '' "
+        "AND NOT EXISTS (SELECT 1 FROM content_texts t WHERE t.content_id = c.id)"
+    ), {'after': after, 'until': until}).all()
+    if rows:
+        connection.execute(insert(ContentText), [{'content_id': row[0], 'body': row[1]} for row in rows])
+
+
+@migration(7, 'content_texts', backfills=[
+    Backfill('content_texts', 'content', copy_content_texts),
+])
+def move_content_texts(connection):
+    """
+    Extracted text moves from content.content to the compressed content_texts table
+    The copy is a backfill (compressing in Python on SQLite); the old column
+    stays until it has finished and is dropped by migration 11. The search
+    index, which read the old column, is rebuilt over the new table and
+    picks up each copied text through its triggers.
+    """
+    from .generation import GENERATION_TRIGGERS, PG_GENERATION_TRIGGERS
+    from .models import ContentText
+    from .search import DROP_FTS_INDEX, PG_DROP_SEARCH
+    from .texts import TEXT_TRIGGERS
+
+    postgresql = is_postgresql(connection)
+    ContentText.__table__.create(connection, checkfirst=True)
+    for statement in PG_DROP_SEARCH if postgresql else DROP_FTS_INDEX:
+        connection.exec_driver_sql(statement)
+
+    # Text edits invalidate cached catalog reads like any other catalog write
+    if postgresql:
+        for statement in PG_GENERATION_TRIGGERS['content_texts_generation']:
+            connection.exec_driver_sql(statement)
+    else:
+        for name, trigger_sql in GENERATION_TRIGGERS.items():
+            if name.startswith('content_texts_'):
+                connection.exec_driver_sql(trigger_sql)
+        for trigger_sql in TEXT_TRIGGERS.values():
+            connection.exec_driver_sql(trigger_sql)
+
+    add_search_index(connection)
+
+
+@migration(8, 'upload_blobs')
+def add_upload_blobs(connection):
+    """Content hash column and the blob reference counts kept by triggers on content"""
+    from .blobs import BLOB_TRIGGERS, PG_BLOB_TRIGGER, REBUILD_BLOBS
+    from .models import Blob
+
+    postgresql = is_postgresql(connection)
+    add_columns(connection, 'content', [('file_hash', 'VARCHAR(64)')])
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS ix_content_file_hash ON content(file_hash)")
+    Blob.__table__.create(connection, checkfirst=True)
+
+    if postgresql:
+        for statement in PG_BLOB_TRIGGER:
+            connection.exec_driver_sql(statement)
+    else:
+        for trigger_sql in BLOB_TRIGGERS.values():
+            connection.exec_driver_sql(trigger_sql)
+
+    # Counts hashes already recorded (e.g. by create_all on a fresh database)
+    for statement in REBUILD_BLOBS:
+        connection.exec_driver_sql(statement)
+
+
+@migration(9, 'upload_jobs')
+def add_upload_jobs(connection):
+    """Persistent queue of auto-uploads processed by the background worker pool"""
+    from .models import UploadJob
+
+    UploadJob.__table__.create(connection, checkfirst=True)
+
+
+@migration(10, 'change_sequence', backfills=[
+    # A no-op update stamps existing rows through the change_seq triggers, so
+    # each batch is numbered after everything committed before it
+    Backfill('content_change_seq', 'content',
+             "UPDATE content SET date_modified = date_modified "
+             "WHERE id > :after AND id <= :until AND change_seq IS NULL"),
+    Backfill('content_tombstones_change_seq', 'content_tombstones',
+             "UPDATE content_tombstones SET date_deleted = date_deleted "
+             "WHERE id > :after AND id <= :until AND change_seq IS NULL"),
+])
+def add_change_sequence(connection):
+    """Commit-ordered change numbers for incremental sync, replacing date_modified as its key"""
+    from .generation import CHANGE_SEQ_TRIGGERS, PG_CHANGE_SEQ_FUNCTION, PG_CHANGE_SEQ_TRIGGERS
+
+    add_columns(connection, 'content', [('change_seq', 'INTEGER')])
+    add_columns(connection, 'content_tombstones', [('change_seq', 'INTEGER')])
+    connection.exec_driver_sql("CREATE INDEX IF NOT EXISTS idx_content_change_seq ON content(change_seq)")
+    connection.exec_driver_sql(
+        "CREATE INDEX IF NOT EXISTS ix_content_tombstones_change_seq ON content_tombstones(change_seq)")
+    connection.exec_driver_sql("DROP INDEX IF EXISTS idx_content_modified_id")
+
+    if is_postgresql(connection):
+        connection.exec_driver_sql(PG_CHANGE_SEQ_FUNCTION)
+        for statements in PG_CHANGE_SEQ_TRIGGERS.values():
+            for statement in statements:
+                connection.exec_driver_sql(statement)
+        return
+    for trigger_sql in CHANGE_SEQ_TRIGGERS.values():
+        connection.exec_driver_sql(trigger_sql)
+
+
+@migration(11, 'drop_content_column', after_backfills=['content_texts'])
+def drop_content_column(connection):
+    """Drop content.content once its text has been copied to content_texts"""
+    if column_exists(connection, 'content', 'content'):
+        connection.exec_driver_sql("ALTER TABLE content DROP COLUMN content")
+
+
 class DatabaseMigration:
-    """Handles database schema migrations"""
-    
-    def __init__(self, database_path=None):
-        if database_path is None:
-            # Use default database path
-            project_root = Path(__file__).parent.parent.parent
-            database_path = project_root / 'teaching_content.db'
-        
-        self.database_path = database_path
-        self.database_url = f'sqlite:///{database_path}'
-        
-    def check_column_exists(self, table_name, column_name):
-        """Check if a column exists in a table"""
-        try:
-            with sqlite3.connect(self.database_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(f"PRAGMA table_info({table_name})")
-                columns = [row[1] for row in cursor.fetchall()]
-                return column_name in columns
-        except sqlite3.Error as e:
-            logger.error(f"Error checking column existence: {e}")
-            return False
-    
-    def check_index_exists(self, index_name):
-        """Check if an index exists"""
-        try:
-            with sqlite3.connect(self.database_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='index' AND name=?", (index_name,))
-                return cursor.fetchone() is not None
-        except sqlite3.Error as e:
-            logger.error(f"Error checking index existence: {e}")
+    """Applies pending migrations and runs their backfills"""
+
+    def __init__(self, engine):
+        """`engine` is a SQLAlchemy engine or a database URL"""
+        self.engine = create_engine(engine) if isinstance(engine, str) else engine
+        # The SQLite search index decompresses text through inflate_text()
+        install_text_functions(self.engine)
+
+    def _connect(self):
+        # Transactions are issued by hand (see _begin): pysqlite would
+        # otherwise run DDL outside any transaction
+        return self.engine.connect().execution_options(isolation_level='AUTOCOMMIT')
+
+    @staticmethod
+    def _begin(connection):
+        """Open a transaction holding the migration lock, so concurrent workers take turns"""
+        if is_postgresql(connection):
+            connection.exec_driver_sql("BEGIN")
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {'key': PG_MIGRATION_LOCK})
+        else:
+            # Takes the database write lock up front
+            connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+    def _ensure_bookkeeping(self, connection):
+        connection.exec_driver_sql(f"""
+            CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                applied_at TIMESTAMP NOT NULL
+            )
+        """)
+        connection.exec_driver_sql(f"""
+            CREATE TABLE IF NOT EXISTS {BACKFILLS_TABLE} (
+                name VARCHAR(100) PRIMARY KEY,
+                version INTEGER NOT NULL,
+                last_id INTEGER NOT NULL DEFAULT 0,
+                max_id INTEGER NOT NULL DEFAULT 0,
+                completed_at TIMESTAMP
+            )
+        """)
+
+    def current_version(self, connection):
+        """Highest applied schema version (0 for a database that predates versioning)"""
+        return connection.exec_driver_sql(
+            f"SELECT COALESCE(MAX(version), 0) FROM {SCHEMA_VERSION_TABLE}"
+        ).scalar()
+
+    def migrate(self, batch_size=BACKFILL_BATCH_SIZE, pause=0.0):
+        """
+        Apply every pending migration in one transaction, then run outstanding backfills
+        Migrations held back for a backfill are applied in another round once
+        the backfills have run.
+        """
+        logger.info("🔄 Checking schema version...")
+        held_back = None
+
+        while True:
+            try:
+                applied, waiting = self._apply_pending()
+            except Exception as e:
+                logger.error(f"💥 Migration failed, schema left unchanged: {e}")
+                return False
+
+            if not self.run_backfills(batch_size, pause):
+                return False
+            if waiting is None:
+                return True
+            if not applied and waiting == held_back:
+                logger.error(f"💥 Migration {waiting.version} ({waiting.name}) is still waiting for backfills "
+                             f"{', '.join(waiting.after_backfills)}")
+                return False
+            held_back = waiting
+
+    def _apply_pending(self):
+        """
+        Apply pending migrations up to the first one waiting for a backfill
+        Returns (migrations applied, the migration held back or None).
+        """
+        with self._connect() as connection:
+            self._ensure_bookkeeping(connection)
+
+            self._begin(connection)
+            try:
+                # Read under the migration lock - another process may have just upgraded
+                current = self.current_version(connection)
+                applied, waiting = [], None
+
+                for m in [m for m in MIGRATIONS if m.version > current]:
+                    if self._backfills_outstanding(connection, m.after_backfills):
+                        waiting = m
+                        break
+                    logger.info(f"⬆️ Applying migration {m.version}: {m.name}")
+                    m.upgrade(connection)
+                    self._record(connection, m)
+                    applied.append(m)
+
+                connection.exec_driver_sql("COMMIT")
+            except Exception:
+                connection.exec_driver_sql("ROLLBACK")
+                raise
+
+        if applied:
+            logger.info(f"🎉 Schema upgraded from version {current} to {applied[-1].version}")
+        elif waiting is None:
+            logger.info(f"✅ Schema up to date (version {current})")
+        if waiting is not None:
+            logger.info(f"⏸️ Migration {waiting.version} ({waiting.name}) waits for backfills "
+                        f"{', '.join(waiting.after_backfills)}")
+        return applied, waiting
+
+    @staticmethod
+    def _backfills_outstanding(connection, names):
+        """Whether any of the named backfills is queued and not yet complete"""
+        if not names:
             return False
-    
-    def add_auto_categorization_columns(self):
-        """Add auto-categorization columns to content table (Step 1.2)"""
-        logger.info("🔄 Starting auto-categorization schema migration...")
-        
+        return connection.execute(
+            text(f"SELECT 1 FROM {BACKFILLS_TABLE} WHERE completed_at IS NULL AND name IN :names")
+            .bindparams(bindparam('names', expanding=True)),
+            {'names': list(names)}
+        ).first() is not None
+
+    def _record(self, connection, m):
+        """Mark a migration applied and queue its backfills"""
+        now = datetime.utcnow()
+        connection.execute(
+            text(f"INSERT INTO {SCHEMA_VERSION_TABLE} (version, name, applied_at) VALUES (:version, :name, :now)"),
+            {'version': m.version, 'name': m.name, 'now': now}
+        )
+        for backfill in m.backfills:
+            # Rows inserted from now on are written correctly by the app
+            max_id = connection.exec_driver_sql(f"SELECT COALESCE(MAX(id), 0) FROM {backfill.table}").scalar()
+            connection.execute(
+                text(f"INSERT INTO {BACKFILLS_TABLE} (name, version, max_id) "
+                     "VALUES (:name, :version, :max_id) ON CONFLICT (name) DO NOTHING"),
+                {'name': backfill.name, 'version': m.version, 'max_id': max_id}
+            )
+
+    def run_backfills(self, batch_size=BACKFILL_BATCH_SIZE, pause=0.0):
+        """
+        Run outstanding backfills batch by batch, resuming from recorded progress
+        `pause` sleeps between batches to leave room for other writers.
+        """
+        backfills = {b.name: b for m in MIGRATIONS for b in m.backfills}
+
         try:
-            engine = create_engine(self.database_url)
-            
-            with engine.connect() as connection:
-                # Check if columns already exist
-                columns_to_add = [
-                    ('auto_categorized', 'BOOLEAN DEFAULT FALSE'),
-                    ('categorization_confidence', 'REAL'),  # SQLite uses REAL for floating point
-                    ('suggested_tags', 'TEXT')
-                ]
-                
-                columns_added = []
-                
-                for column_name, column_def in columns_to_add:
-                    if not self.check_column_exists('content', column_name):
-                        try:
-                            sql = f"ALTER TABLE content ADD COLUMN {column_name} {column_def}"
-                            connection.execute(text(sql))
-                            columns_added.append(column_name)
-                            logger.info(f"✅ Added column: {column_name}")
-                        except SQLAlchemyError as e:
-                            logger.error(f"❌ Failed to add column {column_name}: {e}")
-                            raise
-                    else:
-                        logger.info(f"⚠️ Column {column_name} already exists, skipping")
-                
-                # Add performance indexes
-                indexes_to_create = [
-                    ('idx_content_auto_categorized', 'content', 'auto_categorized'),
-                    ('idx_content_confidence', 'content', 'categorization_confidence')
-                ]
-                
-                indexes_added = []
-                
-                for index_name, table_name, column_name in indexes_to_create:
-                    if not self.check_index_exists(index_name):
+            with self._connect() as connection:
+                outstanding = connection.exec_driver_sql(
+                    f"SELECT name, last_id, max_id FROM {BACKFILLS_TABLE} "
+                    "WHERE completed_at IS NULL ORDER BY version, name"
+                ).fetchall()
+
+                for name, last_id, max_id in outstanding:
+                    backfill = backfills.get(name)
+                    if backfill is None:
+                        logger.warning(f"⚠️ Unknown backfill {name} recorded in {BACKFILLS_TABLE}, skipping")
+                        continue
+
+                    logger.info(f"🔄 Backfill {name}: resuming after id {last_id} of {max_id}")
+                    while last_id < max_id:
+                        self._begin(connection)
                         try:
-                            sql = f"CREATE INDEX {index_name} ON {table_name}({column_name})"
-                            connection.execute(text(sql))
-                            indexes_added.append(index_name)
-                            logger.info(f"✅ Created index: {index_name}")
-                        except SQLAlchemyError as e:
-                            logger.error(f"❌ Failed to create index {index_name}: {e}")
+                            # Another worker may be running the same backfill
+                            last_id = connection.execute(
+                                text(f"SELECT last_id FROM {BACKFILLS_TABLE} WHERE name = :name"), {'name': name}
+                            ).scalar()
+                            until = min(last_id + batch_size, max_id)
+                            if last_id < max_id:
+                                self._run_batch(connection, backfill, last_id, until)
+                                connection.execute(
+                                    text(f"UPDATE {BACKFILLS_TABLE} SET last_id = :until WHERE name = :name"),
+                                    {'until': until, 'name': name}
+                                )
+                            connection.exec_driver_sql("COMMIT")
+                        except Exception:
+                            connection.exec_driver_sql("ROLLBACK")
                             raise
-                    else:
-                        logger.info(f"⚠️ Index {index_name} already exists, skipping")
-                
-                connection.commit()
-                
-                # Summary
-                if columns_added or indexes_added:
-                    logger.info("🎉 Auto-categorization migration completed successfully!")
-                    if columns_added:
-                        logger.info(f"   📊 Columns added: {', '.join(columns_added)}")
-                    if indexes_added:
-                        logger.info(f"   🔍 Indexes created: {', '.join(indexes_added)}")
-                else:
-                    logger.info("✅ Database already up to date with auto-categorization schema")
-                
+                        last_id = until
+                        if pause:
+                            time.sleep(pause)
+
+                    connection.execute(
+                        text(f"UPDATE {BACKFILLS_TABLE} SET completed_at = :now WHERE name = :name"),
+                        {'now': datetime.utcnow(), 'name': name}
+                    )
+                    logger.info(f"✅ Backfill {name} complete")
+
                 return True
-                
+
         except Exception as e:
-            logger.error(f"💥 Migration failed: {e}")
-            return False
-    
-    def verify_migration(self):
-        """Verify that the migration was successful"""
-        logger.info("🔍 Verifying migration...")
-        
-        required_columns = ['auto_categorized', 'categorization_confidence', 'suggested_tags']
-        required_indexes = ['idx_content_auto_categorized', 'idx_content_confidence']
-        
-        # Check columns
-        missing_columns = []
-        for column in required_columns:
-            if not self.check_column_exists('content', column):
-                missing_columns.append(column)
-        
-        # Check indexes
-        missing_indexes = []
-        for index in required_indexes:
-            if not self.check_index_exists(index):
-                missing_indexes.append(index)
-        
-        if missing_columns or missing_indexes:
-            logger.error("❌ Migration verification failed!")
-            if missing_columns:
-                logger.error(f"   Missing columns: {', '.join(missing_columns)}")
-            if missing_indexes:
-                logger.error(f"   Missing indexes: {', '.join(missing_indexes)}")
+            logger.error(f"💥 Backfill failed (progress saved, will resume): {e}")
             return False
+
+    @staticmethod
+    def _run_batch(connection, backfill, after, until):
+        if callable(backfill.batch):
+            backfill.batch(connection, after, until)
         else:
-            logger.info("✅ Migration verification successful!")
-            return True
-
-def run_auto_categorization_migration():
-    """Convenience function to run the auto-categorization migration"""
-    migration = DatabaseMigration()
-    
-    logger.info("=" * 60)
-    logger.info("🚀 MCP Smart Notes Integration - Step 1.2 Migration")
-    logger.info("=" * 60)
-    
-    # Run migration
-    if migration.add_auto_categorization_columns():
-        # Verify migration
-        if migration.verify_migration():
-            logger.info("🎉 Step 1.2 migration completed successfully!")
-            return True
-        else:
-            logger.error("💥 Migration verification failed!")
-            return False
-    else:
-        logger.error("💥 Migration failed!")
-        return False
-
-if __name__ == "__main__":
-    # Run migration if script is executed directly
-    success = run_auto_categorization_migration()
-    exit(0 if success else 1)
-
-def add_auto_processing_columns(database_path=None):
-    """Add Task 2.2 auto-processing tracking columns"""
-    migration = DatabaseMigration(database_path)
-    logger.info("🔄 Starting Task 2.2 auto-processing schema migration...")
-    
-    try:
-        engine = create_engine(migration.database_url)
-        
-        with engine.connect() as connection:
-            # Check if columns already exist
-            columns_to_add = [
-                ('auto_processed', 'BOOLEAN DEFAULT FALSE'),
-                ('generated_metadata', 'TEXT')  # JSON of what was auto-generated
-            ]
-            
-            columns_added = []
-            
-            for column_name, column_def in columns_to_add:
-                if not migration.check_column_exists('content', column_name):
-                    try:
-                        sql = f"ALTER TABLE content ADD COLUMN {column_name} {column_def}"
-                        connection.execute(text(sql))
-                        columns_added.append(column_name)
-                        logger.info(f"✅ Added column: {column_name}")
-                    except SQLAlchemyError as e:
-                        logger.error(f"❌ Failed to add column {column_name}: {e}")
-                        raise
-                else:
-                    logger.info(f"⚠️ Column {column_name} already exists, skipping")
-            
-            connection.commit()
-            
-            if columns_added:
-                logger.info("🎉 Task 2.2 auto-processing migration completed successfully!")
-                logger.info(f"   📊 Columns added: {', '.join(columns_added)}")
-            else:
-                logger.info("✅ Database already has auto-processing columns")
-            
-            return True
-            
-    except Exception as e:
-        logger.error(f"💥 Migration failed: {e}")
-        return False 
\ No newline at end of file
+            connection.execute(text(backfill.batch), {'after': after, 'until': until})
+
+    def status(self):
+        """Applied and pending migrations plus backfill progress"""
+        with self._connect() as connection:
+            self._ensure_bookkeeping(connection)
+            applied = connection.exec_driver_sql(
+                f"SELECT version, name, applied_at FROM {SCHEMA_VERSION_TABLE} ORDER BY version"
+            ).fetchall()
+            backfills = connection.exec_driver_sql(
+                f"SELECT name, version, last_id, max_id, completed_at FROM {BACKFILLS_TABLE} ORDER BY version, name"
+            ).fetchall()
+
+        current = applied[-1][0] if applied else 0
+        return {
+            'current_version': current,
+            'latest_version': MIGRATIONS[-1].version if MIGRATIONS else 0,
+            'applied': [{'version': v, 'name': n, 'applied_at': str(at)} for v, n, at in applied],
+            'pending': [{'version': m.version, 'name': m.name} for m in MIGRATIONS if m.version > current],
+            'backfills': [{'name': n, 'version': v, 'last_id': last, 'max_id': top, 'completed_at': done and str(done)}
+                          for n, v, last, top, done in backfills]
+        }
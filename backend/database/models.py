@@ -3,10 +3,12 @@ Database models for Teaching Content Database
 """
 
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Boolean, Float
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Table, Boolean, Numeric, Index, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
+from .texts import CompressedText
+
 Base = declarative_base()
 
 # Association table for many-to-many relationship between Content and Tags
@@ -25,7 +27,6 @@ class Content(Base):
     # Basic content information
     title = Column(String(255), nullable=False, index=True)
     description = Column(Text)
-    content = Column(Text)  # Store actual content text for web-based content
     content_type = Column(String(50), nullable=True, index=True)  # lesson-plan, worksheet, assessment, resource (transitioning to tags)
     subject = Column(String(100), index=True)  # Math, Science, English, etc.
     
@@ -34,6 +35,7 @@ class Content(Base):
     file_path = Column(String(500), nullable=False)
     file_size = Column(Integer)  # in bytes
     mime_type = Column(String(100))
+    file_hash = Column(String(64), index=True)  # SHA-256 of the stored blob (NULL for files uploaded before the blob store)
     
     # Academic metadata
     grade_level = Column(String(50))  # K-12, College, etc.
@@ -48,13 +50,14 @@ class Content(Base):
     date_created = Column(DateTime, default=datetime.utcnow, nullable=False)
     date_modified = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     date_uploaded = Column(DateTime, default=datetime.utcnow)
+    change_seq = Column(Integer)  # commit-ordered change number, stamped by triggers (incremental sync)
     
     # Search and organization
     keywords = Column(Text)  # space-separated keywords for search
     
     # Auto-categorization tracking (MCP Smart Notes Integration)
     auto_categorized = Column(Boolean, default=False, index=True)
-    categorization_confidence = Column(Float)  # Using Float instead of DECIMAL for SQLite compatibility
+    categorization_confidence = Column(Numeric(asdecimal=False))  # DECIMAL on PostgreSQL, read back as float
     suggested_tags = Column(Text)  # JSON array of AI-suggested tags
     
     # Auto-processing tracking (Task 2.2)
@@ -67,10 +70,46 @@ class Content(Base):
     # Relationships
     category = relationship("Category", back_populates="content_items")
     tags = relationship("Tag", secondary=content_tags, back_populates="content_items")
+    # Extracted text, kept out of the content row and loaded only when accessed
+    text = relationship("ContentText", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
+    
+    __table_args__ = (
+        # Keyset pagination for the content list (newest first)
+        Index('idx_content_created_id', 'date_created', 'id'),
+        # Incremental sync (GET /api/content/changes)
+        Index('idx_content_change_seq', 'change_seq'),
+    )
+    
+    @property
+    def content(self):
+        """Extracted full text (from content_texts)"""
+        return self.text.body if self.text is not None else None
+    
+    @content.setter
+    def content(self, value):
+        # A text edit modifies the item, as for any column (incremental sync)
+        if inspect(self).persistent:
+            self.date_modified = datetime.utcnow()
+        if not value:
+            self.text = None
+        elif self.text is None:
+            self.text = ContentText(body=value)
+        else:
+            self.text.body = value
     
     def __repr__(self):
         return f"<Content(id={self.id}, title='{self.title}', type='{self.content_type}')>"
 
+class ContentText(Base):
+    """Extracted full text of a content item, one row per item that has any"""
+    __tablename__ = 'content_texts'
+    
+    content_id = Column(Integer, ForeignKey('content.id', ondelete='CASCADE'), primary_key=True)
+    body = Column(CompressedText, nullable=False)  # zlib-compressed on SQLite, TOAST-compressed on PostgreSQL
+    
+    def __repr__(self):
+        return f"<ContentText(content_id={self.content_id})>"
+
 class Tag(Base):
     """Tags for flexible content organization"""
     __tablename__ = 'tags'
@@ -82,7 +121,7 @@ class Tag(Base):
     
     # Metadata
     date_created = Column(DateTime, default=datetime.utcnow)
-    usage_count = Column(Integer, default=0)  # track how often tag is used
+    usage_count = Column(Integer, default=0)  # kept exact by triggers on content_tags
     
     # Relationships
     content_items = relationship("Content", secondary=content_tags, back_populates="tags")
@@ -114,6 +153,67 @@ class Category(Base):
     def __repr__(self):
         return f"<Category(id={self.id}, name='{self.name}')>"
 
+class ContentTombstone(Base):
+    """Deleted content IDs, so incremental sync clients can drop them"""
+    __tablename__ = 'content_tombstones'
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    content_id = Column(Integer, nullable=False, index=True)
+    date_deleted = Column(DateTime, default=datetime.utcnow, nullable=False)
+    change_seq = Column(Integer, index=True)  # stamped by triggers, in the same sequence as content
+    
+    def __repr__(self):
+        return f"<ContentTombstone(content_id={self.content_id}, deleted='{self.date_deleted}')>"
+
+class Blob(Base):
+    """A stored upload (uploads/blobs/) and how many content items share it, maintained by triggers"""
+    __tablename__ = 'blobs'
+    
+    hash = Column(String(64), primary_key=True)  # SHA-256 hex digest
+    size = Column(Integer)  # in bytes
+    ref_count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<Blob(hash='{self.hash}', ref_count={self.ref_count})>"
+
+class UploadJob(Base):
+    """A queued auto-upload: the staged file waiting for extraction, metadata generation and saving"""
+    __tablename__ = 'upload_jobs'
+    
+    id = Column(String(32), primary_key=True)  # uuid4 hex
+    status = Column(String(20), nullable=False, default='queued', index=True)  # queued, processing, succeeded, failed
+    stage = Column(String(20))  # progress while processing: analyzing, saving
+    
+    # The staged upload (uploads/jobs/<id>) and what ingest learned about it
+    original_filename = Column(String(255), nullable=False)
+    file_path = Column(String(500), nullable=False)
+    file_size = Column(Integer)
+    file_hash = Column(String(64))
+    mime_type = Column(String(100))
+    
+    # Outcome
+    content_id = Column(Integer)  # no foreign key: the content may be deleted later
+    result = Column(Text)  # JSON auto-upload result
+    error = Column(Text)
+    attempts = Column(Integer, nullable=False, default=0)
+    
+    date_created = Column(DateTime, default=datetime.utcnow, nullable=False)
+    date_updated = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<UploadJob(id='{self.id}', status='{self.status}')>"
+
+class ContentCounter(Base):
+    """Materialized content counts (total and per subject), maintained by triggers"""
+    __tablename__ = 'content_counters'
+    
+    kind = Column(String(20), primary_key=True)  # total, subject
+    key = Column(String(255), primary_key=True)  # subject name ('' for total)
+    count = Column(Integer, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f"<ContentCounter(kind='{self.kind}', key='{self.key}', count={self.count})>"
+
 class ContentVersion(Base):
     """Version history for content items (future feature)"""
     __tablename__ = 'content_versions'
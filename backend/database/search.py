@@ -0,0 +1,312 @@
+"""
+Full-text search for Teaching Content Database
+
+SQLite FTS5 index over the content catalog. The index is an external-content
+table over a view joining each content row to its extracted text (stored
+compressed in content_texts), kept in sync by triggers on both tables and
+ranked with BM25.
+
+On PostgreSQL the same columns feed a weighted tsvector column with a GIN
+index, maintained by triggers on both tables; search_content() picks the
+backend from the connection.
+"""
+
+import html
+import re
+from sqlalchemy import text
+
+from .texts import INFLATE_FUNCTION
+
+FTS_TABLE = 'content_fts'
+FTS_SOURCE_VIEW = 'content_search_source'
+
+# Indexed columns, in FTS column order, with their BM25 weights; the last one
+# is the extracted text from content_texts, the others are content columns
+FTS_COLUMNS = [
+    ('title', 10.0),
+    ('description', 4.0),
+    ('keywords', 6.0),
+    ('content', 1.0),
+]
+FTS_TEXT_COLUMN = FTS_COLUMNS[-1][0]
+
+_column_list = ', '.join(name for name, _ in FTS_COLUMNS)
+_row_columns = [name for name, _ in FTS_COLUMNS[:-1]]
+_bm25_weights = ', '.join(str(weight) for _, weight in FTS_COLUMNS)
+
+
+def _row_values(alias):
+    return ', '.join(f'{alias}.{name}' for name in _row_columns)
+
+
+def _stored_text(content_id):
+    return f"(SELECT {INFLATE_FUNCTION}(body) FROM content_texts WHERE content_id = {content_id})"
+
+
+CREATE_FTS_SOURCE_VIEW = f"""
+CREATE VIEW IF NOT EXISTS {FTS_SOURCE_VIEW} AS
+SELECT c.id, {_row_values('c')}, {INFLATE_FUNCTION}(t.body) AS {FTS_TEXT_COLUMN}
+FROM content c LEFT JOIN content_texts t ON t.content_id = c.id
+"""
+
+CREATE_FTS_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+    {_column_list},
+    content='{FTS_SOURCE_VIEW}',
+    content_rowid='id',
+    tokenize='porter unicode61 remove_diacritics 2'
+)
+"""
+
+# An external-content 'delete' must repeat exactly the values that were
+# indexed, so every trigger removes the row as it was before the change
+_fts_delete = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, {_column_list})"
+_fts_insert = f"INSERT INTO {FTS_TABLE}(rowid, {_column_list})"
+
+FTS_TRIGGERS = {
+    'content_fts_ai': f"""
+CREATE TRIGGER IF NOT EXISTS content_fts_ai AFTER INSERT ON content BEGIN
+    {_fts_insert} VALUES (new.id, {_row_values('new')}, {_stored_text('new.id')});
+END
+""",
+    # Before the delete, while the text row (removed with the content row) still exists
+    'content_fts_bd': f"""
+CREATE TRIGGER IF NOT EXISTS content_fts_bd BEFORE DELETE ON content BEGIN
+    {_fts_delete} VALUES ('delete', old.id, {_row_values('old')}, {_stored_text('old.id')});
+END
+""",
+    'content_fts_au': f"""
+CREATE TRIGGER IF NOT EXISTS content_fts_au AFTER UPDATE OF {', '.join(_row_columns)} ON content BEGIN
+    {_fts_delete} VALUES ('delete', old.id, {_row_values('old')}, {_stored_text('old.id')});
+    {_fts_insert} VALUES (new.id, {_row_values('new')}, {_stored_text('new.id')});
+END
+""",
+    # Text changes re-index the owning content row (if it still exists)
+    'content_texts_fts_ai': f"""
+CREATE TRIGGER IF NOT EXISTS content_texts_fts_ai AFTER INSERT ON content_texts BEGIN
+    {_fts_delete} SELECT 'delete', c.id, {_row_values('c')}, NULL FROM content c WHERE c.id = new.content_id;
+    {_fts_insert} SELECT c.id, {_row_values('c')}, {INFLATE_FUNCTION}(new.body) FROM content c WHERE c.id = new.content_id;
+END
+""",
+    'content_texts_fts_au': f"""
+CREATE TRIGGER IF NOT EXISTS content_texts_fts_au AFTER UPDATE OF body ON content_texts BEGIN
+    {_fts_delete} SELECT 'delete', c.id, {_row_values('c')}, {INFLATE_FUNCTION}(old.body) FROM content c WHERE c.id = old.content_id;
+    {_fts_insert} SELECT c.id, {_row_values('c')}, {INFLATE_FUNCTION}(new.body) FROM content c WHERE c.id = new.content_id;
+END
+""",
+    'content_texts_fts_ad': f"""
+CREATE TRIGGER IF NOT EXISTS content_texts_fts_ad AFTER DELETE ON content_texts BEGIN
+    {_fts_delete} SELECT 'delete', c.id, {_row_values('c')}, {INFLATE_FUNCTION}(old.body) FROM content c WHERE c.id = old.content_id;
+    {_fts_insert} SELECT c.id, {_row_values('c')}, NULL FROM content c WHERE c.id = old.content_id;
+END
+""",
+}
+
+# The index before extracted text moved to content_texts had its own delete trigger
+_LEGACY_FTS_TRIGGERS = ['content_fts_ad']
+
+DROP_FTS_INDEX = (
+    [f"DROP TRIGGER IF EXISTS {name}" for name in list(FTS_TRIGGERS) + _LEGACY_FTS_TRIGGERS]
+    + [f"DROP TABLE IF EXISTS {FTS_TABLE}", f"DROP VIEW IF EXISTS {FTS_SOURCE_VIEW}"]
+)
+
+REBUILD_FTS_INDEX = f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+
+# PostgreSQL: the heaviest BM25 weights map to tsvector weight classes A-D
+PG_SEARCH_COLUMN = 'search_vector'
+PG_SEARCH_INDEX = 'idx_content_search'
+PG_SEARCH_FUNCTION = 'content_search_vector'
+PG_TEXT_CONFIG = 'english'
+
+_by_weight = sorted(FTS_COLUMNS, key=lambda column: -column[1])
+_weight_classes = dict(zip((name for name, _ in _by_weight), 'ABCD'))
+_pg_vector = ' || '.join(
+    f"setweight(to_tsvector('{PG_TEXT_CONFIG}'::regconfig, coalesce({name}, '')), '{_weight_classes[name]}')"
+    for name, _ in FTS_COLUMNS
+)
+_pg_arguments = ', '.join(f'{name} text' for name, _ in FTS_COLUMNS)
+# ts_rank takes the weights for classes {D, C, B, A}, each at most 1.0
+_pg_rank_weights = '{' + ', '.join(str(weight / _by_weight[0][1]) for _, weight in reversed(_by_weight)) + '}'
+
+PG_SEARCH_DDL = [
+    f"""CREATE OR REPLACE FUNCTION {PG_SEARCH_FUNCTION}({_pg_arguments}) RETURNS tsvector
+        LANGUAGE sql IMMUTABLE AS $$ SELECT {_pg_vector} $$""",
+    f"ALTER TABLE content ADD COLUMN IF NOT EXISTS {PG_SEARCH_COLUMN} tsvector",
+    # Content rows compute their vector from their own columns plus the stored text
+    f"""CREATE OR REPLACE FUNCTION content_search_update() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        NEW.{PG_SEARCH_COLUMN} := {PG_SEARCH_FUNCTION}({_row_values('NEW')},
+            (SELECT body FROM content_texts WHERE content_id = NEW.id));
+        RETURN NEW;
+    END $$""",
+    "DROP TRIGGER IF EXISTS content_search_update ON content",
+    f"""CREATE TRIGGER content_search_update BEFORE INSERT OR UPDATE OF {', '.join(_row_columns)} ON content
+        FOR EACH ROW EXECUTE FUNCTION content_search_update()""",
+    # Text changes recompute the owning row's vector
+    f"""CREATE OR REPLACE FUNCTION content_texts_search_update() RETURNS trigger LANGUAGE plpgsql AS $$
+    BEGIN
+        IF TG_OP = 'DELETE' THEN
+            UPDATE content c SET {PG_SEARCH_COLUMN} = {PG_SEARCH_FUNCTION}({_row_values('c')}, NULL)
+            WHERE c.id = OLD.content_id;
+        ELSE
+            UPDATE content c SET {PG_SEARCH_COLUMN} = {PG_SEARCH_FUNCTION}({_row_values('c')}, NEW.body)
+            WHERE c.id = NEW.content_id;
+        END IF;
+        RETURN NULL;
+    END $$""",
+    "DROP TRIGGER IF EXISTS content_texts_search_update ON content_texts",
+    """CREATE TRIGGER content_texts_search_update AFTER INSERT OR UPDATE OR DELETE ON content_texts
+        FOR EACH ROW EXECUTE FUNCTION content_texts_search_update()""",
+    f"CREATE INDEX IF NOT EXISTS {PG_SEARCH_INDEX} ON content USING GIN ({PG_SEARCH_COLUMN})",
+]
+
+# Fills the vector for existing rows (the triggers only cover later writes)
+PG_REBUILD_SEARCH = f"""
+UPDATE content c SET {PG_SEARCH_COLUMN} = {PG_SEARCH_FUNCTION}({_row_values('c')},
+    (SELECT body FROM content_texts t WHERE t.content_id = c.id))
+"""
+
+# Removes the search column (with its GIN index) and the triggers filling it
+PG_DROP_SEARCH = [
+    "DROP TRIGGER IF EXISTS content_search_update ON content",
+    "DROP TRIGGER IF EXISTS content_texts_search_update ON content_texts",
+    f"ALTER TABLE content DROP COLUMN IF EXISTS {PG_SEARCH_COLUMN}",
+]
+
+SNIPPET_OPEN = '<mark>'
+SNIPPET_CLOSE = '</mark>'
+SNIPPET_TOKENS = 16
+
+# The index marks matches with private-use placeholders; the text around them
+# is HTML-escaped before they become SNIPPET_OPEN/SNIPPET_CLOSE, so markup
+# stored in a document reaches the client as text
+_MARK_OPEN = '\ue000'
+_MARK_CLOSE = '\ue001'
+
+_token_pattern = re.compile(r'\w+', re.UNICODE)
+
+
+def build_match_query(user_query):
+    """
+    Turn free text into a safe FTS5 MATCH expression
+    Every word becomes a quoted prefix term, so punctuation in user input can
+    never produce an FTS5 syntax error and partially typed words still match
+    """
+    tokens = _token_pattern.findall(user_query or '')
+    return ' '.join(f'"{token}"*' for token in tokens)
+
+
+def build_tsquery(user_query, operator='&'):
+    """PostgreSQL twin of build_match_query: every word a prefix term, all required"""
+    tokens = _token_pattern.findall(user_query or '')
+    return f' {operator} '.join(f'{token}:*' for token in tokens)
+
+
+def _escape_highlight(value):
+    """HTML-escape highlighted text, keeping only the match marks as markup"""
+    if value is None:
+        return None
+    return html.escape(value).replace(_MARK_OPEN, SNIPPET_OPEN).replace(_MARK_CLOSE, SNIPPET_CLOSE)
+
+
+def _hits(rows):
+    return [
+        {'id': row[0], 'rank': row[1],
+         'title_highlight': _escape_highlight(row[2]), 'snippet': _escape_highlight(row[3])}
+        for row in rows
+    ]
+
+
+def search_content(connection, user_query, limit=20, offset=0, subject=None):
+    """
+    Run a ranked full-text search
+    Returns (total, hits) where hits are dicts with id, rank, title_highlight
+    and snippet, best match first (lower rank is better). The highlights are
+    HTML-escaped text with the matches wrapped in SNIPPET_OPEN/SNIPPET_CLOSE.
+    """
+    if connection.dialect.name == 'postgresql':
+        return _search_postgresql(connection, user_query, limit, offset, subject)
+
+    match = build_match_query(user_query)
+    if not match:
+        return 0, []
+
+    subject_clause = ''
+    params = {'match': match, 'limit': limit, 'offset': offset,
+              'open': _MARK_OPEN, 'close': _MARK_CLOSE, 'tokens': SNIPPET_TOKENS}
+    if subject:
+        subject_clause = 'AND c.subject = :subject'
+        params['subject'] = subject
+
+    total = connection.execute(text(f"""
+        SELECT count(*)
+        FROM {FTS_TABLE} f JOIN content c ON c.id = f.rowid
+        WHERE {FTS_TABLE} MATCH :match {subject_clause}
+    """), params).scalar()
+
+    # Rank first, then highlight only the page: result columns are computed
+    # for every match before the sort, and snippets decompress the stored text
+    rows = connection.execute(text(f"""
+        WITH page AS MATERIALIZED (
+            SELECT f.rowid AS id, bm25({FTS_TABLE}, {_bm25_weights}) AS rank
+            FROM {FTS_TABLE} f JOIN content c ON c.id = f.rowid
+            WHERE {FTS_TABLE} MATCH :match {subject_clause}
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        )
+        SELECT page.id, page.rank,
+               highlight({FTS_TABLE}, 0, :open, :close) AS title_highlight,
+               snippet({FTS_TABLE}, -1, :open, :close, '…', :tokens) AS snippet
+        FROM page JOIN {FTS_TABLE} ON {FTS_TABLE}.rowid = page.id
+        WHERE {FTS_TABLE} MATCH :match
+        ORDER BY page.rank
+    """), params).all()
+
+    return total, _hits(rows)
+
+
+def _search_postgresql(connection, user_query, limit, offset, subject):
+    query = build_tsquery(user_query)
+    if not query:
+        return 0, []
+
+    subject_clause = ''
+    # ts_rank is quadratic in term positions for AND queries; ranking the
+    # matches against the OR of the same terms is linear and orders alike
+    params = {'query': query, 'rank_query': build_tsquery(user_query, '|'), 'limit': limit, 'offset': offset,
+              'title_options': f'StartSel={_MARK_OPEN}, StopSel={_MARK_CLOSE}, HighlightAll=true',
+              'snippet_options': f'StartSel={_MARK_OPEN}, StopSel={_MARK_CLOSE}, '
+                                 f'MaxWords={SNIPPET_TOKENS}, MinWords={SNIPPET_TOKENS // 2}, '
+                                 'MaxFragments=1, FragmentDelimiter=…'}
+    if subject:
+        subject_clause = 'AND c.subject = :subject'
+        params['subject'] = subject
+
+    matches = f"""
+        FROM content c, to_tsquery('{PG_TEXT_CONFIG}', :query) q
+        WHERE c.{PG_SEARCH_COLUMN} @@ q {subject_clause}
+    """
+
+    total = connection.execute(text(f"SELECT count(*) {matches}"), params).scalar()
+
+    # Rank first, then highlight only the page (ts_headline re-parses the text).
+    # Negated so that, as with bm25(), lower ranks sort first
+    rows = connection.execute(text(f"""
+        SELECT page.id, page.rank,
+               ts_headline('{PG_TEXT_CONFIG}', c.title, q, :title_options) AS title_highlight,
+               ts_headline('{PG_TEXT_CONFIG}', concat_ws(' ', c.description, c.keywords, t.body),
+                           q, :snippet_options) AS snippet
+        FROM (
+            SELECT c.id, -ts_rank('{_pg_rank_weights}', c.{PG_SEARCH_COLUMN},
+                                  to_tsquery('{PG_TEXT_CONFIG}', :rank_query)) AS rank
+            {matches}
+            ORDER BY rank, c.id
+            LIMIT :limit OFFSET :offset
+        ) page
+        JOIN content c ON c.id = page.id
+        LEFT JOIN content_texts t ON t.content_id = page.id
+        CROSS JOIN to_tsquery('{PG_TEXT_CONFIG}', :query) q
+        ORDER BY page.rank, page.id
+    """), params).all()
+
+    return total, _hits(rows)
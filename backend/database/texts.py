@@ -0,0 +1,74 @@
+"""
+Compressed storage for extracted full text
+
+Extracted text lives in the `content_texts` side table instead of the
+`content` row, so list queries and ORM loads of content never read it.
+On SQLite it is stored zlib-compressed; the FTS index reads it through the
+inflate_text() SQL function, installed on every connection by
+install_text_functions(). PostgreSQL keeps it as plain text and compresses
+large values itself (TOAST).
+"""
+
+import zlib
+
+from sqlalchemy import LargeBinary, Text, event
+from sqlalchemy.types import TypeDecorator
+
+COMPRESSION_LEVEL = 6
+
+# SQL function decompressing a stored text (SQLite)
+INFLATE_FUNCTION = 'inflate_text'
+
+
+def compress_text(value):
+    return zlib.compress(value.encode('utf-8'), COMPRESSION_LEVEL)
+
+
+def decompress_text(value):
+    if value is None:
+        return None
+    return zlib.decompress(value).decode('utf-8')
+
+
+class CompressedText(TypeDecorator):
+    """Text stored zlib-compressed on SQLite and as TEXT on PostgreSQL"""
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == 'postgresql':
+            return dialect.type_descriptor(Text())
+        return dialect.type_descriptor(LargeBinary())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        return compress_text(value)
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == 'postgresql':
+            return value
+        return decompress_text(value)
+
+
+# SQLite only cascades deletes with foreign key enforcement on (not in the
+# 'legacy' profile), so a trigger removes the text of deleted content
+TEXT_TRIGGERS = {
+    'content_texts_cleanup': """
+CREATE TRIGGER IF NOT EXISTS content_texts_cleanup AFTER DELETE ON content BEGIN
+    DELETE FROM content_texts WHERE content_id = old.id;
+END
+""",
+}
+
+
+def install_text_functions(engine):
+    """Register inflate_text() on every DBAPI connection of a SQLite engine (once)"""
+    if engine.dialect.name != 'sqlite' or event.contains(engine, 'connect', _register_functions):
+        return
+    event.listen(engine, 'connect', _register_functions)
+
+
+def _register_functions(dbapi_connection, connection_record):
+    dbapi_connection.create_function(INFLATE_FUNCTION, 1, decompress_text, deterministic=True)
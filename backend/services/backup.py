@@ -0,0 +1,306 @@
+"""
+Online backups of the database and the uploads tree
+The SQLite database is copied with the online backup API a few pages at a
+time, so writers only wait for one short step at a time. Each backup is a
+generation directory in the backup folder holding the database copy and a
+manifest of checksums. Uploads are snapshotted by content hash into a shared
+object store: a generation lists path -> hash, and only files whose contents
+are not stored yet are copied.
+
+Layout:
+    backups/
+        20261017-020000/teaching_content.db
+        20261017-020000/manifest.json
+        objects/ab/abcdef...    (upload contents by SHA-256)
+"""
+
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import time
+from datetime import datetime
+from pathlib import Path
+
+from database.migrations import SCHEMA_VERSION_TABLE
+from services.blob_store import STAGING_DIR, STORE_LOCK_FILE, file_sha256
+from services.chunked_uploads import CHUNKED_DIR
+from services.upload_jobs import JOBS_DIR
+
+logger = logging.getLogger(__name__)
+
+# Where generations are kept (Config.BACKUP_FOLDER in config.py)
+BACKUP_FOLDER = Path(__file__).parent.parent.parent / 'backups'
+BACKUP_FOLDER_ENV_VAR = 'TEACHING_DB_BACKUP_FOLDER'
+
+# Generations kept by rotation
+DEFAULT_KEEP = int(os.environ.get('TEACHING_DB_BACKUP_KEEP', 7))
+
+# Pages copied per backup step and the pause between steps; writers wait for
+# at most one step (1024 pages of 4KB = 4MB)
+BACKUP_STEP_PAGES = 1024
+BACKUP_STEP_PAUSE = 0.01
+
+# A write from another connection restarts a stepped backup; after this many
+# restarts the copy finishes in one step (under WAL that only holds a read
+# snapshot, so writers still proceed)
+MAX_BACKUP_RESTARTS = 3
+
+MANIFEST_NAME = 'manifest.json'
+OBJECTS_DIR = 'objects'
+GENERATION_FORMAT = '%Y%m%d-%H%M%S'
+
+# Upload subdirectories and files that never hold stored content: staged
+# uploads, unfinished upload sessions, queued auto-upload jobs and the
+# blob store lock
+SKIPPED_UPLOAD_DIRS = {STAGING_DIR, CHUNKED_DIR, JOBS_DIR}
+SKIPPED_UPLOAD_FILES = {STORE_LOCK_FILE}
+
+
+def sqlite_database_path(manager):
+    """Path of the manager's SQLite database file (None for PostgreSQL or in-memory)"""
+    if manager.backend != 'sqlite' or not manager.pool_options:
+        return None
+    return Path(manager.engine.url.database).resolve()
+
+
+class _BackupRestarted(Exception):
+    """Raised from the progress callback to abandon a stepped backup"""
+
+
+def _schema_version(connection):
+    """Schema version recorded in a SQLite database (0 if it predates versioning)"""
+    try:
+        return connection.execute(f"SELECT COALESCE(MAX(version), 0) FROM {SCHEMA_VERSION_TABLE}").fetchone()[0]
+    except sqlite3.OperationalError:
+        return 0
+
+
+class BackupManager:
+    """Creates, rotates and verifies backup generations in one backup folder"""
+
+    def __init__(self, backup_folder=None, keep=DEFAULT_KEEP):
+        if backup_folder is None:
+            backup_folder = os.environ.get(BACKUP_FOLDER_ENV_VAR, BACKUP_FOLDER)
+        self.backup_folder = Path(backup_folder)
+        self.objects_folder = self.backup_folder / OBJECTS_DIR
+        self.keep = keep
+
+    # Generations
+
+    def generations(self):
+        """Completed generation directories, oldest first"""
+        if not self.backup_folder.is_dir():
+            return []
+        return sorted(path for path in self.backup_folder.iterdir()
+                      if path.is_dir() and (path / MANIFEST_NAME).is_file())
+
+    def read_manifest(self, generation):
+        with open(Path(generation) / MANIFEST_NAME, encoding='utf-8') as f:
+            return json.load(f)
+
+    def _new_generation_dir(self):
+        name = datetime.now().strftime(GENERATION_FORMAT)
+        path = self.backup_folder / name
+        suffix = 1
+        while path.exists():
+            suffix += 1
+            path = self.backup_folder / f'{name}-{suffix}'
+        path.mkdir(parents=True)
+        return path
+
+    def create_backup(self, manager, upload_folder=None, pages=BACKUP_STEP_PAGES, pause=BACKUP_STEP_PAUSE):
+        """
+        Back up the database (SQLite only) and, if given, the uploads tree
+        into a new generation, then rotate old generations
+        Returns the generation directory
+        """
+        generation = self._new_generation_dir()
+        manifest = {'created': datetime.now().isoformat(timespec='seconds'), 'database': None, 'uploads': None}
+        try:
+            database_path = sqlite_database_path(manager)
+            if database_path is not None:
+                manifest['database'] = self.backup_database(manager, generation / database_path.name, pages, pause)
+            else:
+                logger.warning("⚠️ Online backup uses the SQLite backup API; back up PostgreSQL with pg_dump")
+
+            if upload_folder is not None:
+                manifest['uploads'] = self.snapshot_uploads(upload_folder)
+
+            # The manifest is written last: a generation without one is incomplete
+            manifest_tmp = generation / (MANIFEST_NAME + '.partial')
+            with open(manifest_tmp, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, indent=2, sort_keys=True)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(manifest_tmp, generation / MANIFEST_NAME)
+        except Exception:
+            shutil.rmtree(generation, ignore_errors=True)
+            raise
+
+        logger.info(f"✅ Backup generation {generation.name} written")
+        self.rotate()
+        return generation
+
+    def rotate(self):
+        """Delete generations beyond `keep` (oldest first) and unreferenced upload objects"""
+        generations = self.generations()
+        expired = generations[:-self.keep] if self.keep > 0 else []
+        for generation in expired:
+            shutil.rmtree(generation)
+            logger.info(f"🗑️ Removed backup generation {generation.name}")
+
+        # Leftovers of interrupted backups (no manifest) are removed as well
+        for path in self.backup_folder.iterdir():
+            if path.is_dir() and path.name != OBJECTS_DIR and not (path / MANIFEST_NAME).is_file():
+                shutil.rmtree(path, ignore_errors=True)
+
+        self.prune_objects()
+        return [generation.name for generation in expired]
+
+    # Database
+
+    def backup_database(self, manager, target, pages=BACKUP_STEP_PAGES, pause=BACKUP_STEP_PAUSE):
+        """
+        Copy the live database to `target` with the online backup API
+        Runs `pages` pages per step and sleeps `pause` seconds between steps,
+        so the database is only locked for one step at a time. Returns the
+        manifest entry (file, size, sha256, schema version).
+        """
+        target = Path(target)
+        partial = target.with_name(target.name + '.partial')
+        start = time.perf_counter()
+        steps = restarts = 0
+        last_remaining = None
+
+        def progress(status, remaining, total):
+            nonlocal steps, restarts, last_remaining
+            steps += 1
+            if last_remaining is not None and remaining > last_remaining:
+                restarts += 1
+                if restarts > MAX_BACKUP_RESTARTS:
+                    raise _BackupRestarted()
+            last_remaining = remaining
+
+        # Source: a pooled read-only connection, so the copy never takes the writer's pool slots
+        source = manager.read_engine.raw_connection()
+        try:
+            destination = sqlite3.connect(partial)
+            try:
+                try:
+                    source.driver_connection.backup(destination, pages=pages, progress=progress, sleep=pause)
+                except _BackupRestarted:
+                    logger.info(f"🔄 Backup restarted {restarts} times by concurrent writes, finishing in one step")
+                    source.driver_connection.backup(destination)
+                check = destination.execute('PRAGMA quick_check').fetchone()[0]
+                if check != 'ok':
+                    raise RuntimeError(f"Backup copy failed quick_check: {check}")
+                schema_version = _schema_version(destination)
+            finally:
+                destination.close()
+        finally:
+            source.close()
+
+        checksum = file_sha256(partial)
+        os.replace(partial, target)
+        size = target.stat().st_size
+        logger.info(f"💾 Database backed up: {size / 1024 / 1024:.1f}MB in {steps} steps, "
+                    f"{time.perf_counter() - start:.2f}s")
+        return {'file': target.name, 'size': size, 'sha256': checksum, 'schema_version': schema_version}
+
+    # Uploads
+
+    def _object_path(self, checksum):
+        return self.objects_folder / checksum[:2] / checksum
+
+    def _latest_uploads(self):
+        """Uploads entries of the newest generation (reused for unchanged files)"""
+        for generation in reversed(self.generations()):
+            uploads = self.read_manifest(generation).get('uploads')
+            if uploads is not None:
+                return uploads
+        return {}
+
+    def snapshot_uploads(self, upload_folder):
+        """
+        Store every upload not already in the object store and return the
+        path -> {sha256, size, mtime_ns} map for the manifest
+        Files whose size and mtime match the previous snapshot are not re-read.
+        """
+        upload_folder = Path(upload_folder)
+        previous = self._latest_uploads()
+        entries = {}
+        hashed = copied = copied_bytes = 0
+
+        for root, dirs, files in os.walk(upload_folder):
+            if Path(root) == upload_folder:
+                dirs[:] = [d for d in dirs if d not in SKIPPED_UPLOAD_DIRS]
+                files = [name for name in files if name not in SKIPPED_UPLOAD_FILES]
+            for name in files:
+                path = Path(root) / name
+                relative = path.relative_to(upload_folder).as_posix()
+                stat = path.stat()
+
+                known = previous.get(relative)
+                if (known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns
+                        and self._object_path(known['sha256']).is_file()):
+                    entries[relative] = known
+                    continue
+
+                checksum = file_sha256(path)
+                hashed += 1
+                stored = self._object_path(checksum)
+                if not stored.is_file():
+                    stored.parent.mkdir(parents=True, exist_ok=True)
+                    partial = stored.with_name(stored.name + '.partial')
+                    shutil.copyfile(path, partial)
+                    os.replace(partial, stored)
+                    copied += 1
+                    copied_bytes += stat.st_size
+                entries[relative] = {'sha256': checksum, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+        logger.info(f"📁 Uploads snapshot: {len(entries)} files, {hashed} hashed, "
+                    f"{copied} copied ({copied_bytes / 1024 / 1024:.1f}MB)")
+        return entries
+
+    def prune_objects(self):
+        """Delete stored upload contents no remaining generation refers to"""
+        if not self.objects_folder.is_dir():
+            return 0
+        referenced = set()
+        for generation in self.generations():
+            referenced.update(entry['sha256'] for entry in (self.read_manifest(generation).get('uploads') or {}).values())
+
+        removed = 0
+        for stored in self.objects_folder.glob('*/*'):
+            if stored.name not in referenced:
+                stored.unlink()
+                removed += 1
+        return removed
+
+    # Verification
+
+    def verify(self, generation):
+        """Re-check every checksum recorded for a generation; returns a list of problems"""
+        generation = Path(generation)
+        if not generation.is_absolute() and not generation.exists():
+            generation = self.backup_folder / generation
+        manifest = self.read_manifest(generation)
+        problems = []
+
+        database = manifest.get('database')
+        if database:
+            path = generation / database['file']
+            if not path.is_file():
+                problems.append(f"missing database copy {database['file']}")
+            elif file_sha256(path) != database['sha256']:
+                problems.append(f"checksum mismatch for {database['file']}")
+
+        for relative, entry in (manifest.get('uploads') or {}).items():
+            stored = self._object_path(entry['sha256'])
+            if not stored.is_file():
+                problems.append(f"missing stored contents for {relative}")
+            elif file_sha256(stored) != entry['sha256']:
+                problems.append(f"checksum mismatch for {relative}")
+        return problems
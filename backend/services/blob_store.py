@@ -0,0 +1,184 @@
+"""
+Content-addressed store for uploaded files
+Every upload is stored once under its SHA-256, so identical files uploaded
+by different teachers share one blob. Which content rows use a blob is
+tracked in the database (database/blobs.py); the store only places and
+removes files. Uploads are written once, to a staging file that hashes,
+counts and keeps the head of the bytes as they arrive, and renamed into the
+store after their content row is committed. The staging folder is inside
+the upload folder, so that rename never copies.
+
+Layout:
+    uploads/blobs/ab/abcdef...   (file contents by SHA-256)
+    uploads/temp/                (staged uploads)
+    uploads/.blobs.lock          (store lock shared by worker processes)
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from services.uploads import SNIFF_BYTES, generate_unique_filename, sanitize_filename, sniff_mime_type
+
+try:
+    import fcntl
+except ImportError:  # Windows: the thread lock alone covers the single-process server
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+BLOBS_DIR = 'blobs'
+STAGING_DIR = 'temp'
+HASH_CHUNK_SIZE = 1024 * 1024
+STORE_LOCK_FILE = '.blobs.lock'
+
+# Placing a blob and removing an unreferenced one must not interleave, or a
+# file a new upload just found in the store could be deleted under it. The
+# thread lock covers one process; an flock on STORE_LOCK_FILE covers every
+# gunicorn worker sharing the upload folder.
+_store_lock = threading.Lock()
+
+
+def file_sha256(path):
+    """SHA-256 hex digest of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class StagedUpload(NamedTuple):
+    """An upload written to the staging folder, described by the same pass that wrote it"""
+    path: str
+    file_hash: str
+    size: int
+    mime_type: str
+
+
+class StagingFile:
+    """
+    Staging file that hashes and counts everything written to it
+    Also keeps the first SNIFF_BYTES bytes for MIME sniffing. It is readable
+    and seekable like the file it wraps, so werkzeug can stream a multipart
+    upload straight into it (see services/upload_staging.py).
+    """
+
+    def __init__(self, path):
+        self.name = path
+        self.size = 0
+        self.head = b''
+        self._digest = hashlib.sha256()
+        self._file = open(path, 'w+b')
+
+    def write(self, data):
+        self._digest.update(data)
+        self.size += len(data)
+        if len(self.head) < SNIFF_BYTES:
+            self.head += bytes(data[:SNIFF_BYTES - len(self.head)])
+        return self._file.write(data)
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+    def discard(self):
+        """Close and delete the file unless it has been moved into the store"""
+        self._file.close()
+        try:
+            os.remove(self.name)
+        except FileNotFoundError:
+            pass
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+class BlobStore:
+    """Uploaded files stored by content hash below one upload folder"""
+
+    def __init__(self, upload_folder):
+        self.upload_folder = Path(upload_folder)
+
+    def staging_path(self, original_filename):
+        """Fresh path in the staging folder, keeping the upload's extension"""
+        staging = self.upload_folder / STAGING_DIR
+        staging.mkdir(parents=True, exist_ok=True)
+        return str(staging / generate_unique_filename(sanitize_filename(original_filename)))
+
+    def open_staging(self, original_filename):
+        return StagingFile(self.staging_path(original_filename))
+
+    def ingest(self, stream, original_filename, declared_type: Optional[str] = None):
+        """
+        Stage an upload, hashing, sizing and sniffing it in the same pass
+        A StagingFile that already received the upload is only closed; any
+        other stream is copied into a new one. Returns a StagedUpload.
+        """
+        staging = stream if isinstance(stream, StagingFile) else None
+        try:
+            if staging is None:
+                staging = self.open_staging(original_filename)
+                for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+                    staging.write(chunk)
+            staging.close()
+        except Exception:
+            if staging is not None:
+                staging.discard()
+            raise
+        return StagedUpload(staging.name, staging.hexdigest(), staging.size,
+                            sniff_mime_type(staging.head, original_filename, declared_type))
+
+    def relative_path(self, checksum):
+        """Path of a blob relative to the upload folder (stored as Content.file_path)"""
+        return os.path.join(BLOBS_DIR, checksum[:2], checksum)
+
+    def path(self, checksum):
+        return self.upload_folder / self.relative_path(checksum)
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store lock across threads and worker processes"""
+        with _store_lock:
+            if fcntl is None:
+                yield
+                return
+            self.upload_folder.mkdir(parents=True, exist_ok=True)
+            with open(self.upload_folder / STORE_LOCK_FILE, 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+
+    def place(self, staged_path, checksum):
+        """
+        Move a committed upload into the store
+        Returns False if the blob was already stored; the staged copy is then discarded.
+        """
+        target = self.path(checksum)
+        with self._locked():
+            if target.is_file():
+                os.remove(staged_path)
+                return False
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(staged_path, target)
+        return True
+
+    def remove_unreferenced(self, checksum, ref_count):
+        """
+        Delete a blob unless `ref_count()` reports remaining references
+        The count is read under the store lock, after the deleting transaction
+        committed, so an upload of the same file that committed in between
+        keeps its blob. Returns the remaining references; raises OSError
+        (FileNotFoundError if already gone) when the file cannot be removed.
+        """
+        with self._locked():
+            references = ref_count()
+            if not references:
+                os.remove(self.path(checksum))
+                logger.info(f"🗑️ Removed unreferenced blob {checksum}")
+        return references
@@ -0,0 +1,213 @@
+"""
+Resumable chunked uploads
+Large files (videos, archives) are sent as a series of PUTs to an upload
+session instead of one multipart POST, so a dropped connection only loses
+the chunk in flight. Each session is two files in the upload folder's
+chunked area: `<id>.json` (file name, declared size and the content form
+fields) and `<id>.part`, which chunks are appended to. The size of the part
+file is the session's offset, so a client resumes by asking for it and
+sending the rest. Chunks are hashed as they are appended; once the part
+file is complete it is renamed into the blob store like any other staged
+upload (services/blob_store.py).
+
+Layout:
+    uploads/chunked/<id>.json
+    uploads/chunked/<id>.part
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+
+from services.blob_store import HASH_CHUNK_SIZE, StagedUpload, file_sha256
+from services.uploads import SNIFF_BYTES, sniff_mime_type
+
+try:
+    import fcntl
+except ImportError:  # Windows: the per-session thread locks alone cover the single-process server
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+CHUNKED_DIR = 'chunked'
+
+# Largest file a session may declare, and how long an idle session is kept
+MAX_CHUNKED_UPLOAD_SIZE = int(os.environ.get('TEACHING_DB_MAX_UPLOAD_MB', 2048)) * 1024 * 1024
+SESSION_EXPIRY_SECONDS = int(os.environ.get('TEACHING_DB_UPLOAD_SESSION_HOURS', 24)) * 3600
+
+
+class UploadOffsetMismatch(ValueError):
+    """A chunk was sent for an offset other than the session's current one"""
+
+    def __init__(self, offset):
+        super().__init__(f'Upload is at offset {offset}')
+        self.offset = offset
+
+
+def _lock_part(part):
+    """Hold an open part file exclusively until it is closed"""
+    if fcntl is not None:
+        fcntl.flock(part, fcntl.LOCK_EX)
+
+
+class ChunkedUploads:
+    """Upload sessions below one upload folder"""
+
+    # Running SHA-256 per session, valid while it covers the whole part file.
+    # Another worker process (or a restart) leaves it stale; the part file is
+    # then hashed in full when the upload completes. The thread locks only
+    # serialize one process, so the part file itself is also flocked while a
+    # chunk is checked and written or the upload is completed.
+    _hashes = {}
+    _locks = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, upload_folder):
+        self.folder = Path(upload_folder) / CHUNKED_DIR
+
+    def _paths(self, upload_id):
+        try:
+            upload_id = uuid.UUID(upload_id).hex
+        except (TypeError, ValueError):
+            raise KeyError(upload_id)
+        return self.folder / f'{upload_id}.json', self.folder / f'{upload_id}.part'
+
+    def _lock(self, upload_id):
+        with self._registry_lock:
+            return self._locks.setdefault(upload_id, threading.Lock())
+
+    def _forget(self, upload_id):
+        with self._registry_lock:
+            self._hashes.pop(upload_id, None)
+            self._locks.pop(upload_id, None)
+
+    def create(self, filename, size, mime_type=None, fields=None):
+        """Open a session for a file of `size` bytes; returns its status"""
+        if size < 0 or size > MAX_CHUNKED_UPLOAD_SIZE:
+            raise ValueError(f'Upload size must be between 0 and {MAX_CHUNKED_UPLOAD_SIZE // (1024 * 1024)}MB')
+        upload_id = uuid.uuid4().hex
+        info_path, part_path = self._paths(upload_id)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        part_path.touch()
+        info = {
+            'filename': filename,
+            'size': size,
+            'mime_type': mime_type,
+            'fields': fields or {},
+            'created': time.time(),
+        }
+        info_path.write_text(json.dumps(info), encoding='utf-8')
+        self._hashes[upload_id] = (hashlib.sha256(), 0)
+        return self._status(upload_id, info, 0)
+
+    def _status(self, upload_id, info, offset):
+        return {
+            'upload_id': upload_id,
+            'filename': info['filename'],
+            'size': info['size'],
+            'offset': offset,
+            'complete': offset == info['size'],
+        }
+
+    def info(self, upload_id):
+        """Session metadata (KeyError if unknown or expired)"""
+        info_path, _ = self._paths(upload_id)
+        try:
+            return json.loads(info_path.read_text(encoding='utf-8'))
+        except FileNotFoundError:
+            raise KeyError(upload_id)
+
+    def status(self, upload_id):
+        info = self.info(upload_id)
+        _, part_path = self._paths(upload_id)
+        return self._status(upload_id, info, part_path.stat().st_size)
+
+    def append(self, upload_id, offset, stream):
+        """
+        Append a chunk read from `stream` at `offset`
+        The offset must be the session's current one (UploadOffsetMismatch
+        otherwise), and the chunk may not run past the declared size. The
+        chunk is copied in HASH_CHUNK_SIZE pieces, never held in memory whole.
+        Bytes received before a connection drops are kept, so the client
+        resumes from the offset the session then reports.
+        """
+        info = self.info(upload_id)
+        _, part_path = self._paths(upload_id)
+        with self._lock(upload_id):
+            with open(part_path, 'r+b') as part:
+                _lock_part(part)
+                current = part.seek(0, os.SEEK_END)
+                if offset != current:
+                    raise UploadOffsetMismatch(current)
+                digest, hashed = self._hashes.get(upload_id, (None, None))
+                if hashed != current:
+                    digest = None
+                try:
+                    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+                        if current + len(chunk) > info['size']:
+                            part.truncate(offset)
+                            current, digest = offset, None
+                            raise ValueError(f"Chunk runs past the declared size of {info['size']} bytes")
+                        part.write(chunk)
+                        current += len(chunk)
+                        if digest is not None:
+                            digest.update(chunk)
+                finally:
+                    if digest is not None:
+                        self._hashes[upload_id] = (digest, current)
+                    else:
+                        self._hashes.pop(upload_id, None)
+        return self._status(upload_id, info, current)
+
+    def complete(self, upload_id):
+        """
+        Finish a fully received session
+        Returns (StagedUpload, info); the part file is the staged upload and
+        is moved or removed by the caller, after which discard() drops the
+        session. ValueError if bytes are still missing.
+        """
+        info = self.info(upload_id)
+        _, part_path = self._paths(upload_id)
+        with self._lock(upload_id), open(part_path, 'rb') as part:
+            _lock_part(part)
+            size = os.fstat(part.fileno()).st_size
+            if size != info['size']:
+                raise ValueError(f"Upload incomplete: {size} of {info['size']} bytes received")
+            digest, hashed = self._hashes.get(upload_id, (None, None))
+            file_hash = digest.hexdigest() if hashed == size else file_sha256(part_path)
+            head = part.read(SNIFF_BYTES)
+        mime_type = sniff_mime_type(head, info['filename'], info.get('mime_type'))
+        return StagedUpload(str(part_path), file_hash, size, mime_type), info
+
+    def discard(self, upload_id):
+        """Delete a session and whatever it received"""
+        for path in self._paths(upload_id):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._forget(upload_id)
+
+    def expire(self, max_age=SESSION_EXPIRY_SECONDS):
+        """Discard sessions that received nothing for `max_age` seconds; returns how many"""
+        if not self.folder.exists():
+            return 0
+        expired = 0
+        cutoff = time.time() - max_age
+        for info_path in self.folder.glob('*.json'):
+            part_path = info_path.with_suffix('.part')
+            try:
+                last_activity = max(info_path.stat().st_mtime,
+                                    part_path.stat().st_mtime if part_path.exists() else 0)
+            except FileNotFoundError:
+                continue
+            if last_activity < cutoff:
+                self.discard(info_path.stem)
+                expired += 1
+                logger.info(f"🗑️ Expired upload session {info_path.stem}")
+        return expired
@@ -5,11 +5,12 @@ Educational content analysis using Ollama LLM following mcp-smart-notes pattern
 Based on MCP-Testing/smart_tagging_bridge.py implementation
 """
 
+import contextlib
+import io
 import json
 import logging
 from typing import List, Dict, Any, Optional
 from pathlib import Path
-import tempfile
 import os
 import re
 
@@ -356,24 +357,47 @@ Classification:"""
             "analysis_method": "fallback"
         }
     
-    def extract_text_from_file(self, file_path: str, mime_type: Optional[str] = None) -> str:
+    @staticmethod
+    @contextlib.contextmanager
+    def _open_binary(source):
+        """Binary file object over a path (opened and closed here) or a buffer (rewound, left open)"""
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, 'rb') as f:
+                yield f
+        else:
+            source.seek(0)
+            yield source
+    
+    @staticmethod
+    def _decode_text(data: bytes, errors: str = 'strict') -> str:
+        """UTF-8 text with universal newlines, as reading in text mode gives"""
+        return data.decode('utf-8', errors=errors).replace('\r\n', '\n').replace('\r', '\n')
+    
+    def extract_text_from_file(self, source, mime_type: Optional[str] = None, filename: Optional[str] = None) -> str:
         """
         Extract text content from various file formats
+        `source` is the path of an already-saved file or an in-memory buffer
+        (bytes or a binary file object, read from the start and left open),
+        so uploads never need a temporary copy; the format comes from the
+        extension of `filename` (default: the path).
         Enhanced from original content_analysis.py implementation
         """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+        if filename is None:
+            filename = str(source) if isinstance(source, (str, os.PathLike)) else ''
         try:
-            file_path_obj = Path(file_path)
-            file_extension = file_path_obj.suffix.lower()
+            file_extension = Path(filename).suffix.lower()
             
             # Text files
             if file_extension in ['.txt', '.md', '.rst']:
-                with open(file_path_obj, 'r', encoding='utf-8') as f:
-                    return f.read()
+                with self._open_binary(source) as f:
+                    return self._decode_text(f.read())
             
             # PDF files
             if file_extension == '.pdf' and PDF_AVAILABLE:
                 try:
-                    with open(file_path_obj, 'rb') as f:
+                    with self._open_binary(source) as f:
                         pdf_reader = PyPDF2.PdfReader(f)
                         text = ""
                         for page in pdf_reader.pages:
@@ -385,7 +409,8 @@ Classification:"""
             # Word documents
             if file_extension in ['.docx', '.doc'] and DOCX_AVAILABLE:
                 try:
-                    doc = Document(str(file_path_obj))
+                    with self._open_binary(source) as f:
+                        doc = Document(f)
                     text = ""
                     for paragraph in doc.paragraphs:
                         text += paragraph.text + "\n"
@@ -396,7 +421,8 @@ Classification:"""
             # PowerPoint presentations
             if file_extension in ['.pptx', '.ppt'] and PPTX_AVAILABLE:
                 try:
-                    prs = Presentation(str(file_path_obj))
+                    with self._open_binary(source) as f:
+                        prs = Presentation(f)
                     text = ""
                     for slide in prs.slides:
                         for shape in slide.shapes:
@@ -408,15 +434,15 @@ Classification:"""
             
             # Fallback - try to read as text
             try:
-                with open(file_path_obj, 'r', encoding='utf-8', errors='ignore') as f:
-                    return f.read()
+                with self._open_binary(source) as f:
+                    return self._decode_text(f.read(), errors='ignore')
             except Exception:
                 pass
                 
             return ""
             
         except Exception as e:
-            logging.error(f"Content extraction failed for {file_path}: {e}")
+            logging.error(f"Content extraction failed for {filename or 'upload'}: {e}")
             return ""
     
     def analyze_uploaded_content(self, file, metadata: Dict[str, str]) -> Dict[str, Any]:
@@ -430,21 +456,10 @@ Classification:"""
         description = metadata.get('description', '')
         filename = metadata.get('filename', getattr(file, 'filename', ''))
         
-        # Save file temporarily for content extraction
-        temp_file = None
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, 
-                                           suffix=Path(filename).suffix if filename else '.tmp') as tf:
-                if hasattr(file, 'save'):
-                    file.save(tf.name)
-                else:
-                    tf.write(file.read())
-                temp_file = tf.name
-            
-            # Extract content from file
+            # Extract content straight from the upload's buffer (no temporary copy)
             mime_type = getattr(file, 'content_type', None)
-            content = self.extract_text_from_file(temp_file, mime_type)
+            content = self.extract_text_from_file(getattr(file, 'stream', file), mime_type, filename)
             
             # Combine all text for analysis
             combined_content = f"{title}\n{description}\n{content}".strip()
@@ -478,14 +493,6 @@ Classification:"""
                 'status': 'error',
                 'message': str(e)
             }
-        
-        finally:
-            # Clean up temporary file
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except Exception as e:
-                    logging.warning(f"Failed to clean up temp file: {e}")
     
     def get_analyzer_status(self) -> Dict[str, Any]:
         """Get status information about the analyzer"""
@@ -560,6 +567,31 @@ Classification:"""
         if not self.client:
             raise Exception("LLM not available - Auto-upload requires Ollama to be running with 'ollama serve'")
         
+        try:
+            # Call LLM for complete metadata generation
+            logging.info(f"🤖 Calling LLM for metadata generation with model: {self.model}")
+            response = self.client.chat(
+                model=self.model,
+                messages=[{
+                    "role": "user",
+                    "content": self._metadata_prompt(content, filename)
+                }]
+            )
+            return self._metadata_from_response(response, content, filename)
+                
+        except Exception as e:
+            return self._last_resort_metadata(e, content, filename)
+    
+    def reset_client(self):
+        """
+        Replace the Ollama client with a fresh one (after fork)
+        Its HTTP connection pool must not be shared between worker processes
+        """
+        if self.client is not None:
+            self.client = Client()
+    
+    def _metadata_prompt(self, content: str, filename: str) -> str:
+        """Prompt for complete metadata generation"""
         # Enhanced prompt for complete metadata generation
         metadata_prompt = f"""Generate complete database metadata for this educational content.
 
@@ -589,67 +621,60 @@ Guidelines:
 - Focus on educational value and practical classroom use
 - Make the title engaging and specific to the content
 - For suggested_tags: ONLY use tags from the list provided, do NOT create new tags"""
-
+        return metadata_prompt
+    
+    def _metadata_from_response(self, response, content: str, filename: str) -> Dict[str, Any]:
+        """Parse and normalize the LLM's metadata response, falling back to basic analysis on bad JSON"""
+        response_text = (response.message.content or "").strip()
+        logging.debug(f"LLM raw response (first 500 chars): {response_text[:500]}...")
+        
         try:
-            # Call LLM for complete metadata generation
-            logging.info(f"🤖 Calling LLM for metadata generation with model: {self.model}")
-            response = self.client.chat(
-                model=self.model,
-                messages=[{
-                    "role": "user",
-                    "content": metadata_prompt
-                }]
-            )
+            # Use robust JSON extraction method
+            metadata = self._extract_json_from_response(response_text)
             
-            response_text = (response.message.content or "").strip()
-            logging.debug(f"LLM raw response (first 500 chars): {response_text[:500]}...")
+            # Validate and normalize metadata
+            metadata = self._validate_and_normalize_metadata(metadata)
             
-            try:
-                # Use robust JSON extraction method
-                metadata = self._extract_json_from_response(response_text)
-                
-                # Validate and normalize metadata
-                metadata = self._validate_and_normalize_metadata(metadata)
-                
-                # Add generation metadata
-                metadata['auto_processed'] = True
-                metadata['generation_model'] = self.model
-                metadata['categorization_confidence'] = 0.9  # High confidence for complete generation
-                
-                logging.info(f"✅ Complete metadata generated successfully")
-                return {
-                    'status': 'success',
-                    'metadata': metadata
-                }
-                
-            except json.JSONDecodeError as e:
-                logging.error(f"JSON parsing failed: {e}")
-                logging.error(f"Full LLM response: {response_text}")
-                
-                # Try fallback metadata generation with basic analysis
-                logging.warning("Attempting fallback metadata generation...")
-                fallback = self._generate_fallback_metadata(content, filename)
-                if fallback:
-                    return {
-                        'status': 'success',
-                        'metadata': fallback
-                    }
-                
-                raise Exception("LLM returned invalid JSON for metadata generation")
-                
-        except Exception as e:
-            logging.error(f"❌ Metadata generation failed: {e}")
+            # Add generation metadata
+            metadata['auto_processed'] = True
+            metadata['generation_model'] = self.model
+            metadata['categorization_confidence'] = 0.9  # High confidence for complete generation
             
-            # Last resort: basic metadata
-            try:
-                logging.warning("Using last resort basic metadata...")
-                basic_metadata = self._generate_basic_metadata(content, filename)
+            logging.info(f"✅ Complete metadata generated successfully")
+            return {
+                'status': 'success',
+                'metadata': metadata
+            }
+            
+        except json.JSONDecodeError as e:
+            logging.error(f"JSON parsing failed: {e}")
+            logging.error(f"Full LLM response: {response_text}")
+            
+            # Try fallback metadata generation with basic analysis
+            logging.warning("Attempting fallback metadata generation...")
+            fallback = self._generate_fallback_metadata(content, filename)
+            if fallback:
                 return {
                     'status': 'success',
-                    'metadata': basic_metadata
+                    'metadata': fallback
                 }
-            except:
-                raise Exception(f"Metadata generation failed: {str(e)}")
+            
+            raise Exception("LLM returned invalid JSON for metadata generation")
+    
+    def _last_resort_metadata(self, error: Exception, content: str, filename: str) -> Dict[str, Any]:
+        """Basic metadata when the LLM call itself failed"""
+        logging.error(f"❌ Metadata generation failed: {error}")
+        
+        # Last resort: basic metadata
+        try:
+            logging.warning("Using last resort basic metadata...")
+            basic_metadata = self._generate_basic_metadata(content, filename)
+            return {
+                'status': 'success',
+                'metadata': basic_metadata
+            }
+        except:
+            raise Exception(f"Metadata generation failed: {str(error)}")
     
     def _validate_and_normalize_metadata(self, metadata: Dict[str, Any]) -> Dict[str, Any]:
         """Validate and normalize generated metadata to ensure all required fields exist"""
@@ -851,78 +876,48 @@ Guidelines:
             'categorization_confidence': 0.3
         }
     
-    def auto_process_and_save(self, file, upload_path: str) -> Dict[str, Any]:
+    def _build_auto_data(self, metadata: Dict[str, Any], content: str, filename: str,
+                         mime_type: Optional[str]) -> Dict[str, Any]:
+        """Complete data for the database save, from generated metadata and extracted text"""
+        return {
+            'title': metadata['title'],
+            'description': metadata['description'],
+            'subject': metadata['subject'],
+            'content_type': metadata['content_type'],
+            'keywords': metadata['keywords'],
+            'grade_level': metadata['grade_level'],
+            'difficulty_level': metadata['difficulty'],
+            'duration': metadata['estimated_duration'],
+            'suggested_tags': metadata['suggested_tags'],
+            'auto_categorized': True,
+            'categorization_confidence': metadata.get('categorization_confidence', 0.9),
+            'content': content or '',  # Full extracted text, stored compressed in content_texts
+            'original_filename': filename,
+            'mime_type': mime_type or 'application/octet-stream',
+            'generated_metadata': json.dumps({
+                'learning_objectives': metadata.get('learning_objectives', ''),
+                'materials_needed': metadata.get('materials_needed', ''),
+                'generation_model': metadata.get('generation_model', self.model)
+            })
+        }
+    
+    def auto_process(self, source, filename: str, mime_type: Optional[str] = None) -> Dict[str, Any]:
         """
         Task 2.2 Enhancement: Zero-touch processing pipeline
-        1. Extract text content
+        1. Extract text content (from the saved upload's path or its buffer)
         2. Generate metadata via LLM
         3. Return all data ready for database save
         Does NOT save to database - that's handled by the API endpoint
         """
-        
-        # Get filename for context
-        filename = getattr(file, 'filename', 'uploaded_file')
-        
-        # Save file temporarily for content extraction
-        temp_file = None
         try:
-            # Create temporary file
-            with tempfile.NamedTemporaryFile(delete=False, 
-                                           suffix=Path(filename).suffix if filename else '.tmp') as tf:
-                if hasattr(file, 'save'):
-                    file.save(tf.name)
-                else:
-                    tf.write(file.read())
-                temp_file = tf.name
-            
-            # Extract content from file
-            mime_type = getattr(file, 'content_type', None)
-            content = self.extract_text_from_file(temp_file, mime_type)
-            
+            content = self.extract_text_from_file(source, mime_type, filename)
             if not content:
                 # If no text extracted, use filename as context
                 content = f"Educational file: {filename}"
             
             # Generate complete metadata via LLM
             metadata_result = self.generate_complete_metadata(content, filename)
-            
-            if metadata_result['status'] != 'success':
-                raise Exception("Failed to generate metadata")
-            
-            metadata = metadata_result['metadata']
-            
-            # Prepare complete data for database save
-            auto_data = {
-                'title': metadata['title'],
-                'description': metadata['description'],
-                'subject': metadata['subject'],
-                'content_type': metadata['content_type'],
-                'keywords': metadata['keywords'],
-                'grade_level': metadata['grade_level'],
-                'difficulty_level': metadata['difficulty'],
-                'duration': metadata['estimated_duration'],
-                'suggested_tags': metadata['suggested_tags'],
-                'auto_categorized': True,
-                'categorization_confidence': metadata.get('categorization_confidence', 0.9),
-                'content': content[:5000] if content else '',  # Store first 5000 chars for search
-                'original_filename': filename,
-                'mime_type': mime_type or 'application/octet-stream',
-                'generated_metadata': json.dumps({
-                    'learning_objectives': metadata.get('learning_objectives', ''),
-                    'materials_needed': metadata.get('materials_needed', ''),
-                    'generation_model': metadata.get('generation_model', self.model)
-                })
-            }
-            
-            logging.info(f"✅ Auto-processing completed for: {filename}")
-            
-            return {
-                'status': 'success',
-                'auto_data': auto_data,
-                'metadata': metadata,
-                'content_extracted': len(content) > 0,
-                'content_length': len(content)
-            }
+            return self._auto_process_result(metadata_result, content, filename, mime_type)
             
         except Exception as e:
             logging.error(f"❌ Auto-processing failed: {e}")
@@ -930,11 +925,25 @@ Guidelines:
                 'status': 'error',
                 'message': str(e)
             }
+    
+    def _auto_process_result(self, metadata_result: Dict[str, Any], content: str, filename: str,
+                             mime_type: Optional[str]) -> Dict[str, Any]:
+        """Success payload of auto_process"""
+        if metadata_result['status'] != 'success':
+            raise Exception("Failed to generate metadata")
         
-        finally:
-            # Clean up temporary file
-            if temp_file and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except Exception as e:
-                    logging.warning(f"Failed to clean up temp file: {e}") 
\ No newline at end of file
+        metadata = metadata_result['metadata']
+        logging.info(f"✅ Auto-processing completed for: {filename}")
+        
+        return {
+            'status': 'success',
+            'auto_data': self._build_auto_data(metadata, content, filename, mime_type),
+            'metadata': metadata,
+            'content_extracted': len(content) > 0,
+            'content_length': len(content)
+        }
+    
+    def auto_process_and_save(self, file, upload_path: Optional[str] = None) -> Dict[str, Any]:
+        """auto_process for an uploaded FileStorage, read from `upload_path` if already saved, else from its buffer"""
+        source = upload_path or getattr(file, 'stream', file)
+        return self.auto_process(source, getattr(file, 'filename', 'uploaded_file'), getattr(file, 'content_type', None))
@@ -0,0 +1,217 @@
+"""
+Content serializer - shared response layer for content routes
+Builds response dicts from plain column rows and loads tags/categories
+for a whole result set in a fixed number of set-based queries
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import select
+
+from database.models import Content, ContentText, Tag, Category, content_tags
+
+# Response field -> Content columns it needs (tags/category/content come from batch queries)
+CONTENT_FIELD_COLUMNS = {
+    'id': ('id',),
+    'title': ('title',),
+    'subject': ('subject',),
+    'description': ('description',),
+    'content': (),
+    'grade_level': ('grade_level',),
+    'duration': ('duration',),
+    'keywords': ('keywords',),
+    'status': ('status',),
+    'created_at': ('date_created',),
+    'updated_at': ('date_modified',),
+    'tags': (),
+    'category': ('category_id',),
+    'category_id': ('category_id',),
+    'subject_name': ('subject',),
+    'file_path': ('file_path',),
+    'original_filename': ('original_filename',),
+    'file_size': ('file_size',),
+    'mime_type': ('mime_type',),
+    'file_hash': ('file_hash',)
+}
+
+# Detail views return every field, in the historical response order
+CONTENT_DETAIL_FIELDS = tuple(CONTENT_FIELD_COLUMNS)
+
+# List views get a narrow projection unless they ask for more via ?fields=
+CONTENT_LIST_FIELDS = (
+    'id', 'title', 'subject', 'grade_level', 'duration', 'keywords', 'status',
+    'created_at', 'updated_at', 'tags', 'category', 'category_id', 'subject_name'
+)
+
+# Fields whose value is derived from a column rather than copied verbatim
+_STRING_FIELDS = {'created_at', 'updated_at'}
+_COMPUTED_FIELDS = {'tags', 'category', 'content'}
+
+
+def parse_fields(fields_param: Optional[str], default: Sequence[str] = CONTENT_LIST_FIELDS) -> Tuple[str, ...]:
+    """Parse a comma-separated ?fields= projection, raising ValueError on unknown names"""
+    if not fields_param:
+        return tuple(default)
+
+    fields = [field.strip() for field in fields_param.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in CONTENT_FIELD_COLUMNS]
+    if unknown:
+        raise ValueError(f'Unknown fields: {", ".join(unknown)}. '
+                         f'Allowed fields: {", ".join(CONTENT_FIELD_COLUMNS)}')
+    if 'id' not in fields:
+        fields.insert(0, 'id')
+    # Drop duplicates while keeping the caller's order
+    return tuple(dict.fromkeys(fields))
+
+
+class ContentSerializer:
+    """
+    Serializer compiled for one field projection
+    Rows are plain column tuples selected via `columns`, so no ORM objects
+    (and no lazy relationship loads) are involved
+    """
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = tuple(fields)
+
+        # id and date_created are always selected - callers use them for cursors
+        column_names = ['id', 'date_created']
+        for field in self.fields:
+            for column_name in CONTENT_FIELD_COLUMNS[field]:
+                if column_name not in column_names:
+                    column_names.append(column_name)
+        self.column_names = tuple(column_names)
+        self.columns = tuple(getattr(Content, name) for name in column_names)
+        self.index = {name: position for position, name in enumerate(column_names)}
+
+        self.include_tags = 'tags' in self.fields
+        self.include_category = 'category' in self.fields
+        self.include_text = 'content' in self.fields
+
+        # Precomputed (key, row position) pairs for straight column copies
+        self._plain = tuple(
+            (field, self.index[CONTENT_FIELD_COLUMNS[field][0]])
+            for field in self.fields
+            if field not in _STRING_FIELDS and field not in _COMPUTED_FIELDS
+        )
+        self._stringified = tuple(
+            (field, self.index[CONTENT_FIELD_COLUMNS[field][0]])
+            for field in self.fields
+            if field in _STRING_FIELDS
+        )
+        self._id_index = self.index['id']
+        self._category_index = self.index.get('category_id')
+
+    def select(self):
+        """Base SELECT of the columns this projection needs"""
+        return select(*self.columns)
+
+    def serialize(self, session, rows: Sequence[Any], scope=None) -> List[Dict[str, Any]]:
+        """
+        Serialize column rows into response dicts
+        `scope` is an optional SELECT yielding the same content ids as `rows`;
+        when given, tags are loaded with a subquery instead of an id list
+        """
+        if not rows:
+            return []
+
+        tags_by_content = self._load_tags(session, rows, scope) if self.include_tags else None
+        categories = self._load_categories(session, rows) if self.include_category else None
+        texts = self._load_texts(session, rows, scope) if self.include_text else None
+
+        plain = self._plain
+        stringified = self._stringified
+        id_index = self._id_index
+        category_index = self._category_index
+        include_tags = self.include_tags
+        include_category = self.include_category
+        include_text = self.include_text
+        no_tags: List[Dict[str, Any]] = []
+
+        results = []
+        for row in rows:
+            data = {key: row[position] for key, position in plain}
+            for key, position in stringified:
+                value = row[position]
+                data[key] = str(value) if value is not None else ''
+            if include_tags:
+                data['tags'] = tags_by_content.get(row[id_index], no_tags)
+            if include_category:
+                data['category'] = categories.get(row[category_index])
+            if include_text:
+                data['content'] = texts.get(row[id_index])
+            results.append(data)
+        return results
+
+    def stream(self, session, statement, batch_size: int = 500) -> Iterator[List[Dict[str, Any]]]:
+        """
+        Serialize a statement batch by batch using a server-side cursor
+        Only one batch of rows (and its tags) is held in memory at a time
+        """
+        result = session.execute(statement.execution_options(yield_per=batch_size))
+        try:
+            for rows in result.partitions():
+                yield self.serialize(session, rows)
+        finally:
+            result.close()
+
+    def _load_tags(self, session, rows, scope) -> Dict[int, List[Dict[str, Any]]]:
+        """Load tags for every row in a single query"""
+        if scope is not None:
+            content_ids = select(scope.subquery().c.id)
+        else:
+            content_ids = [row[self._id_index] for row in rows]
+
+        statement = (
+            select(content_tags.c.content_id, Tag.id, Tag.name, Tag.color)
+            .join(Tag, Tag.id == content_tags.c.tag_id)
+            .where(content_tags.c.content_id.in_(content_ids))
+            .order_by(content_tags.c.content_id, Tag.id)
+        )
+
+        tags_by_content = defaultdict(list)
+        for content_id, tag_id, name, color in session.execute(statement):
+            tags_by_content[content_id].append({'id': tag_id, 'name': name, 'color': color})
+        return tags_by_content
+
+    def _load_texts(self, session, rows, scope) -> Dict[int, str]:
+        """Load the extracted text of every row in a single query"""
+        if scope is not None:
+            content_ids = select(scope.subquery().c.id)
+        else:
+            content_ids = [row[self._id_index] for row in rows]
+
+        statement = select(ContentText.content_id, ContentText.body).where(ContentText.content_id.in_(content_ids))
+        return dict(session.execute(statement).all())
+
+    def _load_categories(self, session, rows) -> Dict[int, Dict[str, Any]]:
+        """Load the (few) distinct categories referenced by the rows in a single query"""
+        category_ids = {row[self._category_index] for row in rows} - {None}
+        if not category_ids:
+            return {}
+        statement = select(Category.id, Category.name).where(Category.id.in_(category_ids))
+        return {
+            category_id: {'id': category_id, 'name': name}
+            for category_id, name in session.execute(statement)
+        }
+
+
+@lru_cache(maxsize=64)
+def get_serializer(fields: Tuple[str, ...]) -> ContentSerializer:
+    """Return the compiled serializer for a field projection (cached per projection)"""
+    return ContentSerializer(fields)
+
+
+def serialize_content_ids(session, content_ids: Iterable[int],
+                          fields: Sequence[str] = CONTENT_DETAIL_FIELDS) -> List[Dict[str, Any]]:
+    """Serialize specific content ids, preserving the order given"""
+    content_ids = list(content_ids)
+    if not content_ids:
+        return []
+    serializer = get_serializer(tuple(fields))
+    rows = session.execute(serializer.select().where(Content.id.in_(content_ids))).all()
+    by_id = {row[serializer.index['id']]: row for row in rows}
+    ordered = [by_id[content_id] for content_id in content_ids if content_id in by_id]
+    return serializer.serialize(session, ordered)
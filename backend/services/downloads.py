@@ -0,0 +1,74 @@
+"""
+Content file downloads with HTTP validators, caching and proxy offload
+Downloads answer conditional and byte-range requests (seeking in video and
+audio, resumed downloads). Files in the blob store get a strong ETag from
+their SHA-256, which never changes for the same bytes. A download URL
+pinned to that hash (`?v=<file_hash>`) is cached for a year as immutable;
+the plain URL is revalidated each time, since a content id may later name
+another file.
+
+With TEACHING_DB_DOWNLOAD_OFFLOAD set, the app only checks validators and
+hands the file to the front proxy, which streams it with sendfile and
+serves ranges itself:
+    x-accel-redirect  nginx; X-Accel-Redirect: <TEACHING_DB_ACCEL_REDIRECT_PREFIX><path>
+                      (an `internal` location aliasing the upload folder)
+    x-sendfile        Apache mod_xsendfile / lighttpd; X-Sendfile: <absolute path>
+"""
+
+import os
+from urllib.parse import quote
+
+from flask import current_app, request
+from werkzeug.utils import send_file
+
+OFFLOAD_MODES = ('x-accel-redirect', 'x-sendfile')
+ACCEL_REDIRECT_PREFIX = os.environ.get('TEACHING_DB_ACCEL_REDIRECT_PREFIX', '/protected-uploads/')
+
+# Hash-pinned URLs name one exact file forever
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def download_offload_mode(mode=None):
+    """Offload mode from TEACHING_DB_DOWNLOAD_OFFLOAD (None when downloads are served by the app)"""
+    if mode is None:
+        mode = os.environ.get('TEACHING_DB_DOWNLOAD_OFFLOAD', '')
+    mode = mode.strip().lower()
+    if mode in ('', 'off', 'none'):
+        return None
+    if mode not in OFFLOAD_MODES:
+        raise ValueError(f"Unknown download offload mode '{mode}' (use one of: {', '.join(OFFLOAD_MODES)})")
+    return mode
+
+
+def send_upload(upload_folder, relative_path, download_name, mimetype, file_hash=None, offload=None):
+    """
+    Response for a stored upload, honouring If-None-Match, If-Modified-Since,
+    Range and If-Range. Raises werkzeug's RequestedRangeNotSatisfiable for a
+    range outside the file.
+    """
+    path = os.path.join(upload_folder, relative_path)
+    pinned = file_hash is not None and request.args.get('v') == file_hash
+    response = send_file(
+        path, request.environ,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=download_name,
+        conditional=offload is None,
+        etag=file_hash or True,
+        max_age=IMMUTABLE_MAX_AGE if pinned else None,
+        use_x_sendfile=offload is not None,
+        response_class=current_app.response_class
+    )
+    if pinned:
+        response.cache_control.immutable = True
+
+    if offload is not None:
+        # Validators are checked here (304 without touching the proxy); ranges are the proxy's job
+        response = response.make_conditional(request.environ)
+        if response.status_code == 304:
+            # Some proxies send the file anyway when the header is present
+            del response.headers['X-Sendfile']
+        elif offload == 'x-accel-redirect' and 'X-Sendfile' in response.headers:
+            del response.headers['X-Sendfile']
+            response.headers['X-Accel-Redirect'] = ACCEL_REDIRECT_PREFIX + quote(relative_path.replace(os.sep, '/'))
+    return response
@@ -0,0 +1,134 @@
+"""
+Per-request SQL instrumentation
+Cursor execute hooks on the database engines count the statements each
+request runs and time them. Slow requests and statements repeated often
+enough to look like an N+1 pattern are written to the performance log, and
+the numbers can be exposed in a Server-Timing response header.
+"""
+
+import logging
+import os
+import time
+from collections import Counter
+from pathlib import Path
+
+from flask import current_app, g, has_request_context, request
+from sqlalchemy import event
+
+# Requests slower than this (wall clock) are logged
+SLOW_REQUEST_SECONDS = float(os.environ.get('TEACHING_DB_SLOW_REQUEST_MS', 500)) / 1000
+# The same statement this many times in one request is reported as a possible N+1
+N_PLUS_ONE_THRESHOLD = int(os.environ.get('TEACHING_DB_N_PLUS_ONE_THRESHOLD', 10))
+# Add the SQL numbers to the Server-Timing header (off by default)
+HEADER_ENV_VAR = 'TEACHING_DB_SQL_STATS_HEADER'
+
+PERFORMANCE_LOG = Path(os.environ.get(
+    'TEACHING_DB_PERFORMANCE_LOG',
+    Path(__file__).parent.parent.parent / 'logs' / 'teaching-content-db_performance.log'))
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(module)s:%(lineno)d - %(message)s'
+
+# Statements are shortened to this many characters in log lines
+STATEMENT_PREVIEW = 200
+
+perf_logger = logging.getLogger('teaching-content-db.performance')
+
+
+class QueryStats:
+    """SQL statements run by one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement = None
+        self.statements = Counter()
+
+    def record(self, statement, duration):
+        self.count += 1
+        self.total_time += duration
+        self.statements[statement] += 1
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+
+    def repeated(self, threshold=N_PLUS_ONE_THRESHOLD):
+        """Statements run at least `threshold` times, most frequent first"""
+        return [(statement, times) for statement, times in self.statements.most_common() if times >= threshold]
+
+
+def _preview(statement):
+    return ' '.join(statement.split())[:STATEMENT_PREVIEW]
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault('query_start_times', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    start_times = conn.info.get('query_start_times')
+    if not start_times or not has_request_context():
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    stats = g.get('query_stats')
+    if stats is None:
+        stats = g.query_stats = QueryStats()
+    stats.record(statement, duration)
+
+
+def instrument_engine(engine):
+    """Attach the cursor execute hooks to an engine (once)"""
+    if not event.contains(engine, 'before_cursor_execute', _before_cursor_execute):
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+def _configure_performance_log():
+    """Send the performance logger to PERFORMANCE_LOG (TEACHING_DB_PERFORMANCE_LOG)"""
+    if perf_logger.handlers:
+        return
+    try:
+        PERFORMANCE_LOG.parent.mkdir(parents=True, exist_ok=True)
+        handler = logging.FileHandler(PERFORMANCE_LOG, encoding='utf-8', delay=True)
+    except OSError as e:
+        logging.warning(f"Performance log unavailable: {e}")
+        return
+    handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt='%Y-%m-%d %H:%M:%S'))
+    perf_logger.addHandler(handler)
+    perf_logger.setLevel(logging.INFO)
+
+
+def init_query_stats(app, manager):
+    """Instrument the manager's engines and register the per-request hooks on a Flask app"""
+    instrument_engine(manager.engine)
+    instrument_engine(manager.read_engine)
+    _configure_performance_log()
+    app.config.setdefault('SQL_STATS_HEADER', os.environ.get(HEADER_ENV_VAR, '0') == '1')
+
+    @app.before_request
+    def start_request_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def report_query_stats(response):
+        stats = g.get('query_stats') or QueryStats()
+        started = g.get('request_started')
+        elapsed = time.perf_counter() - started if started is not None else 0.0
+        where = f"{request.method} {request.full_path.rstrip('?')}"
+
+        if elapsed > SLOW_REQUEST_SECONDS:
+            message = (f"Slow request {where}: {elapsed * 1000:.0f}ms, {stats.count} SQL statements "
+                       f"in {stats.total_time * 1000:.1f}ms")
+            if stats.slowest_statement:
+                message += f", slowest {stats.slowest_time * 1000:.1f}ms: {_preview(stats.slowest_statement)}"
+            perf_logger.warning(message)
+
+        for statement, times in stats.repeated():
+            perf_logger.warning(f"Possible N+1 in {where}: {times} x {_preview(statement)}")
+
+        if current_app.config['SQL_STATS_HEADER']:
+            response.headers.add('Server-Timing', f'db-queries;desc="{stats.count} statements";'
+                                                  f'dur={stats.total_time * 1000:.1f}')
+            response.headers.add('Server-Timing', f'db-slowest;dur={stats.slowest_time * 1000:.1f}')
+        return response
@@ -0,0 +1,73 @@
+"""
+Request-scoped database sessions
+At most one writer and one read-only session per request, each opened on
+first use and closed when the app context tears down, so no route has to
+close sessions by hand. The time spent waiting for pooled connections is
+recorded for every request.
+"""
+
+import logging
+import time
+
+from flask import g, request
+
+# Pool checkouts slower than this are logged (pool too small for the thread count)
+SLOW_CHECKOUT_SECONDS = 0.1
+
+
+# g attribute -> DatabaseManager session factory
+_SESSION_KINDS = {
+    'db_session': 'get_session',
+    'db_read_session': 'get_read_session',
+}
+
+
+def _request_session(kind):
+    """Return the request's session of the given kind, opening it on first use"""
+    session = g.get(kind)
+    if session is None:
+        from database.database import get_database_manager
+
+        session = getattr(get_database_manager(), _SESSION_KINDS[kind])()
+        # Check out eagerly so the pool wait is measured on its own
+        start = time.perf_counter()
+        session.connection()
+        g.db_checkout_wait = g.get('db_checkout_wait', 0.0) + time.perf_counter() - start
+        setattr(g, kind, session)
+    return session
+
+
+def get_db_session():
+    """Return the current request's writer session"""
+    return _request_session('db_session')
+
+
+def get_read_session():
+    """Return the current request's session on the read-only pool"""
+    return _request_session('db_read_session')
+
+
+def init_request_sessions(app):
+    """Register teardown and checkout instrumentation hooks on a Flask app"""
+
+    @app.after_request
+    def report_checkout_wait(response):
+        wait = g.get('db_checkout_wait')
+        if wait is not None:
+            response.headers.add('Server-Timing', f'db-checkout;dur={wait * 1000:.1f}')
+            if wait > SLOW_CHECKOUT_SECONDS:
+                logging.warning(f"Slow DB pool checkout: {wait * 1000:.0f}ms for {request.method} {request.path}")
+        return response
+
+    @app.teardown_appcontext
+    def close_db_sessions(exception=None):
+        for kind in _SESSION_KINDS:
+            session = g.pop(kind, None)
+            if session is None:
+                continue
+            try:
+                if exception is not None:
+                    session.rollback()
+            finally:
+                # Returns the connection to the pool (rolling back anything uncommitted)
+                session.close()
@@ -0,0 +1,52 @@
+"""
+Response cache - generation-keyed cache for catalog read endpoints
+Entries are tagged with the change generation they were built at, so any
+write to the catalog invalidates them without explicit purging
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+
+class ResponseCache:
+    """Thread-safe LRU of serialized responses keyed by request path"""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[int, bytes, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, generation: int) -> Optional[Tuple[bytes, str]]:
+        """Return (body, mimetype) if cached at this generation"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != generation:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: str, generation: int, body: bytes, mimetype: str) -> None:
+        """Store a response body built at the given generation"""
+        with self._lock:
+            self._entries[key] = (generation, body, mimetype)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+def make_etag(generation: int) -> str:
+    """ETag value for a catalog representation built at a generation"""
+    return f'g{generation}'
@@ -0,0 +1,264 @@
+"""
+Background auto-upload jobs
+Auto-upload requests only stage the file and record a job in the
+`upload_jobs` table; a bounded pool of worker threads drains the table,
+running extraction, metadata generation and the content insert for up to
+TEACHING_DB_AUTO_UPLOAD_WORKERS files at once (size it to what the LLM
+serves in parallel). The table is the queue: workers claim the oldest
+queued job with a conditional UPDATE, so jobs survive restarts and several
+worker processes can share one database. A job whose worker died is
+requeued once it has not progressed for STALE_JOB_SECONDS.
+
+Layout:
+    uploads/jobs/<id>    (staged uploads waiting for their job)
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import and_, delete, or_, update
+
+from database.models import UploadJob
+
+logger = logging.getLogger(__name__)
+
+JOBS_DIR = 'jobs'
+
+DEFAULT_WORKERS = int(os.environ.get('TEACHING_DB_AUTO_UPLOAD_WORKERS', 4))
+# Idle workers look for jobs queued by other processes this often
+POLL_SECONDS = 5
+# A processing job not updated for this long lost its worker
+STALE_JOB_SECONDS = 900
+MAX_ATTEMPTS = 3
+# Finished jobs are kept this long for clients to read their outcome
+FINISHED_JOB_RETENTION_SECONDS = 7 * 24 * 3600
+
+FINISHED_JOB_STATUSES = ('succeeded', 'failed')
+
+
+def serialize_job(job):
+    """API representation of an UploadJob"""
+    return {
+        'id': job.id,
+        'status': job.status,
+        'stage': job.stage,
+        'original_filename': job.original_filename,
+        'file_size': job.file_size,
+        'content_id': job.content_id,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'attempts': job.attempts,
+        'date_created': job.date_created.isoformat() if job.date_created else None,
+        'date_updated': job.date_updated.isoformat() if job.date_updated else None,
+    }
+
+
+def queued_job_data(job):
+    """Response data for a newly queued job, with where to follow it"""
+    return {
+        'job_id': job['id'],
+        'job': job,
+        'status_url': f"/api/jobs/{job['id']}",
+        'events_url': f"/api/jobs/events?ids={job['id']}"
+    }
+
+
+def record_job_success(session, job_id, result):
+    """Mark a job succeeded; call in the transaction that saves its content"""
+    session.execute(update(UploadJob).where(UploadJob.id == job_id).values(
+        status='succeeded', stage=None, content_id=result.get('id'),
+        result=json.dumps(result, default=str), date_updated=datetime.utcnow()))
+
+
+class UploadJobQueue:
+    """
+    Persistent auto-upload queue with a bounded worker pool
+    `process(job, progress)` does the work for one job (a dict from
+    serialize_job plus file_path, file_hash and mime_type): it reports
+    stages through `progress(stage)` and saves the content in a write that
+    also calls record_job_success(). Raising marks the job failed and removes
+    its staged file. Job writes go through the write queue like every
+    other write.
+    """
+
+    def __init__(self, session_factory, write_queue, process, workers=DEFAULT_WORKERS):
+        self.session_factory = session_factory
+        self.write_queue = write_queue
+        self.process = process
+        self.workers = max(1, workers)
+        self._threads = []
+        self._wakeups = queue.Queue()
+        self._lock = threading.Lock()
+
+        # Bumped on every job change made by this process (progress streams wait on it)
+        self._changed = threading.Condition()
+        self.version = 0
+
+    def enqueue(self, upload_folder, staged, original_filename):
+        """Move a StagedUpload into the jobs folder and queue it; returns the job"""
+        job_id = uuid.uuid4().hex
+        jobs_dir = Path(upload_folder) / JOBS_DIR
+        jobs_dir.mkdir(parents=True, exist_ok=True)
+        job_path = str(jobs_dir / job_id)
+        os.replace(staged.path, job_path)
+
+        def save_job(session):
+            job = UploadJob(id=job_id, status='queued', original_filename=original_filename,
+                            file_path=job_path, file_size=staged.size, file_hash=staged.file_hash,
+                            mime_type=staged.mime_type)
+            session.add(job)
+            session.flush()
+            return serialize_job(job)
+
+        try:
+            job = self.write_queue.submit(save_job)
+        except Exception:
+            os.remove(job_path)
+            raise
+        self._notify()
+        self.start()
+        self._wakeups.put(job_id)
+        return job
+
+    def get(self, job_ids):
+        """Jobs by id, in the order asked for (unknown ids are left out)"""
+        session = self.session_factory()
+        try:
+            jobs = {job.id: serialize_job(job)
+                    for job in session.query(UploadJob).filter(UploadJob.id.in_(job_ids))}
+        finally:
+            session.close()
+        return [jobs[job_id] for job_id in job_ids if job_id in jobs]
+
+    def wait_for_change(self, version, timeout):
+        """Block until a job changes after `version` (or timeout); returns the current version"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.version != version, timeout)
+            return self.version
+
+    def _notify(self):
+        with self._changed:
+            self.version += 1
+            self._changed.notify_all()
+
+    def start(self):
+        """Start the worker threads (once per process)"""
+        with self._lock:
+            self._threads = [thread for thread in self._threads if thread.is_alive()]
+            for number in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._work, name=f'upload-job-{number}', daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def resume(self):
+        """Start workers if jobs are waiting, e.g. queued before a restart"""
+        session = self.session_factory()
+        try:
+            waiting = session.query(UploadJob.id).filter(
+                UploadJob.status.in_(('queued', 'processing'))).first()
+        finally:
+            session.close()
+        if waiting:
+            logger.info("📥 Resuming queued auto-upload jobs")
+            self.start()
+
+    def prune(self, max_age=FINISHED_JOB_RETENTION_SECONDS):
+        """Delete jobs finished more than `max_age` seconds ago; returns how many"""
+        cutoff = datetime.utcnow() - timedelta(seconds=max_age)
+
+        def delete_finished(session):
+            return session.execute(delete(UploadJob).where(
+                UploadJob.status.in_(FINISHED_JOB_STATUSES), UploadJob.date_updated < cutoff)).rowcount
+
+        return self.write_queue.submit(delete_finished)
+
+    def reset_after_fork(self):
+        """Drop the parent's worker threads in a forked process"""
+        self._threads = []
+        self._wakeups = queue.Queue()
+        self._lock = threading.Lock()
+        self._changed = threading.Condition()
+
+    def _claimable(self):
+        stale = datetime.utcnow() - timedelta(seconds=STALE_JOB_SECONDS)
+        return or_(UploadJob.status == 'queued',
+                   and_(UploadJob.status == 'processing', UploadJob.date_updated < stale))
+
+    def _claim(self):
+        """Claim the oldest waiting job for this worker; None when there is none"""
+        session = self.session_factory()
+        try:
+            candidates = [job_id for (job_id,) in session.query(UploadJob.id).filter(self._claimable())
+                          .order_by(UploadJob.date_created).limit(self.workers * 2)]
+        finally:
+            session.close()
+
+        for job_id in candidates:
+            def claim(session):
+                claimed = session.execute(
+                    update(UploadJob).where(UploadJob.id == job_id, self._claimable()).values(
+                        status='processing', stage='analyzing', attempts=UploadJob.attempts + 1,
+                        date_updated=datetime.utcnow())
+                ).rowcount
+                if not claimed:
+                    return None
+                job = session.get(UploadJob, job_id)
+                return dict(serialize_job(job), file_path=job.file_path, file_hash=job.file_hash,
+                            mime_type=job.mime_type)
+
+            job = self.write_queue.submit(claim)
+            if job:
+                return job
+        return None
+
+    def _work(self):
+        while True:
+            try:
+                job = self._claim()
+            except Exception as e:
+                logger.error(f"Claiming an upload job failed: {e}")
+                job = None
+            if job is None:
+                try:
+                    self._wakeups.get(timeout=POLL_SECONDS)
+                except queue.Empty:
+                    pass
+                continue
+            self._notify()
+            self._run(job)
+
+    def _set(self, job_id, **values):
+        values['date_updated'] = datetime.utcnow()
+
+        def save(session):
+            session.execute(update(UploadJob).where(UploadJob.id == job_id).values(**values))
+
+        self.write_queue.submit(save)
+        self._notify()
+
+    def _run(self, job):
+        start = time.perf_counter()
+        try:
+            if job['attempts'] > MAX_ATTEMPTS:
+                raise RuntimeError(f"Gave up after {MAX_ATTEMPTS} interrupted attempts")
+            self.process(job, lambda stage: self._set(job['id'], stage=stage))
+            logger.info(f"✅ Upload job {job['id']} ({job['original_filename']}) done in "
+                        f"{time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            logger.error(f"❌ Upload job {job['id']} ({job['original_filename']}) failed: {e}")
+            try:
+                os.remove(job['file_path'])
+            except OSError:
+                pass
+            try:
+                self._set(job['id'], status='failed', stage=None, error=str(e))
+            except Exception as save_error:
+                logger.error(f"Recording the failure of upload job {job['id']} failed: {save_error}")
+        self._notify()
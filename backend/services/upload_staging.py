@@ -0,0 +1,33 @@
+"""
+Single-pass upload staging for the Flask app
+Multipart file parts posted to the upload endpoints are streamed by
+werkzeug straight into StagingFiles in the upload folder's staging area,
+instead of into a spooled temporary file that the route then copies and
+re-reads to hash. Staged files a request did not move into the blob store
+(rejected or failed uploads) are deleted when the request ends.
+"""
+
+from flask import request
+
+from services.blob_store import BlobStore
+
+
+def init_upload_staging(app, endpoints):
+    """Stream uploads to the given endpoint names into staging files"""
+
+    class StagingRequest(app.request_class):
+        staging_files = ()
+
+        def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+            if self.endpoint not in endpoints:
+                return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+            staging = BlobStore(app.config['UPLOAD_FOLDER']).open_staging(filename)
+            self.staging_files += (staging,)
+            return staging
+
+    app.request_class = StagingRequest
+
+    @app.teardown_request
+    def discard_staged_uploads(exc):
+        for staging in request.staging_files:
+            staging.discard()
@@ -0,0 +1,192 @@
+"""
+Upload helpers shared by the WSGI and ASGI servers
+File validation, upload file names, MIME sniffing and the Content record
+built from auto-generated metadata
+"""
+
+import json
+import mimetypes
+import uuid
+from datetime import datetime
+
+from werkzeug.utils import secure_filename
+
+from database.models import Content
+
+# File upload configuration
+ALLOWED_EXTENSIONS = {
+    'pdf', 'doc', 'docx', 'txt', 'rtf', 'odt',  # Documents
+    'ppt', 'pptx', 'odp',  # Presentations
+    'xls', 'xlsx', 'ods', 'csv',  # Spreadsheets
+    'jpg', 'jpeg', 'png', 'gif', 'bmp', 'svg',  # Images
+    'mp3', 'wav', 'ogg', 'm4a',  # Audio
+    'mp4', 'avi', 'mov', 'wmv', 'flv', 'webm',  # Video
+    'zip', 'rar', '7z', 'tar', 'gz'  # Archives
+}
+
+# Tags auto-upload may assign (existing tags only - never created)
+AUTO_TAG_NAMES = ['worksheet', 'lesson-plan', 'assessment', 'interactive',
+                  'homework', 'group-work', 'individual', 'beginner',
+                  'advanced', 'resource', 'activity']
+
+
+def allowed_file(filename):
+    """Check if file extension is allowed"""
+    return '.' in filename and \
+           filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+
+
+# Leading bytes of an upload kept for MIME sniffing (tar's magic sits at offset 257)
+SNIFF_BYTES = 512
+
+# Magic bytes -> MIME type
+MIME_SIGNATURES = [
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'{\\rtf', 'application/rtf'),
+    (b'ID3', 'audio/mpeg'),
+    (b'OggS', 'audio/ogg'),
+    (b'FLV\x01', 'video/x-flv'),
+    (b'\x1a\x45\xdf\xa3', 'video/webm'),
+    (b'\x30\x26\xb2\x75\x8e\x66\xcf\x11', 'video/x-ms-wmv'),
+    (b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed'),
+    (b'Rar!\x1a\x07', 'application/vnd.rar'),
+    (b'\x1f\x8b', 'application/gzip'),
+    (b'PK\x03\x04', 'application/zip'),
+    (b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'application/x-ole-storage'),
+]
+
+# Container formats: the extension tells which document type is inside
+CONTAINER_TYPES = {
+    'application/zip': ('application/vnd.openxmlformats-officedocument.', 'application/vnd.oasis.opendocument.'),
+    'application/x-ole-storage': ('application/msword', 'application/vnd.ms-excel', 'application/vnd.ms-powerpoint'),
+}
+
+
+def sniff_mime_type(head, filename=None, declared_type=None):
+    """
+    MIME type of an upload from its first SNIFF_BYTES bytes
+    Magic bytes win over the client's declared type; the filename only
+    picks the document type inside ZIP/OLE containers and names text and
+    unrecognised binary formats.
+    """
+    guessed = mimetypes.guess_type(filename or '')[0]
+    sniffed = next((mime_type for magic, mime_type in MIME_SIGNATURES if head.startswith(magic)), None)
+    if sniffed is None:
+        if head[:4] == b'RIFF':
+            sniffed = {b'WAVE': 'audio/wav', b'AVI ': 'video/x-msvideo'}.get(head[8:12])
+        elif head[4:8] == b'ftyp':
+            sniffed = {b'M4A ': 'audio/mp4', b'qt  ': 'video/quicktime'}.get(head[8:12], 'video/mp4')
+        elif head[257:262] == b'ustar':
+            sniffed = 'application/x-tar'
+
+    if sniffed in CONTAINER_TYPES:
+        if guessed and guessed.startswith(CONTAINER_TYPES[sniffed]):
+            return guessed
+        return 'application/zip' if sniffed == 'application/zip' else 'application/octet-stream'
+    if sniffed:
+        return sniffed
+
+    if b'\x00' not in head:
+        try:
+            # A multi-byte character may be cut off at the end of the head
+            text = head.decode('utf-8', errors='strict' if len(head) < SNIFF_BYTES else 'ignore')
+        except UnicodeDecodeError:
+            text = None
+        if text is not None:
+            if '<svg' in text:
+                return 'image/svg+xml'
+            return guessed if guessed and guessed.startswith('text/') else 'text/plain'
+
+    return guessed or declared_type or 'application/octet-stream'
+
+
+def sanitize_filename(filename):
+    """Sanitize filename to prevent directory traversal and other security issues"""
+    if not filename:
+        return 'unnamed_file'
+
+    # Use werkzeug's secure_filename for basic sanitization
+    filename = secure_filename(filename)
+
+    # Additional sanitization
+    filename = filename.replace('..', '').replace('/', '').replace('\\', '')
+
+    # Ensure filename is not empty after sanitization
+    if not filename or filename == '.':
+        filename = 'unnamed_file'
+
+    return filename
+
+
+def generate_unique_filename(original_filename, content_type=None):
+    """Generate a unique filename while preserving the original extension"""
+    if not original_filename:
+        original_filename = 'file'
+
+    # Extract extension
+    if '.' in original_filename:
+        name, ext = original_filename.rsplit('.', 1)
+        ext = '.' + ext.lower()
+    else:
+        name = original_filename
+        ext = ''
+
+    # Generate unique identifier
+    unique_id = str(uuid.uuid4())[:8]
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+    # Create unique filename
+    unique_filename = f"{sanitize_filename(name)}_{timestamp}_{unique_id}{ext}"
+
+    return unique_filename
+
+
+def build_auto_content(auto_data, category_id, relative_path, original_filename, file_size, file_hash=None):
+    """Content record for an auto-processed upload (see ContentAnalyzer.auto_process)"""
+    return Content(
+        title=auto_data['title'],
+        content_type=auto_data['content_type'],
+        subject=auto_data['subject'],
+        description=auto_data['description'],
+        content=auto_data.get('content', ''),
+        grade_level=auto_data['grade_level'],
+        difficulty_level=auto_data['difficulty_level'],
+        duration=auto_data['duration'],
+        keywords=auto_data['keywords'],
+        category_id=category_id,
+        file_path=relative_path,
+        original_filename=original_filename,
+        file_size=file_size,
+        file_hash=file_hash,
+        mime_type=auto_data['mime_type'],
+        auto_categorized=True,
+        categorization_confidence=auto_data['categorization_confidence'],
+        suggested_tags=json.dumps(auto_data['suggested_tags']),
+        auto_processed=True,
+        generated_metadata=auto_data.get('generated_metadata', '{}')
+    )
+
+
+def auto_upload_result(content, tag_names, metadata):
+    """Response payload for a successful auto-upload"""
+    return {
+        'id': content.id,
+        'title': content.title,
+        'subject': content.subject,
+        'content_type': content.content_type,
+        'description': content.description,
+        'grade_level': content.grade_level,
+        'difficulty_level': content.difficulty_level,
+        'duration': content.duration,
+        'keywords': content.keywords,
+        'file_path': content.file_path,
+        'original_filename': content.original_filename,
+        'file_size': content.file_size,
+        'tags': tag_names,
+        'auto_processed': True,
+        'metadata': metadata
+    }
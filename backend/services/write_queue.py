@@ -0,0 +1,127 @@
+"""
+Write queue - single writer thread with group commit
+Request threads submit write operations; the writer thread runs every
+operation arriving within a short window in one transaction, so a burst of
+uploads pays for one lock acquisition and one fsync instead of one each.
+"""
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, List, Tuple
+
+# How long the writer waits for more operations after the first one arrives
+DEFAULT_WINDOW_SECONDS = 0.005
+DEFAULT_MAX_BATCH = 64
+
+
+class WriteQueue:
+    """
+    Serializes writes through one thread and commits them in groups
+    An operation is a callable taking the writer session and returning a
+    plain result (not ORM objects - the session is closed after the batch).
+    Operations must only touch the database: when one fails, the batch is
+    rolled back and the others are re-run one transaction each, so every
+    caller gets its own result or its own exception.
+    """
+
+    def __init__(self, session_factory: Callable[[], Any],
+                 window: float = DEFAULT_WINDOW_SECONDS, max_batch: int = DEFAULT_MAX_BATCH):
+        self.session_factory = session_factory
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: "queue.Queue[Tuple[Callable, Future]]" = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+        # Counters for benchmarks and health checks
+        self.batches = 0
+        self.operations = 0
+
+    def submit(self, operation: Callable[[Any], Any]) -> Any:
+        """Run `operation(session)` on the writer thread and return its result once committed"""
+        if self.window <= 0:
+            return self._run_alone(operation)
+
+        self._ensure_started()
+        future: Future = Future()
+        self._queue.put((operation, future))
+        return future.result()
+
+    def reset_after_fork(self):
+        """Drop the parent's writer thread and queue state in a forked worker"""
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                self._commit_batch(batch)
+            except Exception as e:
+                # The writer thread must outlive a failed batch, and no caller may wait forever
+                logging.error(f"Writer failed on a batch of {len(batch)} writes: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def _commit_batch(self, batch: List[Tuple[Callable, Future]]):
+        """Run a batch in one transaction, falling back to one transaction per operation"""
+        self.batches += 1
+        self.operations += len(batch)
+
+        session = None
+        try:
+            # Inside the try: a pool timeout here fails the batch instead of the writer thread
+            session = self.session_factory()
+            results = [operation(session) for operation, _ in batch]
+            session.commit()
+        except Exception as e:
+            if session is not None:
+                try:
+                    session.rollback()
+                finally:
+                    session.close()
+            if len(batch) > 1:
+                logging.warning(f"Group commit of {len(batch)} writes failed ({e}); retrying individually")
+            for operation, future in batch:
+                try:
+                    future.set_result(self._run_alone(operation))
+                except Exception as single_error:
+                    future.set_exception(single_error)
+            return
+
+        session.close()
+        for (_, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def _run_alone(self, operation: Callable[[Any], Any]) -> Any:
+        """Run one operation in its own transaction"""
+        session = self.session_factory()
+        try:
+            result = operation(session)
+            session.commit()
+            return result
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Backup Script for Teaching Content Database
+
+Copies the live database with the SQLite online backup API (the server can
+keep running) and snapshots the uploads tree incrementally into a new
+generation in the backup folder, then rotates old generations.
+
+Usage:
+    python backup_database.py                     # database + uploads, keep 7 generations
+    python backup_database.py --keep 14 --no-uploads
+    python backup_database.py --list              # show generations
+    python backup_database.py --verify 20261017-020000
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_path = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_path))
+
+from database.database import DatabaseManager
+from services.backup import BackupManager, BACKUP_STEP_PAGES, BACKUP_STEP_PAUSE, DEFAULT_KEEP
+
+UPLOAD_FOLDER = Path(__file__).parent / 'uploads'
+
+
+def print_generations(backups):
+    generations = backups.generations()
+    print(f"📂 {len(generations)} backup generation(s) in {backups.backup_folder}")
+    for generation in generations:
+        manifest = backups.read_manifest(generation)
+        database = manifest.get('database')
+        uploads = manifest.get('uploads')
+        parts = []
+        if database:
+            parts.append(f"database {database['size'] / 1024 / 1024:.1f}MB (schema {database['schema_version']})")
+        if uploads is not None:
+            parts.append(f"{len(uploads)} uploads")
+        print(f"   💾 {generation.name}: {', '.join(parts) or 'empty'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Back up the Teaching Content Database and uploads')
+    parser.add_argument('--database-url', help='database to back up (default: teaching_content.db)')
+    parser.add_argument('--backup-folder', help='where generations are kept (default: backups/)')
+    parser.add_argument('--uploads', default=str(UPLOAD_FOLDER), help='uploads folder to snapshot')
+    parser.add_argument('--no-uploads', action='store_true', help='back up the database only')
+    parser.add_argument('--keep', type=int, default=DEFAULT_KEEP, help='generations to keep')
+    parser.add_argument('--pages', type=int, default=BACKUP_STEP_PAGES, help='database pages copied per step')
+    parser.add_argument('--pause', type=float, default=BACKUP_STEP_PAUSE, help='seconds to sleep between steps')
+    parser.add_argument('--list', action='store_true', help='list backup generations and exit')
+    parser.add_argument('--verify', metavar='GENERATION', help='re-check the checksums of a generation and exit')
+    args = parser.parse_args()
+
+    backups = BackupManager(args.backup_folder, keep=args.keep)
+    if args.list:
+        print_generations(backups)
+        return True
+
+    if args.verify:
+        problems = backups.verify(args.verify)
+        for problem in problems:
+            print(f"   ❌ {problem}")
+        print("✅ Backup verified" if not problems else f"❌ {len(problems)} problem(s) found")
+        return not problems
+
+    print("=" * 60)
+    print("🚀 Teaching Content Database - Backup")
+    print("=" * 60)
+    manager = DatabaseManager(args.database_url)
+    try:
+        generation = backups.create_backup(
+            manager, None if args.no_uploads else args.uploads, pages=args.pages, pause=args.pause
+        )
+    except Exception as e:
+        print(f"❌ Backup failed: {e}")
+        return False
+    finally:
+        manager.dispose()
+
+    print(f"✅ Backup written to {generation}")
+    print_generations(backups)
+    return True
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
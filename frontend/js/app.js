@@ -13,6 +13,7 @@ class App {
     
     // Data storage
     this.allContent = [];
+    this.syncToken = null; // position in /api/content/changes
     this.allTags = [];
     this.allCategories = [];
     this.selectedTagIds = new Set();
@@ -752,6 +753,46 @@ class App {
     }
 
     this.displayFilteredContent(filteredContent);
+    this.refreshFacetCounts();
+  }
+
+  async refreshFacetCounts() {
+    // Server computes every facet count in one grouped query for the active filters
+    const params = new URLSearchParams();
+    if (this.selectedTagIds.size > 0) {
+      params.set('tags', Array.from(this.selectedTagIds).join(','));
+    }
+    Array.from(this.selectedCategoryIds).forEach(categoryId => {
+      const category = (this.allCategories || []).find(cat => cat.id === categoryId);
+      if (category) params.append('subject', category.name);
+    });
+
+    try {
+      const response = await fetch(`/api/facets?${params}`);
+      const data = await response.json();
+      if (data.status !== 'success') return;
+
+      const { facets } = data.data;
+      const tagCounts = new Map(facets.tags.map(tag => [tag.id, tag.count]));
+      const subjectCounts = new Map(facets.subject.map(subject => [subject.value, subject.count]));
+
+      document.querySelectorAll('.filter-tag-chip').forEach(chip => {
+        const countElement = chip.querySelector('.tag-count');
+        if (countElement) {
+          countElement.textContent = tagCounts.get(parseInt(chip.dataset.tagId)) || 0;
+        }
+      });
+
+      document.querySelectorAll('.category-checkbox').forEach(checkbox => {
+        const category = (this.allCategories || []).find(cat => cat.id === parseInt(checkbox.dataset.categoryId));
+        const countElement = checkbox.closest('.category-checkbox-label')?.querySelector('.category-content-count');
+        if (category && countElement) {
+          countElement.textContent = subjectCounts.get(category.name) || 0;
+        }
+      });
+    } catch (error) {
+      console.warn('Failed to refresh facet counts:', error);
+    }
   }
 
   displayFilteredContent(content) {
@@ -951,10 +992,29 @@ class App {
 
   async loadAllContent() {
     try {
-      const response = await fetch('/api/content');
-      const data = await response.json();
-      this.allContent = data.data || [];
-      
+      // Incremental sync: after the first full load only changes and deletions are fetched
+      const fields = [
+        'id', 'title', 'subject', 'subject_name', 'description', 'grade_level', 'duration',
+        'status', 'tags', 'category', 'category_id', 'file_path', 'original_filename'
+      ].join(',');
+      const byId = new Map(this.syncToken ? this.allContent.map(item => [item.id, item]) : []);
+      let token = this.syncToken;
+      let hasMore = true;
+      while (hasMore) {
+        const params = new URLSearchParams({ limit: 500, fields });
+        if (token) params.set('since', token);
+        const response = await fetch(`/api/content/changes?${params}`);
+        const data = await response.json();
+        if (data.status !== 'success') throw new Error(data.message || 'Sync failed');
+
+        data.data.deleted.forEach(id => byId.delete(id));
+        data.data.changed.forEach(item => byId.set(item.id, item));
+        token = data.next_token;
+        hasMore = data.has_more;
+      }
+      this.syncToken = token;
+      this.allContent = Array.from(byId.values()).sort((a, b) => b.id - a.id);
+
       // Clear selected filters when loading new content
       this.selectedTagIds = new Set();
       this.selectedCategoryIds = new Set();
@@ -963,6 +1023,7 @@ class App {
     } catch (error) {
       console.warn('Failed to load content:', error);
       this.allContent = [];
+      this.syncToken = null;
     }
   }
 
@@ -1106,6 +1167,8 @@ class App {
     const fileType = this.getFileType(content.original_filename);
     const fileSize = content.file_size ? this.formatFileSize(content.file_size) : 'Unknown size';
     const fileTypeBadgeClass = this.getFileTypeBadgeClass(content.original_filename);
+    // Pinning the URL to the file hash lets the browser cache the file for good
+    const downloadUrl = `/api/content/${content.id}/download` + (content.file_hash ? `?v=${content.file_hash}` : '');
 
     return `
       <div class="file-download-section">
@@ -1117,7 +1180,7 @@ class App {
           </div>
         </div>
         <div class="file-download-actions">
-          <a href="/api/content/${content.id}/download" class="file-download-btn" target="_blank">
+          <a href="${downloadUrl}" class="file-download-btn" target="_blank">
             📥 Download File
           </a>
           <span class="file-type-badge ${fileTypeBadgeClass}">${fileType}</span>
@@ -1718,9 +1781,40 @@ class App {
     }
   }
 
-  performSearch(query) {
+  async performSearch(query) {
     console.log('Searching for:', query);
-    // TODO: Implement search functionality
+    const trimmed = (query || '').trim();
+
+    // Empty query restores the current tag/subject filtered view
+    if (!trimmed) {
+      this.filterContentByTagsAndCategories();
+      return;
+    }
+
+    try {
+      // Server-side FTS5 search - ranked results with highlighted snippets
+      const fields = 'id,title,subject,description,grade_level,duration,tags,file_path,original_filename';
+      const params = new URLSearchParams({ q: trimmed, limit: 100, fields });
+      const response = await fetch(`/api/search?${params}`);
+      const data = await response.json();
+
+      if (data.status !== 'success') {
+        this.showToast(data.message || 'Search failed', 'error');
+        return;
+      }
+
+      // Ignore responses for queries the user has already typed past
+      const searchInput = document.getElementById('search');
+      if (searchInput && searchInput.value.trim() !== trimmed) return;
+
+      this.displayFilteredContent(data.data.map(item => ({
+        ...item,
+        description: item.snippet || item.description
+      })));
+    } catch (error) {
+      console.warn('Search failed:', error);
+      this.showToast('Search failed', 'error');
+    }
   }
 
   refreshCurrentPage() {
@@ -2152,6 +2246,9 @@ class AutoUploadHandler {
     this.dropZone = null;
     this.isProcessing = false;
     this.processedFiles = new Set();
+    this.uploadConcurrency = 4;
+    this.jobsPerStream = 200;
+    this.jobPollInterval = 2000;
     this.setupDropZone();
   }
 
@@ -2276,9 +2373,26 @@ class AutoUploadHandler {
     // Show results section
     document.getElementById('auto-upload-results').classList.remove('hidden');
     
-    // Process files
-    for (const file of validFiles) {
-      await this.autoUploadFile(file);
+    // Send files a few at a time; the server queues each one as a job and
+    // answers straight away, so no upload waits for another file's analysis
+    this.isProcessing = true;
+    const jobs = new Map();  // job id -> result item
+    const pending = [...validFiles];
+    const sendNext = async () => {
+      while (pending.length > 0) {
+        const job = await this.autoUploadFile(pending.shift());
+        if (job) jobs.set(job.id, job.item);
+      }
+    };
+    try {
+      const senders = Math.min(this.uploadConcurrency, pending.length);
+      await Promise.all(Array.from({ length: senders }, sendNext));
+    } finally {
+      this.isProcessing = false;
+    }
+    
+    if (jobs.size > 0) {
+      this.followJobs(jobs);
     }
   }
 
@@ -2296,7 +2410,7 @@ class AutoUploadHandler {
     // Prevent duplicate uploads
     const fileId = `${file.name}-${file.size}-${file.lastModified}`;
     if (this.processedFiles.has(fileId)) {
-      return;
+      return null;
     }
     
     this.processedFiles.add(fileId);
@@ -2307,8 +2421,8 @@ class AutoUploadHandler {
     resultsList.appendChild(resultItem);
     
     try {
-      // Show processing state
-      this.updateResultItem(resultItem, 'processing', 'Analyzing content with AI...');
+      // Show uploading state
+      this.updateResultItem(resultItem, 'processing', 'Uploading...');
       
       // Create form data
       const formData = new FormData();
@@ -2320,9 +2434,7 @@ class AutoUploadHandler {
         body: formData
       });
       
-      console.log('Auto-upload response status:', response.status);
       const responseText = await response.text();
-      console.log('Auto-upload response text:', responseText);
       
       let result;
       try {
@@ -2332,15 +2444,10 @@ class AutoUploadHandler {
         throw new Error('Invalid server response');
       }
       
-      if (response.ok && result.status === 'success') {
-        // Show success with generated metadata
-        this.updateResultItem(resultItem, 'success', 
-          `✅ Auto-saved as: "${result.data.title}"`, result.data);
-        
-        // Refresh content grid after successful upload
-        setTimeout(() => {
-          this.app.refreshCurrentPage();
-        }, 1000);
+      if (response.status === 202 && result.status === 'success') {
+        // Queued: progress arrives through followJobs()
+        this.showJobStatus(resultItem, result.data.job);
+        return { id: result.data.job_id, item: resultItem };
       } else {
         throw new Error(result.message || 'Auto-upload failed');
       }
@@ -2350,6 +2457,96 @@ class AutoUploadHandler {
       this.updateResultItem(resultItem, 'error', 
         `❌ Failed: ${error.message}`);
     }
+    return null;
+  }
+
+  followJobs(jobs) {
+    // One event stream per batch of jobs (the server takes up to 200 ids)
+    const ids = [...jobs.keys()];
+    for (let i = 0; i < ids.length; i += this.jobsPerStream) {
+      const batch = new Map(ids.slice(i, i + this.jobsPerStream).map(id => [id, jobs.get(id)]));
+      if (window.EventSource) {
+        this.streamJobs(batch);
+      } else {
+        this.pollJobs(batch);
+      }
+    }
+  }
+
+  streamJobs(jobs) {
+    const source = new EventSource(`/api/jobs/events?ids=${[...jobs.keys()].join(',')}`);
+    const finished = new Set();
+    
+    source.addEventListener('job', (event) => {
+      const job = JSON.parse(event.data);
+      this.showJobStatus(jobs.get(job.id), job);
+      if (job.status === 'succeeded' || job.status === 'failed') {
+        finished.add(job.id);
+      }
+    });
+    
+    source.addEventListener('done', () => {
+      source.close();
+      this.app.refreshCurrentPage();
+    });
+    
+    // Connection lost: carry on polling the jobs that have not finished
+    source.onerror = () => {
+      source.close();
+      const remaining = new Map([...jobs].filter(([id]) => !finished.has(id)));
+      if (remaining.size > 0) {
+        this.pollJobs(remaining);
+      }
+    };
+  }
+
+  async pollJobs(jobs) {
+    const remaining = new Map(jobs);
+    while (remaining.size > 0) {
+      try {
+        const response = await fetch(`/api/jobs?ids=${[...remaining.keys()].join(',')}`);
+        const result = await response.json();
+        if (!response.ok) {
+          throw new Error(result.message || 'Job status unavailable');
+        }
+        // Jobs the server no longer knows (pruned or unknown) are done, as in the event stream
+        const returned = new Set(result.data.map(job => job.id));
+        for (const id of [...remaining.keys()]) {
+          if (!returned.has(id)) {
+            remaining.delete(id);
+          }
+        }
+        for (const job of result.data) {
+          this.showJobStatus(remaining.get(job.id), job);
+          if (job.status === 'succeeded' || job.status === 'failed') {
+            remaining.delete(job.id);
+          }
+        }
+      } catch (error) {
+        console.error('Job status error:', error);
+      }
+      if (remaining.size > 0) {
+        await new Promise(resolve => setTimeout(resolve, this.jobPollInterval));
+      }
+    }
+    this.app.refreshCurrentPage();
+  }
+
+  showJobStatus(item, job) {
+    if (!item) return;
+    
+    if (job.status === 'succeeded') {
+      // Show success with generated metadata
+      this.updateResultItem(item, 'success', 
+        `✅ Auto-saved as: "${job.result.title}"`, job.result);
+    } else if (job.status === 'failed') {
+      this.updateResultItem(item, 'error', `❌ Failed: ${job.error}`);
+    } else if (job.status === 'processing') {
+      this.updateResultItem(item, 'processing', 
+        job.stage === 'saving' ? 'Saving...' : 'Analyzing content with AI...');
+    } else {
+      this.updateResultItem(item, 'processing', 'Queued for AI analysis...');
+    }
   }
 
   createResultItem(file) {
@@ -0,0 +1,55 @@
+"""
+Gunicorn settings for production serving (see wsgi.py)
+Each value can be overridden through the environment or on the command line.
+
+The app is preloaded once in the master - migrations and the PRAGMA report
+run a single time - and then forked; post_fork gives every worker its own
+database pools, Ollama client and writer thread. No threads are started
+in the master: each worker resumes queued auto-upload jobs itself once it
+has loaded the app (post_worker_init).
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get('TEACHING_DB_BIND', '127.0.0.1:5000')
+
+# Workers share one SQLite writer lock, so more processes only help reads
+workers = int(os.environ.get('TEACHING_DB_WORKERS', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+
+# Threads per worker; keep at or below TEACHING_DB_POOL_SIZE
+worker_class = 'gthread'
+threads = int(os.environ.get('TEACHING_DB_THREADS', 4))
+
+preload_app = os.environ.get('TEACHING_DB_PRELOAD', '1') != '0'
+
+# Auto-upload waits on the LLM, which can take well over the default 30s
+timeout = int(os.environ.get('TEACHING_DB_WORKER_TIMEOUT', 180))
+graceful_timeout = 30
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Close the master's database connections before workers are forked"""
+    if server.cfg.preload_app:
+        from database.database import get_database_manager
+        get_database_manager().dispose()
+
+
+def post_fork(server, worker):
+    """Give each worker its own connections, LLM client and writer thread"""
+    if server.cfg.preload_app:
+        import start_server
+        from wsgi import app
+        start_server.reinit_worker(app)
+        worker.log.info(f"Worker {worker.pid} reinitialized database pools and LLM client")
+
+
+def post_worker_init(worker):
+    """Resume auto-upload jobs queued before a restart, in the worker (preloaded or not)"""
+    import start_server
+    from wsgi import app
+    start_server.resume_upload_jobs(app)
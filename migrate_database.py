@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Schema Migration Script for Teaching Content Database
+
+Applies pending schema migrations and resumes unfinished backfills on an
+existing database (the server also does this at startup), or reports the
+current schema version.
+
+Usage:
+    python migrate_database.py                 # upgrade to the latest version
+    python migrate_database.py --status        # show applied/pending migrations
+    python migrate_database.py --batch-size 1000 --pause 0.05
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+# Add the backend directory to Python path
+backend_path = Path(__file__).parent / 'backend'
+sys.path.insert(0, str(backend_path))
+
+from database.database import DatabaseManager
+from database.migrations import DatabaseMigration, BACKFILL_BATCH_SIZE
+
+
+def print_status(status):
+    print(f"📂 Schema version: {status['current_version']} (latest: {status['latest_version']})")
+    for applied in status['applied']:
+        print(f"   ✅ {applied['version']:>3} {applied['name']}  ({applied['applied_at']})")
+    for pending in status['pending']:
+        print(f"   ⏳ {pending['version']:>3} {pending['name']}  (pending)")
+    for backfill in status['backfills']:
+        state = 'complete' if backfill['completed_at'] else f"at id {backfill['last_id']} of {backfill['max_id']}"
+        print(f"   🔄 backfill {backfill['name']}: {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Upgrade the Teaching Content Database schema')
+    parser.add_argument('--database-url', help='database to upgrade (default: teaching_content.db)')
+    parser.add_argument('--status', action='store_true', help='report the schema version and exit')
+    parser.add_argument('--batch-size', type=int, default=BACKFILL_BATCH_SIZE, help='rows per backfill transaction')
+    parser.add_argument('--pause', type=float, default=0.0, help='seconds to sleep between backfill batches')
+    args = parser.parse_args()
+
+    manager = DatabaseManager(args.database_url)
+    migration = DatabaseMigration(manager.engine)
+    try:
+        if args.status:
+            print_status(migration.status())
+            return True
+
+        print("=" * 60)
+        print("🚀 Teaching Content Database - Schema Migration")
+        print("=" * 60)
+        manager.create_tables()
+        success = migration.migrate(args.batch_size, args.pause)
+        print_status(migration.status())
+        return success
+    finally:
+        manager.dispose()
+
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
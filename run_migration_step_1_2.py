@@ -1,65 +0,0 @@
-#!/usr/bin/env python3
-"""
-Migration Script for Step 1.2: Auto-Categorization Schema Enhancement
-
-This script safely adds the auto-categorization columns and indexes to existing
-Teaching Content Database installations.
-
-Usage:
-    python run_migration_step_1_2.py
-"""
-
-import sys
-import os
-from pathlib import Path
-
-# Add the backend directory to Python path
-backend_path = Path(__file__).parent / 'backend'
-sys.path.insert(0, str(backend_path))
-
-def main():
-    """Run the Step 1.2 migration"""
-    print("=" * 70)
-    print("🚀 MCP Smart Notes Integration - Step 1.2 Migration")
-    print("   Adding Auto-Categorization Schema Enhancements")
-    print("=" * 70)
-    
-    try:
-        # Import migration functionality
-        from database.migrations import run_auto_categorization_migration
-        
-        # Run the migration
-        success = run_auto_categorization_migration()
-        
-        if success:
-            print("\n" + "=" * 70)
-            print("🎉 Step 1.2 Migration Completed Successfully!")
-            print("=" * 70)
-            print("✅ Your database now supports:")
-            print("   • Auto-categorization tracking")
-            print("   • Categorization confidence scoring")
-            print("   • AI-suggested tags storage")
-            print("   • Performance indexes for intelligent search")
-            print()
-            print("🔍 Next Steps:")
-            print("   • You can now proceed with Step 1.3 (Frontend Integration)")
-            print("   • The system will automatically use these fields when")
-            print("     Step 1.1 (Content Analysis API) is implemented")
-            print("=" * 70)
-            return True
-        else:
-            print("\n💥 Migration failed! Check the logs above for details.")
-            return False
-            
-    except ImportError as e:
-        print(f"❌ Failed to import migration modules: {e}")
-        print("Make sure you have installed the required dependencies:")
-        print("  pip install SQLAlchemy")
-        return False
-    except Exception as e:
-        print(f"❌ Unexpected error: {e}")
-        return False
-
-if __name__ == "__main__":
-    success = main()
-    sys.exit(0 if success else 1) 
\ No newline at end of file
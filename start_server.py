@@ -2,18 +2,18 @@
 Simple server startup script - Direct SQLAlchemy implementation
 """
 
-from flask import Flask, jsonify, request, send_from_directory, send_file
+from flask import Flask, jsonify, request, send_from_directory, send_file, Response, stream_with_context
 from flask_cors import CORS
 from pathlib import Path
 import sys
 import os
-import hashlib
-import uuid
+import base64
+import functools
 import logging
+import time
 from datetime import datetime
-from werkzeug.utils import secure_filename
-from werkzeug.exceptions import RequestEntityTooLarge
-from sqlalchemy import func
+from werkzeug.exceptions import RequestEntityTooLarge, RequestedRangeNotSatisfiable
+from sqlalchemy import func, select, tuple_, update
 import json
 
 # Add backend to path for imports
@@ -55,7 +55,30 @@ def create_simple_app():
     
     # Import database components
     from database.database import get_database_manager
-    from database.models import Content, Tag, Category, content_tags  # association table
+    from database.models import Content, Tag, Category, ContentTombstone, ContentCounter, content_tags  # association table
+    from database.counters import subject_counts_query
+    from database.search import search_content
+    from database.facets import compute_facets, parse_facet_filters
+    from services.response_cache import ResponseCache, make_etag
+    from services.request_session import get_db_session, get_read_session, init_request_sessions
+    from services.query_stats import init_query_stats
+    from services.write_queue import WriteQueue, DEFAULT_WINDOW_SECONDS
+    from services.uploads import (
+        ALLOWED_EXTENSIONS, AUTO_TAG_NAMES, allowed_file,
+        build_auto_content, auto_upload_result
+    )
+    from services.blob_store import BLOBS_DIR, BlobStore
+    from services.upload_staging import init_upload_staging
+    from services.chunked_uploads import ChunkedUploads, UploadOffsetMismatch
+    from services.upload_jobs import FINISHED_JOB_STATUSES, UploadJobQueue, queued_job_data, record_job_success
+    from services.downloads import download_offload_mode, send_upload
+    from database.blobs import blob_ref_count
+    from services.content_serializer import (
+        CONTENT_DETAIL_FIELDS, CONTENT_LIST_FIELDS, get_serializer, parse_fields, serialize_content_ids
+    )
+    
+    # Downloads can be streamed by a front proxy instead (TEACHING_DB_DOWNLOAD_OFFLOAD)
+    app.config['DOWNLOAD_OFFLOAD'] = download_offload_mode()
     
     # Frontend directory path
     frontend_dir = Path(__file__).parent / 'frontend'
@@ -63,93 +86,71 @@ def create_simple_app():
     # Enable CORS
     CORS(app, origins=['*'])
     
-    # File upload configuration
-    ALLOWED_EXTENSIONS = {
-        'pdf', 'doc', 'docx', 'txt', 'rtf', 'odt',  # Documents
-        'ppt', 'pptx', 'odp',  # Presentations
-        'xls', 'xlsx', 'ods', 'csv',  # Spreadsheets
-        'jpg', 'jpeg', 'png', 'gif', 'bmp', 'svg',  # Images
-        'mp3', 'wav', 'ogg', 'm4a',  # Audio
-        'mp4', 'avi', 'mov', 'wmv', 'flv', 'webm',  # Video
-        'zip', 'rar', '7z', 'tar', 'gz'  # Archives
-    }
+    # Content list pagination
+    CONTENT_PAGE_DEFAULT_LIMIT = 100
+    CONTENT_PAGE_MAX_LIMIT = 1000
     
-    CONTENT_TYPE_MAPPING = {
-        'lesson-plan': 'lesson-plans',
-        'lesson-plans': 'lesson-plans',
-        'worksheet': 'worksheets',
-        'worksheets': 'worksheets',
-        'assessment': 'assessments',
-        'assessments': 'assessments',
-        'resource': 'resources',
-        'resources': 'resources'
-    }
+    # Streaming export batch size (rows held in memory at once)
+    EXPORT_BATCH_SIZE = 200
     
-    def allowed_file(filename):
-        """Check if file extension is allowed"""
-        return '.' in filename and \
-               filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    # Full-text search paging
+    SEARCH_DEFAULT_LIMIT = 20
+    SEARCH_MAX_LIMIT = 100
     
-    def sanitize_filename(filename):
-        """Sanitize filename to prevent directory traversal and other security issues"""
-        if not filename:
-            return 'unnamed_file'
-        
-        # Use werkzeug's secure_filename for basic sanitization
-        filename = secure_filename(filename)
-        
-        # Additional sanitization
-        filename = filename.replace('..', '').replace('/', '').replace('\\', '')
-        
-        # Ensure filename is not empty after sanitization
-        if not filename or filename == '.':
-            filename = 'unnamed_file'
-            
-        return filename
+    def parse_page_limit(value):
+        """Page size from ?limit= (default when absent, capped at CONTENT_PAGE_MAX_LIMIT)"""
+        if value is None:
+            return CONTENT_PAGE_DEFAULT_LIMIT
+        try:
+            limit = int(value)
+        except ValueError as e:
+            raise ValueError('limit must be a positive integer') from e
+        if limit < 1:
+            raise ValueError('limit must be a positive integer')
+        return min(limit, CONTENT_PAGE_MAX_LIMIT)
     
-    def generate_unique_filename(original_filename, content_type=None):
-        """Generate a unique filename while preserving the original extension"""
-        if not original_filename:
-            original_filename = 'file'
-            
-        # Extract extension
-        if '.' in original_filename:
-            name, ext = original_filename.rsplit('.', 1)
-            ext = '.' + ext.lower()
-        else:
-            name = original_filename
-            ext = ''
-        
-        # Generate unique identifier
-        unique_id = str(uuid.uuid4())[:8]
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        
-        # Create unique filename
-        unique_filename = f"{sanitize_filename(name)}_{timestamp}_{unique_id}{ext}"
-        
-        return unique_filename
+    def encode_content_cursor(date_created, content_id):
+        """Encode the (date_created, id) keyset position of a content row"""
+        raw = f"{date_created.isoformat()}|{content_id}"
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
     
-    def get_file_hash(file_path):
-        """Calculate SHA-256 hash of a file for duplicate detection"""
-        hash_sha256 = hashlib.sha256()
+    def decode_content_cursor(cursor):
+        """Decode a cursor produced by encode_content_cursor"""
         try:
-            with open(file_path, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_sha256.update(chunk)
-            return hash_sha256.hexdigest()
-        except Exception as e:
-            logging.error(f"Error calculating file hash: {e}")
-            return None
+            padded = cursor + '=' * (-len(cursor) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+            date_created, content_id = raw.rsplit('|', 1)
+            return datetime.fromisoformat(date_created), int(content_id)
+        except (ValueError, UnicodeError) as e:
+            raise ValueError('Invalid cursor') from e
     
-    def ensure_upload_directory(content_type):
-        """Ensure the upload directory exists for the given content type"""
-        # Map content type to directory name
-        dir_name = CONTENT_TYPE_MAPPING.get(content_type, 'resources')
-        
-        upload_dir = Path(app.config['UPLOAD_FOLDER']) / dir_name
-        upload_dir.mkdir(parents=True, exist_ok=True)
-        
-        return str(upload_dir)
+    def encode_sync_token(change_seq, tombstone_seq):
+        """Encode an incremental sync position (change sequence numbers of the last change and deletion seen)"""
+        position = {
+            's': change_seq,
+            'd': tombstone_seq
+        }
+        raw = json.dumps(position, separators=(',', ':'))
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+    
+    def decode_sync_token(token):
+        """Decode a token produced by encode_sync_token (tokens keyed on date_modified are rejected)"""
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            position = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+            return int(position['s']), int(position['d'])
+        except (ValueError, KeyError, TypeError, UnicodeError) as e:
+            raise ValueError('Invalid sync token') from e
+    
+    def touch_content(session, condition):
+        """Mark the content matching `condition` modified, in the caller's transaction (incremental sync)"""
+        session.execute(
+            update(Content).where(condition).values(date_modified=datetime.utcnow())
+                           .execution_options(synchronize_session=False)
+        )
+    
+    def tagged_with(tag_id):
+        return Content.id.in_(select(content_tags.c.content_id).where(content_tags.c.tag_id == tag_id))
     
     def ensure_temp_directory():
         """Ensure temp directory exists for temporary file operations"""
@@ -160,22 +161,17 @@ def create_simple_app():
     def cleanup_orphaned_files():
         """Clean up orphaned files that exist on disk but not in database - Task 3.3"""
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_read_session()
             
             # Get all file paths from database
-            db_files = set()
-            content_list = session.query(Content).filter(Content.file_path.isnot(None)).all()
-            for content in content_list:
-                db_files.add(content.file_path)
-            
-            session.close()
+            db_files = {file_path for (file_path,) in
+                        session.query(Content.file_path).filter(Content.file_path.isnot(None))}
             
             # Scan upload directories for actual files
             upload_base = Path(app.config['UPLOAD_FOLDER'])
             orphaned_files = []
             
-            for subdir in ['assessments', 'lesson-plans', 'resources', 'worksheets']:
+            for subdir in ['assessments', 'lesson-plans', 'resources', 'worksheets', BLOBS_DIR]:
                 subdir_path = upload_base / subdir
                 if subdir_path.exists():
                     for file_path in subdir_path.rglob('*'):
@@ -198,9 +194,14 @@ def create_simple_app():
                         except Exception as e:
                             logging.error(f"Error cleaning temp file {file_path}: {e}")
             
+            # Chunked upload sessions idle for longer than TEACHING_DB_UPLOAD_SESSION_HOURS
+            expired_uploads = ChunkedUploads(upload_base).expire()
+            
             return {
                 'orphaned_files': orphaned_files,
-                'temp_cleaned': True
+                'temp_cleaned': True,
+                'expired_upload_sessions': expired_uploads,
+                'pruned_upload_jobs': upload_jobs.prune()
             }
             
         except Exception as e:
@@ -211,6 +212,51 @@ def create_simple_app():
                 'error': str(e)
             }
     
+    # Catalog reads are cached per change generation (bumped by DB triggers on every write)
+    response_cache = ResponseCache()
+    
+    def conditional_get(view):
+        """Serve a catalog read with a generation ETag, 304 revalidation and the response cache"""
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            try:
+                generation = get_database_manager().get_change_generation()
+            except Exception as e:
+                logging.warning(f"Change generation unavailable, serving uncached: {e}")
+                return view(*args, **kwargs)
+            
+            etag = make_etag(generation)
+            if request.if_none_match.contains_weak(etag):
+                response = app.response_class(status=304)
+            else:
+                cache_key = request.full_path
+                cached = response_cache.get(cache_key, generation)
+                if cached:
+                    body, mimetype = cached
+                    response = app.response_class(body, mimetype=mimetype)
+                else:
+                    response = app.make_response(view(*args, **kwargs))
+                    if response.status_code != 200:
+                        return response
+                    response_cache.put(cache_key, generation, response.get_data(), response.mimetype)
+            
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    
+    # One lazily opened session per request, closed in teardown_appcontext
+    init_request_sessions(app)
+    
+    # Uploads stream straight into staging files (hashed and sized as they arrive)
+    init_upload_staging(app, {'upload_content', 'auto_upload_content'})
+    
+    # Content creation goes through one writer thread that group-commits bursts
+    # (TEACHING_DB_GROUP_COMMIT_MS=0 commits each write on the request thread instead)
+    group_commit_window = float(os.environ.get('TEACHING_DB_GROUP_COMMIT_MS', DEFAULT_WINDOW_SECONDS * 1000)) / 1000
+    write_queue = WriteQueue(lambda: get_database_manager().get_session(), window=group_commit_window)
+    app.extensions['write_queue'] = write_queue
+    
     # Add basic security headers
     @app.after_request
     def add_security_headers(response):
@@ -221,6 +267,16 @@ def create_simple_app():
 
     # Initialize upload directories and temp directory
     ensure_temp_directory()
+    
+    # Bring an existing database up to the current schema (indexes etc.)
+    startup_db_manager = get_database_manager()
+    startup_db_manager.create_tables()
+    startup_db_manager.run_migrations()
+    startup_db_manager.report_pragmas()
+
+    # Per-request statement counts and timings; slow requests and N+1 patterns
+    # go to logs/teaching-content-db_performance.log (TEACHING_DB_PERFORMANCE_LOG)
+    init_query_stats(app, startup_db_manager)
 
     @app.route('/api/')
     def api_root():
@@ -242,24 +298,19 @@ def create_simple_app():
     def health():
         try:
             # Test database connection
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_read_session()
             
-            try:
-                content_count = session.query(Content).count()
-                session.close()
-                
-                return jsonify({
-                    'status': 'healthy',
-                    'message': 'API is running',
-                    'database': {
-                        'status': 'connected',
-                        'content_count': content_count
-                    }
-                })
-            except Exception as e:
-                session.close()
-                raise e
+            content_count = session.query(Content).count()
+            
+            return jsonify({
+                'status': 'healthy',
+                'message': 'API is running',
+                'database': {
+                    'status': 'connected',
+                    'content_count': content_count,
+                    'pool': get_database_manager().get_pool_status()
+                }
+            })
                 
         except Exception as e:
             return jsonify({
@@ -268,36 +319,33 @@ def create_simple_app():
             }), 503
     
     @app.route('/api/stats')
+    @conditional_get
     def get_stats():
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_read_session()
             
-            try:
-                content_count = session.query(Content).count()
-                tag_count = session.query(Tag).count()
-                category_count = session.query(Category).count()
-                session.close()
-                
-                return jsonify({
-                    'status': 'success',
-                    'content': {
-                        'total': content_count
-                    },
-                    'tags': {
-                        'total': tag_count
-                    },
-                    'categories': {
-                        'total': category_count
-                    },
-                    'system': {
-                        'status': 'healthy',
-                        'version': '1.0.0'
-                    }
-                })
-            except Exception as e:
-                session.close()
-                raise e
+            content_count = session.query(ContentCounter.count).filter(
+                ContentCounter.kind == 'total', ContentCounter.key == ''
+            ).scalar() or 0
+            tag_count = session.query(Tag).count()
+            category_count = session.query(Category).count()
+            
+            return jsonify({
+                'status': 'success',
+                'content': {
+                    'total': content_count
+                },
+                'tags': {
+                    'total': tag_count
+                },
+                'categories': {
+                    'total': category_count
+                },
+                'system': {
+                    'status': 'healthy',
+                    'version': '1.0.0'
+                }
+            })
                 
         except Exception as e:
             return jsonify({
@@ -309,67 +357,136 @@ def create_simple_app():
             }), 500
 
     @app.route('/api/content', methods=['GET'])
+    @conditional_get
     def get_content():
+        """
+        List content newest first using keyset pagination on (date_created, id)
+        Query params: limit, cursor (next_cursor from the previous page),
+        fields (comma-separated projection), subject
+        """
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
-            
             try:
-                # Enhanced filtering support
-                subject_filter = request.args.get('subject')
-                
-                if subject_filter:
-                    # Filter by subject name (Phase 2B: Subject-based filtering)
-                    content_list = session.query(Content).filter(Content.subject == subject_filter).all()
-                else:
-                    content_list = session.query(Content).all()
-                
-                # Enhanced conversion to dict with tags and category
-                content_data = []
-                for content in content_list:
-                    # Get tags for this content
-                    tags = [{'id': tag.id, 'name': tag.name, 'color': tag.color} for tag in content.tags]
-                    
-                    # Get category if exists
-                    category = None
-                    if content.category:
-                        category = {'id': content.category.id, 'name': content.category.name}
-                    
-                    content_data.append({
-                        'id': content.id,
-                        'title': content.title,
-                        # 'content_type': content.content_type,  # Removed - use tags instead
-                        'subject': content.subject,
-                        'description': content.description,
-                        'content': getattr(content, 'content', ''),
-                        'grade_level': getattr(content, 'grade_level', ''),
-                        'duration': getattr(content, 'duration', None),
-                        'keywords': getattr(content, 'keywords', ''),
-                        'status': getattr(content, 'status', 'active'),
-                        'created_at': str(getattr(content, 'date_created', '')),
-                        'updated_at': str(getattr(content, 'date_modified', '')),
-                        'tags': tags,  # Primary categorization method
-                        'category': category,
-                        # Enhanced subject information for filtering
-                        'category_id': content.category_id,  # Keep for backwards compatibility
-                        'subject_name': content.subject,     # Primary subject field for filtering
-                        # File metadata fields
-                        'file_path': getattr(content, 'file_path', None),
-                        'original_filename': getattr(content, 'original_filename', None),
-                        'file_size': getattr(content, 'file_size', None),
-                        'mime_type': getattr(content, 'mime_type', None)
-                    })
-                
-                session.close()
+                limit = parse_page_limit(request.args.get('limit'))
+                fields = parse_fields(request.args.get('fields'), CONTENT_LIST_FIELDS)
+                cursor = request.args.get('cursor')
+                position = decode_content_cursor(cursor) if cursor else None
+            except ValueError as e:
+                return jsonify({
+                    'status': 'error',
+                    'message': str(e)
+                }), 400
+            
+            session = get_read_session()
+            
+            # Only select the columns the projection needs (never the full text unless asked)
+            serializer = get_serializer(fields)
+            query = serializer.select()
+            
+            # Enhanced filtering support
+            subject_filter = request.args.get('subject')
+            if subject_filter:
+                # Filter by subject name (Phase 2B: Subject-based filtering)
+                query = query.where(Content.subject == subject_filter)
+            
+            if position:
+                query = query.where(tuple_(Content.date_created, Content.id) < position)
+            
+            query = (
+                query.order_by(Content.date_created.desc(), Content.id.desc())
+                     .limit(limit + 1)
+            )
+            rows = session.execute(query).all()
+            
+            has_more = len(rows) > limit
+            rows = rows[:limit]
+            next_cursor = None
+            if has_more:
+                last = rows[-1]
+                next_cursor = encode_content_cursor(last.date_created, last.id)
+            
+            # Tags and categories for the whole page come from two set-based queries
+            content_data = serializer.serialize(session, rows, scope=query)
+            
+            return jsonify({
+                'status': 'success',
+                'data': content_data,
+                'count': len(content_data),
+                'next_cursor': next_cursor,
+                'has_more': has_more
+            })
                 
+        except Exception as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 500
+
+    @app.route('/api/content/changes', methods=['GET'])
+    @conditional_get
+    def get_content_changes():
+        """
+        Incremental sync: content created or modified since a token, plus deleted IDs
+        Query params: since (next_token from the previous call; omit for a full sync),
+        limit, fields. Apply `deleted` before `changed`, and keep calling while has_more.
+        """
+        try:
+            try:
+                limit = parse_page_limit(request.args.get('limit'))
+                fields = parse_fields(request.args.get('fields'), CONTENT_LIST_FIELDS)
+                since = request.args.get('since')
+                position = decode_sync_token(since) if since else None
+            except ValueError as e:
                 return jsonify({
-                    'status': 'success',
-                    'data': content_data,
-                    'count': len(content_data)
-                })
-            except Exception as e:
-                session.close()
-                raise e
+                    'status': 'error',
+                    'message': str(e)
+                }), 400
+            
+            session = get_read_session()
+            
+            # Positions are change sequence numbers, handed out in commit
+            # order (database/generation.py), so a change committed after a
+            # client read its token can never be numbered below it
+            if position:
+                last_seq, last_tombstone_seq = position
+            else:
+                # Full sync: every row, but none of the deletions that happened before it
+                last_seq = 0
+                last_tombstone_seq = session.query(func.max(ContentTombstone.change_seq)).scalar() or 0
+            
+            # updated_at is always included so clients can order what they receive
+            serializer = get_serializer(tuple(dict.fromkeys(fields + ('updated_at',))))
+            query = serializer.select().add_columns(Content.change_seq)
+            query = query.where(Content.change_seq > last_seq).order_by(Content.change_seq).limit(limit + 1)
+            rows = session.execute(query).all()
+            
+            changes_have_more = len(rows) > limit
+            rows = rows[:limit]
+            if rows:
+                last_seq = rows[-1].change_seq
+            
+            tombstones = (
+                session.query(ContentTombstone.change_seq, ContentTombstone.content_id)
+                       .filter(ContentTombstone.change_seq > last_tombstone_seq)
+                       .order_by(ContentTombstone.change_seq)
+                       .limit(limit + 1)
+                       .all()
+            )
+            tombstones_have_more = len(tombstones) > limit
+            tombstones = tombstones[:limit]
+            if tombstones:
+                last_tombstone_seq = tombstones[-1].change_seq
+            
+            changed = serializer.serialize(session, rows, scope=query)
+            
+            return jsonify({
+                'status': 'success',
+                'data': {
+                    'changed': changed,
+                    'deleted': [tombstone.content_id for tombstone in tombstones]
+                },
+                'next_token': encode_sync_token(last_seq, last_tombstone_seq),
+                'has_more': changes_have_more or tombstones_have_more
+            })
                 
         except Exception as e:
             return jsonify({
@@ -377,64 +494,168 @@ def create_simple_app():
                 'message': str(e)
             }), 500
 
+    @app.route('/api/content/export', methods=['GET'])
+    def export_content():
+        """
+        Stream the whole catalog as NDJSON (one content object per line)
+        Rows are read with a server-side cursor in batches and written as they are
+        serialized, so memory stays flat however large the catalog is
+        Query params: format (ndjson), fields (defaults to every field)
+        """
+        export_format = request.args.get('format', 'ndjson')
+        if export_format != 'ndjson':
+            return jsonify({
+                'status': 'error',
+                'message': 'Unsupported export format. Supported formats: ndjson'
+            }), 400
+        
+        try:
+            fields = parse_fields(request.args.get('fields'), CONTENT_DETAIL_FIELDS)
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        serializer = get_serializer(fields)
+        statement = serializer.select().order_by(Content.id)
+        
+        def generate():
+            session = get_database_manager().get_read_session()
+            try:
+                for batch in serializer.stream(session, statement, EXPORT_BATCH_SIZE):
+                    yield ''.join(json.dumps(item, default=str) + '\n' for item in batch)
+            except Exception as e:
+                logging.error(f"Export error: {e}")
+                raise
+            finally:
+                session.close()
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        return Response(
+            stream_with_context(generate()),
+            mimetype='application/x-ndjson',
+            headers={'Content-Disposition': f'attachment; filename=content_export_{timestamp}.ndjson'}
+        )
+
     @app.route('/api/content/<int:content_id>', methods=['GET'])
+    @conditional_get
     def get_content_by_id(content_id):
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
-            
             try:
-                content = session.query(Content).filter(Content.id == content_id).first()
-                
-                if not content:
-                    session.close()
-                    return jsonify({
-                        'status': 'error',
-                        'message': 'Content not found'
-                    }), 404
-                
-                # Get tags for this content
-                tags = [{'id': tag.id, 'name': tag.name, 'color': tag.color} for tag in content.tags]
-                
-                # Get category if exists
-                category = None
-                if content.category:
-                    category = {'id': content.category.id, 'name': content.category.name}
-                
-                content_data = {
-                    'id': content.id,
-                    'title': content.title,
-                    # 'content_type': content.content_type,  # Removed - use tags instead
-                    'subject': content.subject,
-                    'description': content.description,
-                    'content': getattr(content, 'content', ''),
-                    'grade_level': getattr(content, 'grade_level', ''),
-                    'duration': getattr(content, 'duration', None),
-                    'keywords': getattr(content, 'keywords', ''),
-                    'status': getattr(content, 'status', 'active'),
-                    'created_at': str(getattr(content, 'date_created', '')),
-                    'updated_at': str(getattr(content, 'date_modified', '')),
-                    'tags': tags,  # Primary categorization method
-                    'category': category,
-                    # Enhanced subject information for filtering
-                    'category_id': content.category_id,  # Keep for backwards compatibility
-                    'subject_name': content.subject,     # Primary subject field for filtering
-                    # File metadata fields
-                    'file_path': getattr(content, 'file_path', None),
-                    'original_filename': getattr(content, 'original_filename', None),
-                    'file_size': getattr(content, 'file_size', None),
-                    'mime_type': getattr(content, 'mime_type', None)
-                }
+                fields = parse_fields(request.args.get('fields'), CONTENT_DETAIL_FIELDS)
+            except ValueError as e:
+                return jsonify({
+                    'status': 'error',
+                    'message': str(e)
+                }), 400
+            
+            session = get_read_session()
+            
+            results = serialize_content_ids(session, [content_id], fields)
+            
+            if not results:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Content not found'
+                }), 404
+            
+            return jsonify({
+                'status': 'success',
+                'data': results[0]
+            })
                 
-                session.close()
+        except Exception as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 500
+
+    @app.route('/api/search', methods=['GET'])
+    @conditional_get
+    def search():
+        """
+        Ranked full-text search over title, description, keywords and extracted text
+        Query params: q, limit, offset, fields (projection), subject
+        """
+        try:
+            query_text = request.args.get('q', '').strip()
+            if not query_text:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Search query (q) is required'
+                }), 400
+            
+            try:
+                limit = min(max(int(request.args.get('limit', SEARCH_DEFAULT_LIMIT)), 1), SEARCH_MAX_LIMIT)
+                offset = max(int(request.args.get('offset', 0)), 0)
+                fields = parse_fields(request.args.get('fields'), CONTENT_LIST_FIELDS)
+            except ValueError as e:
+                return jsonify({
+                    'status': 'error',
+                    'message': str(e)
+                }), 400
+            
+            session = get_read_session()
+            
+            total, hits = search_content(
+                session.connection(), query_text,
+                limit=limit, offset=offset,
+                subject=request.args.get('subject')
+            )
+            
+            results = serialize_content_ids(session, [hit['id'] for hit in hits], fields)
+            hits_by_id = {hit['id']: hit for hit in hits}
+            for result in results:
+                hit = hits_by_id[result['id']]
+                result['rank'] = hit['rank']
+                result['title_highlight'] = hit['title_highlight']
+                result['snippet'] = hit['snippet']
+            
+            return jsonify({
+                'status': 'success',
+                'data': results,
+                'count': len(results),
+                'total': total,
+                'offset': offset,
+                'has_more': offset + len(results) < total
+            })
                 
+        except Exception as e:
+            logging.error(f"Search error: {e}")
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 500
+
+    @app.route('/api/facets', methods=['GET'])
+    @conditional_get
+    def get_facets():
+        """
+        Facet counts for the current filter set, computed in one grouped query
+        Filters: subject, tags (tag ids), grade_level, difficulty_level, status
+        """
+        try:
+            try:
+                filters = parse_facet_filters(request.args)
+            except ValueError as e:
                 return jsonify({
-                    'status': 'success',
-                    'data': content_data
-                })
-            except Exception as e:
-                session.close()
-                raise e
+                    'status': 'error',
+                    'message': str(e)
+                }), 400
+            
+            session = get_read_session()
+            
+            total, facets = compute_facets(session.connection(), filters)
+            
+            return jsonify({
+                'status': 'success',
+                'data': {
+                    'total': total,
+                    'facets': facets
+                },
+                'filters': filters
+            })
                 
         except Exception as e:
             return jsonify({
@@ -461,10 +682,7 @@ def create_simple_app():
                     'message': f'Invalid subject. Must be one of: {", ".join(valid_subjects)}'
                 }), 400
             
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
-            
-            try:
+            def save_content(session):
                 # Auto-assign category based on subject
                 category_id = data.get('category_id')
                 if subject and not category_id:
@@ -487,25 +705,21 @@ def create_simple_app():
                 )
                 
                 session.add(new_content)
-                session.commit()
+                session.flush()  # Get the ID
                 
-                result_data = {
+                return {
                     'id': new_content.id,
                     'title': new_content.title,
                     # 'content_type': new_content.content_type  # Removed - use tags instead
                 }
-                
-                session.close()
-                
-                return jsonify({
-                    'status': 'success',
-                    'message': 'Content created successfully',
-                    'data': result_data
-                }), 201
-            except Exception as e:
-                session.rollback()
-                session.close()
-                raise e
+            
+            result_data = write_queue.submit(save_content)
+            
+            return jsonify({
+                'status': 'success',
+                'message': 'Content created successfully',
+                'data': result_data
+            }), 201
                 
         except Exception as e:
             return jsonify({
@@ -567,6 +781,99 @@ def create_simple_app():
                 'details': str(e)
             }), 500
 
+    def upload_fields(form, filename):
+        """Content fields of an upload form; raises ValueError for an invalid subject"""
+        title = form.get('title')
+        if not title:
+            filename = filename or 'unnamed_file'
+            title = filename.rsplit('.', 1)[0] if '.' in filename else filename
+        
+        # Validate subject
+        subject = form.get('subject', '')
+        valid_subjects = ['English', 'Religious Education', 'Learning Support', 'Other']
+        if subject and subject not in valid_subjects:
+            raise ValueError(f'Invalid subject. Must be one of: {", ".join(valid_subjects)}')
+        
+        return {
+            'title': title,
+            'content_type': form.get('content_type', 'resource'),
+            'subject': subject,
+            'description': form.get('description', ''),
+            'grade_level': form.get('grade_level', ''),
+            'duration': form.get('duration'),
+            'keywords': form.get('keywords', '')
+        }
+    
+    def create_uploaded_content(blob_store, staged, original_filename, fields):
+        """
+        Create the content record for a staged upload and move the file into the blob store
+        Used by single-request and chunked uploads; the staged file is removed
+        if the record cannot be saved.
+        """
+        file_path, file_hash, file_size = staged.path, staged.file_hash, staged.size
+        
+        # Identical files share one blob, stored by hash
+        relative_path = blob_store.relative_path(file_hash)
+        duration = fields.get('duration')
+        
+        def save_content(session):
+            # Auto-assign category based on subject
+            category_id = None
+            if fields['subject']:
+                category = session.query(Category).filter(Category.name == fields['subject']).first()
+                if category:
+                    category_id = category.id
+            
+            # Create new content record
+            new_content = Content(
+                title=fields['title'],
+                content_type=fields['content_type'],
+                subject=fields['subject'],
+                description=fields['description'],
+                grade_level=fields['grade_level'],
+                duration=int(duration) if duration and str(duration).isdigit() else None,
+                keywords=fields['keywords'],
+                category_id=category_id,
+                file_path=relative_path,
+                original_filename=original_filename,
+                file_size=file_size,
+                file_hash=file_hash,
+                mime_type=staged.mime_type
+            )
+            
+            session.add(new_content)
+            session.flush()  # Get the ID
+            
+            # Prepare response data
+            return {
+                'id': new_content.id,
+                'title': new_content.title,
+                'content_type': new_content.content_type,
+                'file_path': new_content.file_path,
+                'original_filename': new_content.original_filename,
+                'file_size': new_content.file_size,
+                'file_hash': new_content.file_hash,
+                'mime_type': new_content.mime_type,
+                'upload_success': True
+            }
+        
+        # Upload bursts are group-committed by the writer thread
+        try:
+            result_data = write_queue.submit(save_content)
+        except Exception as e:
+            # Clean up file if database operation failed
+            try:
+                os.remove(file_path)
+            except:
+                pass
+            raise e
+        
+        if blob_store.place(file_path, file_hash):
+            logging.info(f"File uploaded successfully: {original_filename} -> {relative_path}")
+        else:
+            logging.info(f"File uploaded successfully: {original_filename} (duplicate of {relative_path})")
+        return result_data
+
     @app.route('/api/content/upload', methods=['POST'])
     def upload_content():
         """Upload a file and create content record - Task 1.1"""
@@ -593,35 +900,19 @@ def create_simple_app():
                 }), 400
             
             # Get form data
-            title = request.form.get('title')
-            content_type = request.form.get('content_type', 'resource')
-            subject = request.form.get('subject', '')
-            description = request.form.get('description', '')
-            grade_level = request.form.get('grade_level', '')
-            duration = request.form.get('duration')
-            keywords = request.form.get('keywords', '')
-            
-            # Validate required fields
-            if not title:
-                filename = file.filename or 'unnamed_file'
-                title = filename.rsplit('.', 1)[0] if '.' in filename else filename
-            
-            # Validate subject
-            valid_subjects = ['English', 'Religious Education', 'Learning Support', 'Other']
-            if subject and subject not in valid_subjects:
+            try:
+                fields = upload_fields(request.form, file.filename)
+            except ValueError as e:
                 return jsonify({
                     'status': 'error',
-                    'message': f'Invalid subject. Must be one of: {", ".join(valid_subjects)}'
+                    'message': str(e)
                 }), 400
             
-            # Prepare file storage
-            upload_dir = ensure_upload_directory(content_type)
-            unique_filename = generate_unique_filename(file.filename, content_type)
-            file_path = os.path.join(upload_dir, unique_filename)
-            
-            # Save file
+            # The upload was streamed into a staging file (hashed and sized on the
+            # way); it moves into the blob store once its record is committed
+            blob_store = BlobStore(app.config['UPLOAD_FOLDER'])
             try:
-                file.save(file_path)
+                staged = blob_store.ingest(file.stream, file.filename, file.content_type)
             except Exception as e:
                 logging.error(f"Error saving file: {e}")
                 return jsonify({
@@ -629,97 +920,295 @@ def create_simple_app():
                     'message': 'Failed to save file'
                 }), 500
             
-            # Get file information
-            file_size = os.path.getsize(file_path)
-            file_hash = get_file_hash(file_path)
-            
-            # Check for duplicates (optional feature)
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            result_data = create_uploaded_content(blob_store, staged, file.filename, fields)
             
-            try:
-                # Auto-assign category based on subject
-                category_id = None
-                if subject:
-                    category = session.query(Category).filter(Category.name == subject).first()
-                    if category:
-                        category_id = category.id
-                
-                # Create relative path for database storage
-                relative_path = os.path.relpath(file_path, app.config['UPLOAD_FOLDER'])
-                
-                # Create new content record
-                new_content = Content(
-                    title=title,
-                    content_type=content_type,
-                    subject=subject,
-                    description=description,
-                    grade_level=grade_level,
-                    duration=int(duration) if duration and duration.isdigit() else None,
-                    keywords=keywords,
-                    category_id=category_id,
-                    file_path=relative_path,
-                    original_filename=file.filename,
-                    file_size=file_size,
-                    mime_type=file.content_type or 'application/octet-stream'
-                )
-                
-                session.add(new_content)
-                session.commit()
-                
-                # Prepare response data
-                result_data = {
-                    'id': new_content.id,
-                    'title': new_content.title,
-                    'content_type': new_content.content_type,
-                    'file_path': new_content.file_path,
-                    'original_filename': new_content.original_filename,
-                    'file_size': new_content.file_size,
-                    'mime_type': new_content.mime_type,
-                    'upload_success': True
-                }
-                
-                session.close()
-                
-                logging.info(f"File uploaded successfully: {file.filename} -> {unique_filename}")
+            return jsonify({
+                'status': 'success',
+                'message': 'File uploaded and content created successfully',
+                'data': result_data
+            }), 201
                 
+        except RequestEntityTooLarge:
+            return jsonify({
+                'status': 'error',
+                'message': f'File too large. Maximum size is {app.config["MAX_CONTENT_LENGTH"] // (1024*1024)}MB'
+            }), 413
+        except Exception as e:
+            logging.error(f"Upload error: {e}")
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 500
+
+    # Resumable chunked uploads (services/chunked_uploads.py), for files larger
+    # than MAX_CONTENT_LENGTH or connections that may drop: create a session,
+    # PUT chunks of at most MAX_CONTENT_LENGTH at the reported offset, complete
+    def upload_session_response(status, code=200):
+        response = jsonify({
+            'status': 'success',
+            'data': status
+        })
+        response.status_code = code
+        response.headers['Upload-Offset'] = str(status['offset'])
+        response.headers['Upload-Length'] = str(status['size'])
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/api/uploads', methods=['POST'])
+    def create_upload_session():
+        """Start a resumable upload; the body is JSON with filename, size and the content form fields"""
+        try:
+            data = request.get_json(silent=True) or {}
+            filename = data.get('filename') or ''
+            if not filename:
                 return jsonify({
-                    'status': 'success',
-                    'message': 'File uploaded and content created successfully',
-                    'data': result_data
-                }), 201
-                
-            except Exception as e:
-                session.rollback()
-                session.close()
-                # Clean up file if database operation failed
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
-                raise e
-                
+                    'status': 'error',
+                    'message': 'No filename provided'
+                }), 400
+            if not allowed_file(filename):
+                return jsonify({
+                    'status': 'error',
+                    'message': f'File type not allowed. Allowed types: {", ".join(ALLOWED_EXTENSIONS)}'
+                }), 400
+            size = data.get('size')
+            # JSON true/false are ints to Python
+            valid_size = isinstance(size, int) or (isinstance(size, str) and size.isdigit())
+            if isinstance(size, bool) or not valid_size:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Upload size in bytes is required'
+                }), 400
+            try:
+                fields = upload_fields(data, filename)
+                status = ChunkedUploads(app.config['UPLOAD_FOLDER']).create(
+                    filename, int(size), data.get('mime_type'), fields)
+            except ValueError as e:
+                return jsonify({
+                    'status': 'error',
+                    'message': str(e)
+                }), 400
+            
+            status['chunk_size'] = app.config['MAX_CONTENT_LENGTH']
+            response = upload_session_response(status, 201)
+            response.headers['Location'] = f"/api/uploads/{status['upload_id']}"
+            return response
+        except Exception as e:
+            logging.error(f"Upload session error: {e}")
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 500
+
+    @app.route('/api/uploads/<upload_id>', methods=['GET', 'HEAD'])
+    def get_upload_session(upload_id):
+        """Offset to resume a chunked upload from"""
+        try:
+            return upload_session_response(ChunkedUploads(app.config['UPLOAD_FOLDER']).status(upload_id))
+        except KeyError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Upload not found'
+            }), 404
+
+    @app.route('/api/uploads/<upload_id>', methods=['PUT', 'PATCH'])
+    def put_upload_chunk(upload_id):
+        """
+        Append the request body to an upload at ?offset= (or the Upload-Offset header)
+        A chunk sent for any other offset than the current one gets 409 with the
+        offset to continue from.
+        """
+        uploads = ChunkedUploads(app.config['UPLOAD_FOLDER'])
+        try:
+            offset = request.args.get('offset', request.headers.get('Upload-Offset'))
+            if offset is None or not offset.isdigit():
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Chunk offset is required'
+                }), 400
+            status = uploads.append(upload_id, int(offset), request.stream)
+            return upload_session_response(status)
+        except KeyError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Upload not found'
+            }), 404
+        except UploadOffsetMismatch as e:
+            response = jsonify({
+                'status': 'error',
+                'message': str(e),
+                'offset': e.offset
+            })
+            response.status_code = 409
+            response.headers['Upload-Offset'] = str(e.offset)
+            return response
         except RequestEntityTooLarge:
             return jsonify({
                 'status': 'error',
-                'message': f'File too large. Maximum size is {app.config["MAX_CONTENT_LENGTH"] // (1024*1024)}MB'
-            }), 413
+                'message': f'Chunk too large. Maximum size is {app.config["MAX_CONTENT_LENGTH"] // (1024*1024)}MB'
+            }), 413
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        except Exception as e:
+            logging.error(f"Upload chunk error: {e}")
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 500
+
+    @app.route('/api/uploads/<upload_id>/complete', methods=['POST'])
+    def complete_upload_session(upload_id):
+        """Create the content record for a fully received chunked upload"""
+        uploads = ChunkedUploads(app.config['UPLOAD_FOLDER'])
+        try:
+            staged, info = uploads.complete(upload_id)
+        except KeyError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Upload not found'
+            }), 404
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 409
+        
+        # Optional end-to-end check against the client's own hash
+        expected_hash = (request.get_json(silent=True) or {}).get('sha256')
+        if expected_hash and expected_hash.lower() != staged.file_hash:
+            uploads.discard(upload_id)
+            return jsonify({
+                'status': 'error',
+                'message': 'Checksum mismatch, upload discarded'
+            }), 422
+        
+        try:
+            result_data = create_uploaded_content(
+                BlobStore(app.config['UPLOAD_FOLDER']), staged, info['filename'], info['fields'])
         except Exception as e:
-            logging.error(f"Upload error: {e}")
+            logging.error(f"Upload completion error: {e}")
             return jsonify({
                 'status': 'error',
                 'message': str(e)
             }), 500
+        finally:
+            uploads.discard(upload_id)
+        
+        return jsonify({
+            'status': 'success',
+            'message': 'File uploaded and content created successfully',
+            'data': result_data
+        }), 201
+
+    @app.route('/api/uploads/<upload_id>', methods=['DELETE'])
+    def delete_upload_session(upload_id):
+        """Abandon a chunked upload"""
+        try:
+            uploads = ChunkedUploads(app.config['UPLOAD_FOLDER'])
+            uploads.info(upload_id)
+            uploads.discard(upload_id)
+        except KeyError:
+            return jsonify({
+                'status': 'error',
+                'message': 'Upload not found'
+            }), 404
+        return jsonify({
+            'status': 'success',
+            'message': 'Upload discarded'
+        })
+
+    def process_upload_job(job, progress):
+        """
+        Auto-process one queued upload (run by the UploadJobQueue workers)
+        1. Content extraction and a single LLM call generating ALL metadata
+        2. Save to database with the job's success, then store the file by hash
+        """
+        processing_result = content_analyzer.auto_process(job['file_path'], job['original_filename'],
+                                                          job['mime_type'])
+        if processing_result['status'] != 'success':
+            raise RuntimeError(processing_result.get('message', 'Auto-processing failed'))
+        progress('saving')
+        
+        # Extract auto-generated data
+        auto_data = processing_result['auto_data']
+        
+        # Identical files share one blob, stored by hash
+        blob_store = BlobStore(app.config['UPLOAD_FOLDER'])
+        relative_path = blob_store.relative_path(job['file_hash'])
+        
+        # Save to database (group-committed with other uploads in the same burst)
+        def save_content(session):
+            # Auto-assign category based on subject
+            category_id = None
+            if auto_data['subject']:
+                category = session.query(Category).filter(Category.name == auto_data['subject']).first()
+                if category:
+                    category_id = category.id
+            
+            # Create new content record with all auto-generated data
+            new_content = build_auto_content(auto_data, category_id, relative_path, job['original_filename'],
+                                             job['file_size'], job['file_hash'])
+            
+            session.add(new_content)
+            session.flush()  # Get the ID
+            
+            # Auto-assign suggested tags - ONLY if they already exist
+            for tag_name in auto_data['suggested_tags'] or []:
+                # Only process if tag is in allowed list
+                if tag_name in AUTO_TAG_NAMES:
+                    # Find existing tag (don't create new ones)
+                    tag = session.query(Tag).filter(Tag.name == tag_name).first()
+                    if tag:
+                        # Assign tag to content
+                        new_content.tags.append(tag)
+                    else:
+                        logging.warning(f"Tag '{tag_name}' not found in database - skipping")
+            
+            session.flush()  # Flush now so a bad tag link fails this upload, not the whole batch
+            
+            result = auto_upload_result(new_content, [tag.name for tag in new_content.tags],
+                                        processing_result.get('metadata', {}))
+            record_job_success(session, job['id'], result)
+            return result
+        
+        result_data = write_queue.submit(save_content)
+        try:
+            blob_store.place(job['file_path'], job['file_hash'])
+        except OSError as e:
+            # The content and the job's success are committed; failing the job now
+            # would delete the only copy of the file its content row points at
+            logging.error(f"❌ Storing the file of upload job {job['id']} failed, "
+                          f"left at {job['file_path']}: {e}")
+            return result_data
+        logging.info(f"✅ Auto-upload successful: {job['original_filename']} -> {result_data['title']}")
+        return result_data
+    
+    # Auto-uploads are processed in the background by a bounded worker pool
+    # (TEACHING_DB_AUTO_UPLOAD_WORKERS) draining the upload_jobs table. Jobs
+    # left queued by a restart are resumed by the serving process
+    # (resume_upload_jobs), never here: a preloading gunicorn master must not
+    # start threads before it forks.
+    upload_jobs = UploadJobQueue(lambda: get_database_manager().get_read_session(), write_queue,
+                                 process_upload_job)
+    app.extensions['upload_jobs'] = upload_jobs
+    
+    # Most job ids one status request or event stream may follow
+    MAX_JOBS_PER_REQUEST = 200
+    # Event streams re-read their jobs at least this often (jobs run by other
+    # worker processes do not wake them) and send a comment when idle so
+    # proxies keep them open
+    JOB_EVENTS_POLL_SECONDS = 2
+    JOB_EVENTS_KEEPALIVE_SECONDS = 15
 
     @app.route('/api/content/auto-upload', methods=['POST'])
     def auto_upload_content():
         """
         Task 2.2: Auto-Upload System - Zero-Touch Content Processing
-        Complete automation pipeline:
-        1. File upload → content extraction
-        2. Single LLM call generates ALL metadata 
-        3. Direct save to database
-        4. Return success + generated metadata
+        Stages the file and queues it; returns 202 with a job id right away.
+        Extraction, metadata generation and saving run on the job workers;
+        follow them at /api/jobs/<id> or /api/jobs/events?ids=<id>.
         """
         try:
             if not CONTENT_ANALYSIS_AVAILABLE:
@@ -749,175 +1238,28 @@ def create_simple_app():
                     'message': f'File type not allowed. Allowed types: {", ".join(ALLOWED_EXTENSIONS)}'
                 }), 400
             
-            # Generate unique filename and prepare storage
-            content_type = 'resource'  # Default, will be overridden by LLM
-            upload_dir = ensure_upload_directory(content_type)
-            unique_filename = generate_unique_filename(file.filename, content_type)
-            file_path = os.path.join(upload_dir, unique_filename)
-            
-            # Save file first
-            try:
-                file.save(file_path)
-                file_size = os.path.getsize(file_path)
-            except Exception as e:
-                logging.error(f"Error saving file during auto-upload: {e}")
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Failed to save uploaded file'
-                }), 500
-            
-            # Reset file pointer for content analysis
-            file.seek(0)
-            
-            # Debug logging
-            logging.info(f"🔍 Auto-upload debug: file={file.filename}, saved to={file_path}")
-            logging.info(f"🔍 Content analyzer available: {content_analyzer is not None}")
-            if content_analyzer:
-                logging.info(f"🔍 Content analyzer LLM connected: {content_analyzer.client is not None}")
-            
-            # Run auto-processing to generate all metadata
+            # The upload was streamed into a staging file (hashed and sized on the
+            # way); the job owns it from here until it is stored by hash
+            blob_store = BlobStore(app.config['UPLOAD_FOLDER'])
             try:
-                processing_result = content_analyzer.auto_process_and_save(file, file_path)
-                logging.info(f"🔍 Processing result status: {processing_result.get('status', 'unknown')}")
+                staged = blob_store.ingest(file.stream, file.filename, file.content_type)
+                job = upload_jobs.enqueue(app.config['UPLOAD_FOLDER'], staged, file.filename)
             except Exception as e:
-                logging.error(f"❌ Auto-processing exception: {e}")
-                import traceback
-                traceback.print_exc()
-                # Clean up file on failure
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
-                return jsonify({
-                    'status': 'error',
-                    'message': f'Auto-processing exception: {str(e)}'
-                }), 500
-            
-            if processing_result['status'] != 'success':
-                # Clean up file on failure
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
-                error_msg = processing_result.get('message', 'Auto-processing failed')
-                logging.error(f"❌ Auto-processing failed: {error_msg}")
+                logging.error(f"Error queueing auto-upload: {e}")
                 return jsonify({
                     'status': 'error',
-                    'message': error_msg
+                    'message': 'Failed to queue uploaded file'
                 }), 500
             
-            # Extract auto-generated data
-            auto_data = processing_result['auto_data']
-            
-            # If content type changed, move file to correct directory
-            if auto_data['content_type'] != content_type:
-                new_upload_dir = ensure_upload_directory(auto_data['content_type'])
-                new_file_path = os.path.join(new_upload_dir, unique_filename)
-                try:
-                    os.rename(file_path, new_file_path)
-                    file_path = new_file_path
-                except Exception as e:
-                    logging.warning(f"Failed to move file to {auto_data['content_type']} directory: {e}")
-            
-            # Create relative path for database storage
-            relative_path = os.path.relpath(file_path, app.config['UPLOAD_FOLDER'])
-            
-            # Save to database
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
-            
-            try:
-                # Auto-assign category based on subject
-                category_id = None
-                if auto_data['subject']:
-                    category = session.query(Category).filter(Category.name == auto_data['subject']).first()
-                    if category:
-                        category_id = category.id
-                
-                # Create new content record with all auto-generated data
-                new_content = Content(
-                    title=auto_data['title'],
-                    content_type=auto_data['content_type'],
-                    subject=auto_data['subject'],
-                    description=auto_data['description'],
-                    content=auto_data.get('content', ''),
-                    grade_level=auto_data['grade_level'],
-                    difficulty_level=auto_data['difficulty_level'],
-                    duration=auto_data['duration'],
-                    keywords=auto_data['keywords'],
-                    category_id=category_id,
-                    file_path=relative_path,
-                    original_filename=file.filename,
-                    file_size=file_size,
-                    mime_type=auto_data['mime_type'],
-                    auto_categorized=True,
-                    categorization_confidence=auto_data['categorization_confidence'],
-                    suggested_tags=json.dumps(auto_data['suggested_tags']),
-                    auto_processed=True,
-                    generated_metadata=auto_data.get('generated_metadata', '{}')
-                )
-                
-                session.add(new_content)
-                session.flush()  # Get the ID
-                
-                # Auto-assign suggested tags - ONLY if they already exist
-                if auto_data['suggested_tags']:
-                    # Define allowed tags
-                    ALLOWED_TAGS = ['worksheet', 'lesson-plan', 'assessment', 'interactive', 
-                                   'homework', 'group-work', 'individual', 'beginner', 
-                                   'advanced', 'resource', 'activity']
-                    
-                    for tag_name in auto_data['suggested_tags']:
-                        # Only process if tag is in allowed list
-                        if tag_name in ALLOWED_TAGS:
-                            # Find existing tag (don't create new ones)
-                            tag = session.query(Tag).filter(Tag.name == tag_name).first()
-                            if tag:
-                                # Assign tag to content
-                                new_content.tags.append(tag)
-                            else:
-                                logging.warning(f"Tag '{tag_name}' not found in database - skipping")
-                
-                session.commit()
-                
-                # Prepare response
-                result_data = {
-                    'id': new_content.id,
-                    'title': new_content.title,
-                    'subject': new_content.subject,
-                    'content_type': new_content.content_type,
-                    'description': new_content.description,
-                    'grade_level': new_content.grade_level,
-                    'difficulty_level': new_content.difficulty_level,
-                    'duration': new_content.duration,
-                    'keywords': new_content.keywords,
-                    'file_path': new_content.file_path,
-                    'original_filename': new_content.original_filename,
-                    'file_size': new_content.file_size,
-                    'tags': [tag.name for tag in new_content.tags],
-                    'auto_processed': True,
-                    'metadata': processing_result.get('metadata', {})
-                }
-                
-                session.close()
-                
-                logging.info(f"✅ Auto-upload successful: {file.filename} -> {new_content.title}")
-                
-                return jsonify({
-                    'status': 'success',
-                    'message': 'File auto-uploaded and processed successfully',
-                    'data': result_data
-                }), 201
-                
-            except Exception as e:
-                session.rollback()
-                session.close()
-                # Clean up file if database operation failed
-                try:
-                    os.remove(file_path)
-                except:
-                    pass
-                raise e
+            logging.info(f"📥 Auto-upload queued: {file.filename} (job {job['id']})")
+            response = jsonify({
+                'status': 'success',
+                'message': 'File received and queued for processing',
+                'data': queued_job_data(job)
+            })
+            response.status_code = 202
+            response.headers['Location'] = f"/api/jobs/{job['id']}"
+            return response
                 
         except RequestEntityTooLarge:
             return jsonify({
@@ -931,66 +1273,156 @@ def create_simple_app():
                 'message': str(e)
             }), 500
 
+    def requested_job_ids():
+        """Job ids from ?ids=a,b,c; raises ValueError if missing or too many"""
+        job_ids = [job_id for job_id in request.args.get('ids', '').split(',') if job_id]
+        if not job_ids:
+            raise ValueError('No job ids given')
+        if len(job_ids) > MAX_JOBS_PER_REQUEST:
+            raise ValueError(f'At most {MAX_JOBS_PER_REQUEST} jobs per request')
+        return list(dict.fromkeys(job_ids))
+
+    @app.route('/api/jobs', methods=['GET'])
+    def get_jobs():
+        """Status of several auto-upload jobs (?ids=a,b,c)"""
+        try:
+            jobs = upload_jobs.get(requested_job_ids())
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        response = jsonify({
+            'status': 'success',
+            'data': jobs
+        })
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/api/jobs/<job_id>', methods=['GET'])
+    def get_job(job_id):
+        """Status of one auto-upload job"""
+        jobs = upload_jobs.get([job_id])
+        if not jobs:
+            return jsonify({
+                'status': 'error',
+                'message': 'Job not found'
+            }), 404
+        response = jsonify({
+            'status': 'success',
+            'data': jobs[0]
+        })
+        response.headers['Cache-Control'] = 'no-store'
+        return response
+
+    @app.route('/api/jobs/events', methods=['GET'])
+    def job_events():
+        """
+        Server-Sent Events for auto-upload jobs (?ids=a,b,c)
+        One `job` event per status or stage change (the first with each job's
+        current state), then `done` once every job has finished. One stream
+        covers a whole batch, so a burst of uploads needs one connection.
+        """
+        try:
+            job_ids = requested_job_ids()
+        except ValueError as e:
+            return jsonify({
+                'status': 'error',
+                'message': str(e)
+            }), 400
+        
+        def generate():
+            sent = {}
+            version = upload_jobs.version
+            last_event = time.monotonic()
+            while True:
+                jobs = upload_jobs.get(job_ids)
+                for job in jobs:
+                    state = (job['status'], job['stage'])
+                    if sent.get(job['id']) != state:
+                        sent[job['id']] = state
+                        last_event = time.monotonic()
+                        yield f"event: job\ndata: {json.dumps(job)}\n\n"
+                if all(job['status'] in FINISHED_JOB_STATUSES for job in jobs):
+                    missing = sorted(set(job_ids) - {job['id'] for job in jobs})
+                    yield f"event: done\ndata: {json.dumps({'missing': missing})}\n\n"
+                    return
+                if time.monotonic() - last_event > JOB_EVENTS_KEEPALIVE_SECONDS:
+                    last_event = time.monotonic()
+                    yield ": keepalive\n\n"
+                version = upload_jobs.wait_for_change(version, JOB_EVENTS_POLL_SECONDS)
+        
+        return Response(generate(), mimetype='text/event-stream', headers={
+            'Cache-Control': 'no-store',
+            'X-Accel-Buffering': 'no'
+        })
+
     @app.route('/api/content/<int:content_id>/download', methods=['GET'])
     def download_content(content_id):
-        """Download a file by content ID - Task 1.2"""
+        """
+        Download a file by content ID - Task 1.2
+        Answers Range/If-Range (seeking in video and audio) and revalidation
+        with a strong ETag from the file hash; ?v=<file_hash> URLs are cached
+        as immutable (services/downloads.py)
+        """
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_read_session()
+            
+            # Get content record (only the columns a download needs)
+            content = session.query(
+                Content.file_path, Content.original_filename, Content.mime_type, Content.file_hash
+            ).filter(Content.id == content_id).first()
+            
+            if not content:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Content not found'
+                }), 404
+            
+            if not content.file_path:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'No file associated with this content'
+                }), 404
+            
+            # Construct full file path
+            full_file_path = os.path.join(app.config['UPLOAD_FOLDER'], content.file_path)
+            
+            # Check if file exists on disk
+            if not os.path.isfile(full_file_path):
+                logging.error(f"File not found on disk: {full_file_path}")
+                return jsonify({
+                    'status': 'error',
+                    'message': 'File not found on server'
+                }), 404
+            
+            # Prepare download filename (use original filename if available)
+            download_filename = content.original_filename or os.path.basename(content.file_path)
             
             try:
-                # Get content record
-                content = session.query(Content).filter(Content.id == content_id).first()
-                
-                if not content:
-                    session.close()
-                    return jsonify({
-                        'status': 'error',
-                        'message': 'Content not found'
-                    }), 404
-                
-                if not content.file_path:
-                    session.close()
-                    return jsonify({
-                        'status': 'error',
-                        'message': 'No file associated with this content'
-                    }), 404
-                
-                # Construct full file path
-                full_file_path = os.path.join(app.config['UPLOAD_FOLDER'], content.file_path)
-                
-                # Check if file exists on disk
-                if not os.path.exists(full_file_path):
-                    session.close()
-                    logging.error(f"File not found on disk: {full_file_path}")
-                    return jsonify({
-                        'status': 'error',
-                        'message': 'File not found on server'
-                    }), 404
-                
-                session.close()
-                
-                # Prepare download filename (use original filename if available)
-                download_filename = content.original_filename or os.path.basename(content.file_path)
-                
-                try:
-                    # Stream file with proper headers
-                    return send_file(
-                        full_file_path,
-                        as_attachment=True,
-                        download_name=download_filename,
-                        mimetype=content.mime_type or 'application/octet-stream'
-                    )
-                except Exception as e:
-                    logging.error(f"Error sending file: {e}")
-                    return jsonify({
-                        'status': 'error',
-                        'message': 'Error sending file'
-                    }), 500
-                    
+                # Stream file (or hand it to the front proxy) with validators and cache headers
+                return send_upload(
+                    app.config['UPLOAD_FOLDER'],
+                    content.file_path,
+                    download_filename,
+                    content.mime_type or 'application/octet-stream',
+                    file_hash=content.file_hash,
+                    offload=app.config['DOWNLOAD_OFFLOAD']
+                )
+            except RequestedRangeNotSatisfiable:
+                response = jsonify({
+                    'status': 'error',
+                    'message': 'Requested range not satisfiable'
+                })
+                response.status_code = 416
+                response.headers['Content-Range'] = f'bytes */{os.path.getsize(full_file_path)}'
+                return response
             except Exception as e:
-                session.close()
-                raise e
+                logging.error(f"Error sending file: {e}")
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Error sending file'
+                }), 500
                 
         except Exception as e:
             logging.error(f"Download error: {e}")
@@ -1017,14 +1449,12 @@ def create_simple_app():
                     'message': f'Invalid subject. Must be one of: {", ".join(valid_subjects)}'
                 }), 400
             
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 content = session.query(Content).filter(Content.id == content_id).first()
                 
                 if not content:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Content not found'
@@ -1056,7 +1486,6 @@ def create_simple_app():
                     content.category_id = data['category_id']
                 
                 session.commit()
-                session.close()
                 
                 return jsonify({
                     'status': 'success',
@@ -1064,7 +1493,6 @@ def create_simple_app():
                 })
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1077,14 +1505,12 @@ def create_simple_app():
     def delete_content(content_id):
         """Delete content and associated file - Task 1.3 Enhanced"""
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 content = session.query(Content).filter(Content.id == content_id).first()
                 
                 if not content:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Content not found'
@@ -1092,11 +1518,13 @@ def create_simple_app():
                 
                 # Store file information before deletion
                 file_path = content.file_path
+                file_hash = content.file_hash
                 file_deleted = False
                 file_missing = False
                 
-                # Try to delete associated file if it exists
-                if file_path:
+                # Try to delete associated file if it exists (blobs are only
+                # removed after the commit, once nothing else references them)
+                if file_path and not file_hash:
                     full_file_path = os.path.join(app.config['UPLOAD_FOLDER'], file_path)
                     if os.path.exists(full_file_path):
                         try:
@@ -1110,14 +1538,29 @@ def create_simple_app():
                         file_missing = True
                         logging.warning(f"File not found on disk during deletion: {full_file_path}")
                 
-                # Delete database record
+                # Delete database record, leaving a tombstone for incremental sync clients
                 session.delete(content)
+                session.add(ContentTombstone(content_id=content_id))
                 session.commit()
-                session.close()
+                
+                file_shared = False
+                if file_hash:
+                    blob_store = BlobStore(app.config['UPLOAD_FOLDER'])
+                    try:
+                        file_shared = blob_store.remove_unreferenced(
+                            file_hash, lambda: blob_ref_count(session, file_hash)) > 0
+                        file_deleted = not file_shared
+                    except FileNotFoundError:
+                        file_missing = True
+                        logging.warning(f"Blob not found on disk during deletion: {file_hash}")
+                    except OSError as e:
+                        logging.error(f"Error deleting blob {file_hash}: {e}")
                 
                 # Prepare response message
                 message = 'Content deleted successfully'
-                if file_deleted:
+                if file_shared:
+                    message += ' (file kept, still used by other content)'
+                elif file_deleted:
                     message += ' (file removed from disk)'
                 elif file_missing:
                     message += ' (file was already missing from disk)'
@@ -1132,7 +1575,6 @@ def create_simple_app():
                 })
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1143,41 +1585,28 @@ def create_simple_app():
             }), 500
 
     @app.route('/api/tags', methods=['GET'])
+    @conditional_get
     def get_tags():
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_read_session()
             
-            try:
-                # BEGIN DYNAMIC TAG USAGE COMPUTATION
-                tags_with_counts = (
-                    session.query(Tag,
-                                 func.count(content_tags.c.content_id).label('usage_count'))
-                           .outerjoin(content_tags, Tag.id == content_tags.c.tag_id)
-                           .group_by(Tag.id)
-                           .all()
-                )
+            # usage_count is kept exact by triggers on content_tags
+            tags = session.query(Tag).all()
 
-                tags_data = []
-                for tag, usage_count in tags_with_counts:
-                    tags_data.append({
-                        'id': tag.id,
-                        'name': tag.name,
-                        'description': getattr(tag, 'description', ''),
-                        'color': getattr(tag, 'color', ''),
-                        'usage_count': usage_count
-                    })
-                # END DYNAMIC TAG USAGE COMPUTATION
-                
-                session.close()
-                
-                return jsonify({
-                    'status': 'success',
-                    'data': tags_data
+            tags_data = []
+            for tag in tags:
+                tags_data.append({
+                    'id': tag.id,
+                    'name': tag.name,
+                    'description': getattr(tag, 'description', ''),
+                    'color': getattr(tag, 'color', ''),
+                    'usage_count': tag.usage_count or 0
                 })
-            except Exception as e:
-                session.close()
-                raise e
+            
+            return jsonify({
+                'status': 'success',
+                'data': tags_data
+            })
                 
         except Exception as e:
             return jsonify({
@@ -1195,14 +1624,12 @@ def create_simple_app():
                     'message': 'Tag name is required'
                 }), 400
             
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 # Check if tag already exists
                 existing_tag = session.query(Tag).filter(Tag.name == data['name']).first()
                 if existing_tag:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Tag already exists'
@@ -1222,8 +1649,6 @@ def create_simple_app():
                     'name': new_tag.name
                 }
                 
-                session.close()
-                
                 return jsonify({
                     'status': 'success',
                     'message': 'Tag created successfully',
@@ -1231,7 +1656,6 @@ def create_simple_app():
                 }), 201
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1250,14 +1674,12 @@ def create_simple_app():
                     'message': 'No data provided'
                 }), 400
             
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 tag = session.query(Tag).filter(Tag.id == tag_id).first()
                 
                 if not tag:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Tag not found'
@@ -1271,8 +1693,9 @@ def create_simple_app():
                 if 'color' in data:
                     tag.color = data['color']
                 
+                # Tagged content is serialized with the tag, so it changed too (incremental sync)
+                touch_content(session, tagged_with(tag_id))
                 session.commit()
-                session.close()
                 
                 return jsonify({
                     'status': 'success',
@@ -1280,7 +1703,6 @@ def create_simple_app():
                 })
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1292,22 +1714,21 @@ def create_simple_app():
     @app.route('/api/tags/<int:tag_id>', methods=['DELETE'])
     def delete_tag(tag_id):
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 tag = session.query(Tag).filter(Tag.id == tag_id).first()
                 
                 if not tag:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Tag not found'
                     }), 404
                 
+                # Before the links go: the content loses this tag (incremental sync)
+                touch_content(session, tagged_with(tag_id))
                 session.delete(tag)
                 session.commit()
-                session.close()
                 
                 return jsonify({
                     'status': 'success',
@@ -1315,7 +1736,6 @@ def create_simple_app():
                 })
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1335,13 +1755,11 @@ def create_simple_app():
                     'message': 'tag_ids array is required'
                 }), 400
             
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 content = session.query(Content).filter(Content.id == content_id).first()
                 if not content:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Content not found'
@@ -1356,11 +1774,10 @@ def create_simple_app():
                     tag = session.query(Tag).filter(Tag.id == tag_id).first()
                     if tag and tag not in content.tags:
                         content.tags.append(tag)
-                        # Update tag usage count
-                        tag.usage_count = (tag.usage_count or 0) + 1
                 
+                # Tag changes count as a modification for incremental sync
+                content.date_modified = datetime.utcnow()
                 session.commit()
-                session.close()
                 
                 return jsonify({
                     'status': 'success',
@@ -1368,7 +1785,6 @@ def create_simple_app():
                 })
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1380,15 +1796,13 @@ def create_simple_app():
     @app.route('/api/content/<int:content_id>/tags/<int:tag_id>', methods=['DELETE'])
     def remove_tag_from_content(content_id, tag_id):
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 content = session.query(Content).filter(Content.id == content_id).first()
                 tag = session.query(Tag).filter(Tag.id == tag_id).first()
                 
                 if not content or not tag:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Content or tag not found'
@@ -1396,19 +1810,16 @@ def create_simple_app():
                 
                 if tag in content.tags:
                     content.tags.remove(tag)
-                    # Update tag usage count
-                    tag.usage_count = max((tag.usage_count or 1) - 1, 0)
+                    # Tag changes count as a modification for incremental sync
+                    content.date_modified = datetime.utcnow()
                     session.commit()
                 
-                session.close()
-                
                 return jsonify({
                     'status': 'success',
                     'message': 'Tag removed successfully'
                 })
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1418,38 +1829,29 @@ def create_simple_app():
             }), 500
 
     @app.route('/api/categories', methods=['GET'])
+    @conditional_get
     def get_categories():
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
-            
-            try:
-                categories = session.query(Category).all()
-                
-                categories_data = []
-                for category in categories:
-                    # Count content items for this subject
-                    content_count = session.query(Content).filter(Content.subject == category.name).count()
-                    
-                    categories_data.append({
-                        'id': category.id,
-                        'name': category.name,
-                        'description': getattr(category, 'description', ''),
-                        'parent_id': getattr(category, 'parent_id', None),
-                        # Enhanced for subject-based filtering
-                        'content_count': content_count,
-                        'subject_name': category.name  # Primary field for subject matching
-                    })
-                
-                session.close()
-                
-                return jsonify({
-                    'status': 'success',
-                    'data': categories_data
+            session = get_read_session()
+            
+            categories = subject_counts_query(session).all()
+            
+            categories_data = []
+            for category, content_count in categories:
+                categories_data.append({
+                    'id': category.id,
+                    'name': category.name,
+                    'description': getattr(category, 'description', ''),
+                    'parent_id': getattr(category, 'parent_id', None),
+                    # Enhanced for subject-based filtering
+                    'content_count': content_count,
+                    'subject_name': category.name  # Primary field for subject matching
                 })
-            except Exception as e:
-                session.close()
-                raise e
+            
+            return jsonify({
+                'status': 'success',
+                'data': categories_data
+            })
                 
         except Exception as e:
             return jsonify({
@@ -1458,44 +1860,38 @@ def create_simple_app():
             }), 500
 
     @app.route('/api/categories/tree', methods=['GET'])
+    @conditional_get
     def get_categories_tree():
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_read_session()
+            
+            categories = session.query(Category).all()
+            
+            # Build tree structure (simple implementation)
+            categories_dict = {}
+            for category in categories:
+                categories_dict[category.id] = {
+                    'id': category.id,
+                    'name': category.name,
+                    'description': getattr(category, 'description', ''),
+                    'parent_id': getattr(category, 'parent_id', None),
+                    'children': []
+                }
             
-            try:
-                categories = session.query(Category).all()
-                
-                # Build tree structure (simple implementation)
-                categories_dict = {}
-                for category in categories:
-                    categories_dict[category.id] = {
-                        'id': category.id,
-                        'name': category.name,
-                        'description': getattr(category, 'description', ''),
-                        'parent_id': getattr(category, 'parent_id', None),
-                        'children': []
-                    }
-                
-                # Build tree hierarchy
-                tree = []
-                for category in categories_dict.values():
-                    if category['parent_id'] is None:
-                        tree.append(category)
-                    else:
-                        parent = categories_dict.get(category['parent_id'])
-                        if parent:
-                            parent['children'].append(category)
-                
-                session.close()
-                
-                return jsonify({
-                    'status': 'success',
-                    'data': tree
-                })
-            except Exception as e:
-                session.close()
-                raise e
+            # Build tree hierarchy
+            tree = []
+            for category in categories_dict.values():
+                if category['parent_id'] is None:
+                    tree.append(category)
+                else:
+                    parent = categories_dict.get(category['parent_id'])
+                    if parent:
+                        parent['children'].append(category)
+            
+            return jsonify({
+                'status': 'success',
+                'data': tree
+            })
                 
         except Exception as e:
             return jsonify({
@@ -1513,8 +1909,7 @@ def create_simple_app():
                     'message': 'Category name is required'
                 }), 400
             
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 new_category = Category(
@@ -1531,8 +1926,6 @@ def create_simple_app():
                     'name': new_category.name
                 }
                 
-                session.close()
-                
                 return jsonify({
                     'status': 'success',
                     'message': 'Category created successfully',
@@ -1540,7 +1933,6 @@ def create_simple_app():
                 }), 201
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1559,14 +1951,12 @@ def create_simple_app():
                     'message': 'No data provided'
                 }), 400
             
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 category = session.query(Category).filter(Category.id == category_id).first()
                 
                 if not category:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Category not found'
@@ -1580,8 +1970,9 @@ def create_simple_app():
                 if 'parent_id' in data:
                     category.parent_id = data['parent_id']
                 
+                # Content is serialized with its category, so it changed too (incremental sync)
+                touch_content(session, Content.category_id == category_id)
                 session.commit()
-                session.close()
                 
                 return jsonify({
                     'status': 'success',
@@ -1589,7 +1980,6 @@ def create_simple_app():
                 })
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1601,14 +1991,12 @@ def create_simple_app():
     @app.route('/api/categories/<int:category_id>', methods=['DELETE'])
     def delete_category(category_id):
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_db_session()
             
             try:
                 category = session.query(Category).filter(Category.id == category_id).first()
                 
                 if not category:
-                    session.close()
                     return jsonify({
                         'status': 'error',
                         'message': 'Category not found'
@@ -1616,7 +2004,6 @@ def create_simple_app():
                 
                 session.delete(category)
                 session.commit()
-                session.close()
                 
                 return jsonify({
                     'status': 'success',
@@ -1624,7 +2011,6 @@ def create_simple_app():
                 })
             except Exception as e:
                 session.rollback()
-                session.close()
                 raise e
                 
         except Exception as e:
@@ -1635,51 +2021,42 @@ def create_simple_app():
 
     # Phase 2: Enhanced subjects API for new category system
     @app.route('/api/subjects', methods=['GET'])
+    @conditional_get
     def get_subjects():
         """
         Returns the new subject categories for frontend dropdowns and validation
         Enhanced with content counts and proper validation data
         """
         try:
-            db_manager = get_database_manager()
-            session = db_manager.get_session()
+            session = get_read_session()
             
-            try:
-                # Get all current categories (our new subjects)
-                categories = session.query(Category).all()
-                
-                subjects_data = []
-                valid_subjects = ['English', 'Religious Education', 'Learning Support', 'Other']
-                
-                for category in categories:
-                    # Only include our main subject categories
-                    if category.name in valid_subjects:
-                        # Count content items for this subject
-                        content_count = session.query(Content).filter(Content.subject == category.name).count()
-                        
-                        subjects_data.append({
-                            'id': category.id,
-                            'name': category.name,
-                            'description': getattr(category, 'description', ''),
-                            'content_count': content_count,
-                            'subject_name': category.name,  # Primary field for filtering
-                            'is_valid_subject': True  # Flag for frontend validation
-                        })
-                
-                # Sort by name for consistent ordering
-                subjects_data.sort(key=lambda x: x['name'])
-                
-                session.close()
-                
-                return jsonify({
-                    'status': 'success',
-                    'data': subjects_data,
-                    'valid_subjects': valid_subjects,  # For frontend validation
-                    'message': 'New subject categories retrieved successfully'
-                })
-            except Exception as e:
-                session.close()
-                raise e
+            # Get all current categories (our new subjects) with their content counts
+            categories = subject_counts_query(session).all()
+            
+            subjects_data = []
+            valid_subjects = ['English', 'Religious Education', 'Learning Support', 'Other']
+            
+            for category, content_count in categories:
+                # Only include our main subject categories
+                if category.name in valid_subjects:
+                    subjects_data.append({
+                        'id': category.id,
+                        'name': category.name,
+                        'description': getattr(category, 'description', ''),
+                        'content_count': content_count,
+                        'subject_name': category.name,  # Primary field for filtering
+                        'is_valid_subject': True  # Flag for frontend validation
+                    })
+            
+            # Sort by name for consistent ordering
+            subjects_data.sort(key=lambda x: x['name'])
+            
+            return jsonify({
+                'status': 'success',
+                'data': subjects_data,
+                'valid_subjects': valid_subjects,  # For frontend validation
+                'message': 'New subject categories retrieved successfully'
+            })
                 
         except Exception as e:
             return jsonify({
@@ -1733,12 +2110,65 @@ def create_simple_app():
     
     return app
 
+def reinit_worker(app):
+    """
+    Reset process-local resources inherited from a preloaded parent
+    Called from the gunicorn post_fork hook: pooled SQLite connections, the
+    Ollama HTTP client and the writer and job worker threads must not be
+    shared between worker processes.
+    """
+    from database.database import get_database_manager
+    
+    get_database_manager().dispose(close=False)
+    if content_analyzer is not None:
+        content_analyzer.reset_client()
+    app.extensions['write_queue'].reset_after_fork()
+    app.extensions['upload_jobs'].reset_after_fork()
+
+def resume_upload_jobs(app):
+    """
+    Start the auto-upload workers if jobs are waiting from before a restart
+    Called by each serving process once the app is loaded: the development
+    server, the ASGI lifespan and the gunicorn post_worker_init hook.
+    """
+    app.extensions['upload_jobs'].resume()
+
+def run_production(workers=None, threads=None, bind=None):
+    """Serve wsgi:app under gunicorn with the settings in gunicorn.conf.py"""
+    from gunicorn.app.wsgiapp import run
+    
+    project_root = Path(__file__).parent
+    sys.argv = ['gunicorn', '--config', str(project_root / 'gunicorn.conf.py'), '--chdir', str(project_root)]
+    if workers:
+        sys.argv += ['--workers', str(workers)]
+    if threads:
+        sys.argv += ['--threads', str(threads)]
+    if bind:
+        sys.argv += ['--bind', bind]
+    sys.argv.append('wsgi:app')
+    run()
+
 if __name__ == '__main__':
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Teaching Content Database API server')
+    parser.add_argument('--production', action='store_true',
+                        help='serve with gunicorn worker processes instead of the development server')
+    parser.add_argument('--workers', type=int, help='worker processes (production mode)')
+    parser.add_argument('--threads', type=int, help='threads per worker (production mode)')
+    parser.add_argument('--bind', help='address to listen on, e.g. 127.0.0.1:5000 (production mode)')
+    args = parser.parse_args()
+    
+    if args.production:
+        run_production(args.workers, args.threads, args.bind)
+        sys.exit(0)
+    
     print("Starting Simplified Teaching Content Database API...")
     print("Direct SQLAlchemy implementation (no service layer)")
     print("=" * 50)
     
     app = create_simple_app()
+    resume_upload_jobs(app)
     
     print("Simplified Flask app created")
     print("Starting server on http://127.0.0.1:5000")
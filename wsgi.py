@@ -0,0 +1,9 @@
+"""
+WSGI entry point for production servers
+    gunicorn --config gunicorn.conf.py wsgi:app
+or  python start_server.py --production
+"""
+
+from start_server import create_simple_app
+
+app = create_simple_app()